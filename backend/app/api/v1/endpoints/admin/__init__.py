@@ -2,6 +2,6 @@
 Admin API Endpoints
 """
 
-from app.api.v1.endpoints.admin import label_types, nutrients, rda_tables
+from app.api.v1.endpoints.admin import label_types, metrics, nutrients, rda_tables, retention_tables
 
-__all__ = ["label_types", "nutrients", "rda_tables"]
+__all__ = ["label_types", "metrics", "nutrients", "rda_tables", "retention_tables"]
@@ -3,10 +3,10 @@ Admin Label Types Endpoints
 """
 
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, delete, insert
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
@@ -25,6 +25,7 @@ from app.schemas import (
     LabelTypeNutrientBulkUpdate,
     PaginatedResponse,
 )
+from app.services.reference_cache import reference_cache, LABEL_TYPES
 
 router = APIRouter()
 
@@ -206,6 +207,7 @@ async def update_label_type(
             value = value.model_dump()
         setattr(label_type, field, value)
 
+    await reference_cache.bump(db, LABEL_TYPES)
     await db.commit()
     await db.refresh(label_type)
 
@@ -237,6 +239,7 @@ async def delete_label_type(
         )
 
     await db.delete(label_type)
+    await reference_cache.bump(db, LABEL_TYPES)
     await db.commit()
 
 
@@ -380,49 +383,64 @@ async def bulk_update_label_type_nutrients(
 
     This replaces all existing nutrient configs with the provided list.
     """
-    # Verify label type exists and is not system
+    # Verify label type exists
     result = await db.execute(
-        select(LabelType).where(LabelType.id == label_type_id)
+        select(LabelType.id).where(LabelType.id == label_type_id)
     )
-    label_type = result.scalar_one_or_none()
-
-    if not label_type:
+    if not result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Label type not found"
         )
 
-    # Delete existing configs
-    result = await db.execute(
-        select(LabelTypeNutrient).where(LabelTypeNutrient.label_type_id == label_type_id)
-    )
-    existing_configs = result.scalars().all()
-    for config in existing_configs:
-        await db.delete(config)
-
-    # Create new configs
-    for nutrient_data in data.nutrients:
-        # Verify nutrient exists
+    # Validate all submitted nutrients in one query (also fetches display info for the response)
+    nutrient_ids = {nutrient_data.nutrient_id for nutrient_data in data.nutrients}
+    nutrients = {}
+    if nutrient_ids:
         result = await db.execute(
-            select(NutrientDefinition).where(NutrientDefinition.id == nutrient_data.nutrient_id)
+            select(NutrientDefinition.id, NutrientDefinition.key, NutrientDefinition.name_en)
+            .where(NutrientDefinition.id.in_(nutrient_ids))
         )
-        nutrient = result.scalar_one_or_none()
-        if not nutrient:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Nutrient with ID '{nutrient_data.nutrient_id}' not found"
-            )
+        nutrients = {row.id: row for row in result.all()}
 
-        config = LabelTypeNutrient(
-            label_type_id=label_type_id,
-            **nutrient_data.model_dump()
+    missing = [nid for nid in nutrient_ids if nid not in nutrients]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Nutrient with ID '{missing[0]}' not found"
         )
-        db.add(config)
 
+    # Delete existing configs
+    await db.execute(
+        delete(LabelTypeNutrient).where(LabelTypeNutrient.label_type_id == label_type_id)
+    )
+
+    # Create new configs
+    rows = [
+        {
+            "id": uuid4(),
+            "label_type_id": label_type_id,
+            **nutrient_data.model_dump(),
+        }
+        for nutrient_data in data.nutrients
+    ]
+    if rows:
+        await db.execute(insert(LabelTypeNutrient), rows)
+
+    await reference_cache.bump(db, LABEL_TYPES)
     await db.commit()
 
-    # Return updated list
-    return await get_label_type_nutrients(label_type_id, db, _admin)
+    # Build response from submitted data
+    response = []
+    for row in sorted(rows, key=lambda r: r["display_order"]):
+        nutrient = nutrients[row["nutrient_id"]]
+        response.append({
+            **row,
+            "nutrient_key": nutrient.key,
+            "nutrient_name_en": nutrient.name_en,
+        })
+
+    return response
 
 
 @router.post("/{label_type_id}/nutrients/reorder", response_model=List[LabelTypeNutrientResponse])
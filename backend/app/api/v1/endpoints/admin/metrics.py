@@ -0,0 +1,35 @@
+"""
+Admin Metrics Endpoints
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_admin
+from app.services.admission import export_admission
+from app.services.single_flight import single_flight_stats
+
+router = APIRouter()
+
+
+@router.get("/single-flight")
+async def get_single_flight_metrics(
+    _admin: dict = Depends(require_admin),
+):
+    """Request coalescing counters for this worker process (admin only)
+
+    `hits` are requests that joined an identical in-flight calculation or
+    render, `misses` are those that ran it.
+    """
+    return single_flight_stats()
+
+
+@router.get("/admission")
+async def get_admission_metrics(
+    _admin: dict = Depends(require_admin),
+):
+    """Export admission counters for this worker process (admin only)
+
+    Includes active renders, queue depth, admitted and rejected exports by
+    reason, and average/maximum time spent waiting for a render slot.
+    """
+    return {export_admission.name: export_admission.stats()}
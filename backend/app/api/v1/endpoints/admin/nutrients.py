@@ -2,11 +2,12 @@
 Admin Nutrient Definition Endpoints
 """
 
+from datetime import datetime
 from typing import List, Optional
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, update
 
 from app.core.database import get_db
 from app.core.security import require_admin
@@ -18,12 +19,14 @@ from app.schemas import (
     NutrientDefinitionResponse,
     PaginatedResponse,
 )
+from app.services.reference_cache import reference_cache, NUTRIENTS
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[NutrientDefinitionResponse])
 async def list_nutrients(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     category: Optional[str] = None,
@@ -32,43 +35,54 @@ async def list_nutrients(
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
-    """List all nutrient definitions (admin only)"""
-    query = select(NutrientDefinition)
-
-    if category:
-        query = query.where(NutrientDefinition.category == category)
-    if is_active is not None:
-        query = query.where(NutrientDefinition.is_active == is_active)
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (NutrientDefinition.name_en.ilike(search_pattern)) |
-            (NutrientDefinition.key.ilike(search_pattern))
-        )
+    """List all nutrient definitions (admin only, cached, supports If-None-Match)"""
+    async def load():
+        query = select(NutrientDefinition)
+
+        if category:
+            query = query.where(NutrientDefinition.category == category)
+        if is_active is not None:
+            query = query.where(NutrientDefinition.is_active == is_active)
+        if search:
+            search_pattern = f"%{search}%"
+            query = query.where(
+                (NutrientDefinition.name_en.ilike(search_pattern)) |
+                (NutrientDefinition.key.ilike(search_pattern))
+            )
 
-    query = query.order_by(NutrientDefinition.default_order, NutrientDefinition.name_en)
-    query = query.offset(skip).limit(limit)
+        query = query.order_by(NutrientDefinition.default_order, NutrientDefinition.name_en)
+        query = query.offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    nutrients = result.scalars().all()
+        result = await db.execute(query)
+        return [
+            NutrientDefinitionResponse.model_validate(n).model_dump(mode="json")
+            for n in result.scalars().all()
+        ]
 
-    return nutrients
+    entry = await reference_cache.get(
+        db, NUTRIENTS, ("list", skip, limit, category, is_active, search), load
+    )
+    return entry.respond(request)
 
 
 @router.get("/categories", response_model=List[str])
 async def get_nutrient_categories(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get all unique nutrient categories (admin only)"""
-    result = await db.execute(
-        select(NutrientDefinition.category)
-        .distinct()
-        .where(NutrientDefinition.category.isnot(None))
-        .order_by(NutrientDefinition.category)
-    )
-    categories = [row[0] for row in result.fetchall()]
-    return categories
+    async def load():
+        result = await db.execute(
+            select(NutrientDefinition.category)
+            .distinct()
+            .where(NutrientDefinition.category.isnot(None))
+            .order_by(NutrientDefinition.category)
+        )
+        return [row[0] for row in result.fetchall()]
+
+    entry = await reference_cache.get(db, NUTRIENTS, ("categories",), load)
+    return entry.respond(request)
 
 
 @router.post("", response_model=NutrientDefinitionResponse, status_code=status.HTTP_201_CREATED)
@@ -101,6 +115,7 @@ async def create_nutrient(
 
     nutrient = NutrientDefinition(**data.model_dump())
     db.add(nutrient)
+    await reference_cache.bump(db, NUTRIENTS)
     await db.commit()
     await db.refresh(nutrient)
 
@@ -110,43 +125,53 @@ async def create_nutrient(
 @router.get("/{nutrient_id}", response_model=NutrientDefinitionResponse)
 async def get_nutrient(
     nutrient_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get a nutrient definition by ID (admin only)"""
-    result = await db.execute(
-        select(NutrientDefinition).where(NutrientDefinition.id == nutrient_id)
-    )
-    nutrient = result.scalar_one_or_none()
-
-    if not nutrient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Nutrient not found"
+    async def load():
+        result = await db.execute(
+            select(NutrientDefinition).where(NutrientDefinition.id == nutrient_id)
         )
+        nutrient = result.scalar_one_or_none()
 
-    return nutrient
+        if not nutrient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Nutrient not found"
+            )
+
+        return NutrientDefinitionResponse.model_validate(nutrient).model_dump(mode="json")
+
+    entry = await reference_cache.get(db, NUTRIENTS, ("id", nutrient_id), load)
+    return entry.respond(request)
 
 
 @router.get("/by-key/{key}", response_model=NutrientDefinitionResponse)
 async def get_nutrient_by_key(
     key: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get a nutrient definition by key (admin only)"""
-    result = await db.execute(
-        select(NutrientDefinition).where(NutrientDefinition.key == key)
-    )
-    nutrient = result.scalar_one_or_none()
-
-    if not nutrient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Nutrient with key '{key}' not found"
+    async def load():
+        result = await db.execute(
+            select(NutrientDefinition).where(NutrientDefinition.key == key)
         )
+        nutrient = result.scalar_one_or_none()
 
-    return nutrient
+        if not nutrient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Nutrient with key '{key}' not found"
+            )
+
+        return NutrientDefinitionResponse.model_validate(nutrient).model_dump(mode="json")
+
+    entry = await reference_cache.get(db, NUTRIENTS, ("key", key), load)
+    return entry.respond(request)
 
 
 @router.put("/{nutrient_id}", response_model=NutrientDefinitionResponse)
@@ -195,6 +220,7 @@ async def update_nutrient(
     for field, value in update_data.items():
         setattr(nutrient, field, value)
 
+    await reference_cache.bump(db, NUTRIENTS)
     await db.commit()
     await db.refresh(nutrient)
 
@@ -249,40 +275,85 @@ async def delete_nutrient(
         )
 
     await db.delete(nutrient)
+    await reference_cache.bump(db, NUTRIENTS)
     await db.commit()
 
 
 @router.post("/bulk", response_model=List[NutrientDefinitionResponse], status_code=status.HTTP_201_CREATED)
 async def bulk_create_nutrients(
     nutrients: List[NutrientDefinitionCreate],
+    upsert: bool = Query(False, description="Update existing nutrients matched by key instead of skipping them"),
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Bulk create nutrient definitions (admin only)
 
-    Skips nutrients that already exist by key.
+    Skips nutrients that already exist by key, or updates them when upsert=true.
+    Keys and parent_key references are validated with a single query and all
+    rows are written with one multi-row INSERT (plus one bulk UPDATE in upsert mode).
     """
-    created = []
+    keys = [nutrient_data.key for nutrient_data in nutrients]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duplicate nutrient key(s) in request: {', '.join(duplicates)}"
+        )
 
-    for nutrient_data in nutrients:
-        # Check if key already exists
+    # Fetch existing nutrients and referenced parents in one query
+    parent_keys = {n.parent_key for n in nutrients if n.parent_key}
+    lookup_keys = set(keys) | parent_keys
+    existing = {}
+    if lookup_keys:
         result = await db.execute(
-            select(NutrientDefinition).where(NutrientDefinition.key == nutrient_data.key)
+            select(NutrientDefinition).where(NutrientDefinition.key.in_(lookup_keys))
         )
-        if result.scalar_one_or_none():
-            continue  # Skip existing
+        existing = {nutrient.key: nutrient for nutrient in result.scalars().all()}
+
+    # Parents may be existing nutrients or other nutrients in this batch
+    known_keys = set(existing) | set(keys)
+    for nutrient_data in nutrients:
+        if nutrient_data.parent_key and nutrient_data.parent_key not in known_keys:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Parent nutrient with key '{nutrient_data.parent_key}' not found"
+            )
 
-        nutrient = NutrientDefinition(**nutrient_data.model_dump())
-        db.add(nutrient)
-        created.append(nutrient)
+    now = datetime.utcnow()
+    insert_rows = []
+    update_rows = []
+    response = []
 
-    await db.commit()
+    for nutrient_data in nutrients:
+        current = existing.get(nutrient_data.key)
+
+        if current is None:
+            row = {
+                "id": uuid4(),
+                **nutrient_data.model_dump(),
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            insert_rows.append(row)
+            response.append(row)
+        elif upsert:
+            row = {"id": current.id, **nutrient_data.model_dump(), "updated_at": now}
+            update_rows.append(row)
+            response.append({**row, "is_active": current.is_active, "created_at": current.created_at})
+        # Otherwise skip existing
+
+    if insert_rows:
+        # render_nulls keeps rows with differing None fields in a single batch
+        await db.execute(insert(NutrientDefinition).execution_options(render_nulls=True), insert_rows)
+    if update_rows:
+        await db.execute(update(NutrientDefinition), update_rows)
+    if insert_rows or update_rows:
+        await reference_cache.bump(db, NUTRIENTS)
 
-    # Refresh all created nutrients
-    for nutrient in created:
-        await db.refresh(nutrient)
+    await db.commit()
 
-    return created
+    return response
 
 
 @router.put("/{nutrient_id}/toggle-active", response_model=NutrientDefinitionResponse)
@@ -304,6 +375,7 @@ async def toggle_nutrient_active(
         )
 
     nutrient.is_active = not nutrient.is_active
+    await reference_cache.bump(db, NUTRIENTS)
     await db.commit()
     await db.refresh(nutrient)
 
@@ -4,7 +4,7 @@ Admin RDA Table Endpoints
 
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -20,12 +20,14 @@ from app.schemas import (
     RDATableUpdate,
     RDATableResponse,
 )
+from app.services.reference_cache import reference_cache, RDA_TABLES, LABEL_TYPES
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[RDATableResponse])
 async def list_rda_tables(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     region: Optional[str] = None,
@@ -33,20 +35,27 @@ async def list_rda_tables(
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
-    """List all RDA tables (admin only)"""
-    query = select(RDATable)
+    """List all RDA tables (admin only, cached, supports If-None-Match)"""
+    async def load():
+        query = select(RDATable)
 
-    if region:
-        query = query.where(RDATable.region == region)
-    if is_active is not None:
-        query = query.where(RDATable.is_active == is_active)
+        if region:
+            query = query.where(RDATable.region == region)
+        if is_active is not None:
+            query = query.where(RDATable.is_active == is_active)
 
-    query = query.order_by(RDATable.name).offset(skip).limit(limit)
+        query = query.order_by(RDATable.name).offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    rda_tables = result.scalars().all()
+        result = await db.execute(query)
+        return [
+            RDATableResponse.model_validate(t).model_dump(mode="json")
+            for t in result.scalars().all()
+        ]
 
-    return rda_tables
+    entry = await reference_cache.get(
+        db, RDA_TABLES, ("list", skip, limit, region, is_active), load
+    )
+    return entry.respond(request)
 
 
 @router.post("", response_model=RDATableResponse, status_code=status.HTTP_201_CREATED)
@@ -85,6 +94,7 @@ async def create_rda_table(
 
     rda_table = RDATable(**rda_data)
     db.add(rda_table)
+    await reference_cache.bump(db, RDA_TABLES)
     await db.commit()
     await db.refresh(rda_table)
 
@@ -94,43 +104,53 @@ async def create_rda_table(
 @router.get("/{rda_table_id}", response_model=RDATableResponse)
 async def get_rda_table(
     rda_table_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get an RDA table by ID (admin only)"""
-    result = await db.execute(
-        select(RDATable).where(RDATable.id == rda_table_id)
-    )
-    rda_table = result.scalar_one_or_none()
-
-    if not rda_table:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="RDA table not found"
+    async def load():
+        result = await db.execute(
+            select(RDATable).where(RDATable.id == rda_table_id)
         )
+        rda_table = result.scalar_one_or_none()
 
-    return rda_table
+        if not rda_table:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="RDA table not found"
+            )
+
+        return RDATableResponse.model_validate(rda_table).model_dump(mode="json")
+
+    entry = await reference_cache.get(db, RDA_TABLES, ("id", rda_table_id), load)
+    return entry.respond(request)
 
 
 @router.get("/by-code/{code}", response_model=RDATableResponse)
 async def get_rda_table_by_code(
     code: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get an RDA table by code (admin only)"""
-    result = await db.execute(
-        select(RDATable).where(RDATable.code == code)
-    )
-    rda_table = result.scalar_one_or_none()
-
-    if not rda_table:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"RDA table with code '{code}' not found"
+    async def load():
+        result = await db.execute(
+            select(RDATable).where(RDATable.code == code)
         )
+        rda_table = result.scalar_one_or_none()
 
-    return rda_table
+        if not rda_table:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"RDA table with code '{code}' not found"
+            )
+
+        return RDATableResponse.model_validate(rda_table).model_dump(mode="json")
+
+    entry = await reference_cache.get(db, RDA_TABLES, ("code", code), load)
+    return entry.respond(request)
 
 
 @router.put("/{rda_table_id}", response_model=RDATableResponse)
@@ -187,6 +207,7 @@ async def update_rda_table(
     for field, value in update_data.items():
         setattr(rda_table, field, value)
 
+    await reference_cache.bump(db, RDA_TABLES)
     await db.commit()
     await db.refresh(rda_table)
 
@@ -212,6 +233,7 @@ async def delete_rda_table(
         )
 
     await db.delete(rda_table)
+    await reference_cache.bump(db, RDA_TABLES)
     await db.commit()
 
 
@@ -272,6 +294,7 @@ async def apply_rda_to_label_type(
                     config.daily_value_unit = rda_units[config.nutrient.key]
                 updated_count += 1
 
+    await reference_cache.bump(db, LABEL_TYPES)
     await db.commit()
 
     return {
@@ -327,6 +350,7 @@ async def duplicate_rda_table(
         is_default=False,  # Duplicates are never default
     )
     db.add(new_rda_table)
+    await reference_cache.bump(db, RDA_TABLES)
     await db.commit()
     await db.refresh(new_rda_table)
 
@@ -335,15 +359,19 @@ async def duplicate_rda_table(
 
 @router.get("/regions/list", response_model=List[str])
 async def get_rda_regions(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     _admin: dict = Depends(require_admin),
 ):
     """Get all unique regions from RDA tables (admin only)"""
-    result = await db.execute(
-        select(RDATable.region)
-        .distinct()
-        .where(RDATable.region.isnot(None))
-        .order_by(RDATable.region)
-    )
-    regions = [row[0] for row in result.fetchall()]
-    return regions
+    async def load():
+        result = await db.execute(
+            select(RDATable.region)
+            .distinct()
+            .where(RDATable.region.isnot(None))
+            .order_by(RDATable.region)
+        )
+        return [row[0] for row in result.fetchall()]
+
+    entry = await reference_cache.get(db, RDA_TABLES, ("regions",), load)
+    return entry.respond(request)
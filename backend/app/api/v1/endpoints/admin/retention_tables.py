@@ -0,0 +1,213 @@
+"""
+Admin Retention Table Endpoints
+"""
+
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from app.core.database import get_db
+from app.core.security import require_admin
+from app.models.product import Product
+from app.models.retention_table import RetentionTable
+from app.schemas import (
+    RetentionTableCreate,
+    RetentionTableUpdate,
+    RetentionTableResponse,
+)
+from app.services.jobs import enqueue
+from app.services.label_snapshots import invalidate_content_hashes
+from app.services.recipe_graph import recompute_for_retention_table
+from app.services.reference_cache import reference_cache, RETENTION_TABLES
+
+router = APIRouter()
+
+
+def _serialize_factors(factors: dict) -> dict:
+    for key, value in factors.items():
+        if value is not None and value < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Retention factor for '{key}' must not be negative"
+            )
+    return {k: float(v) if v is not None else None for k, v in factors.items()}
+
+
+async def _get_retention_table(db: AsyncSession, retention_table_id: UUID) -> RetentionTable:
+    result = await db.execute(
+        select(RetentionTable).where(RetentionTable.id == retention_table_id)
+    )
+    retention_table = result.scalar_one_or_none()
+
+    if not retention_table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Retention table not found"
+        )
+    return retention_table
+
+
+@router.get("", response_model=List[RetentionTableResponse])
+async def list_retention_tables(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """List all retention tables (admin only, cached, supports If-None-Match)"""
+    async def load():
+        query = select(RetentionTable)
+
+        if is_active is not None:
+            query = query.where(RetentionTable.is_active == is_active)
+
+        query = query.order_by(RetentionTable.name).offset(skip).limit(limit)
+
+        result = await db.execute(query)
+        return [
+            RetentionTableResponse.model_validate(t).model_dump(mode="json")
+            for t in result.scalars().all()
+        ]
+
+    entry = await reference_cache.get(
+        db, RETENTION_TABLES, ("list", skip, limit, is_active), load
+    )
+    return entry.respond(request)
+
+
+@router.post("", response_model=RetentionTableResponse, status_code=status.HTTP_201_CREATED)
+async def create_retention_table(
+    data: RetentionTableCreate,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """Create a new retention table (admin only)"""
+    result = await db.execute(
+        select(RetentionTable).where(RetentionTable.code == data.code)
+    )
+    if result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Retention table with code '{data.code}' already exists"
+        )
+
+    table_data = data.model_dump()
+    table_data["factors"] = _serialize_factors(table_data["factors"])
+
+    retention_table = RetentionTable(**table_data)
+    db.add(retention_table)
+    await reference_cache.bump(db, RETENTION_TABLES)
+    await db.commit()
+    await db.refresh(retention_table)
+
+    return retention_table
+
+
+@router.get("/{retention_table_id}", response_model=RetentionTableResponse)
+async def get_retention_table(
+    retention_table_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """Get a retention table by ID (admin only)"""
+    async def load():
+        retention_table = await _get_retention_table(db, retention_table_id)
+        return RetentionTableResponse.model_validate(retention_table).model_dump(mode="json")
+
+    entry = await reference_cache.get(db, RETENTION_TABLES, ("id", retention_table_id), load)
+    return entry.respond(request)
+
+
+@router.put("/{retention_table_id}", response_model=RetentionTableResponse)
+async def update_retention_table(
+    retention_table_id: UUID,
+    data: RetentionTableUpdate,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """Update a retention table (admin only)
+
+    When the factors change, every product cooked with this table (and every
+    recipe using one of them as a sub-recipe) is recomputed by a queued job.
+    """
+    retention_table = await _get_retention_table(db, retention_table_id)
+
+    # Check code uniqueness if changing
+    if data.code and data.code != retention_table.code:
+        result = await db.execute(
+            select(RetentionTable).where(RetentionTable.code == data.code)
+        )
+        if result.scalar_one_or_none():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Retention table with code '{data.code}' already exists"
+            )
+
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data.get("factors") is not None:
+        update_data["factors"] = _serialize_factors(update_data["factors"])
+    factors_changed = "factors" in update_data and update_data["factors"] != retention_table.factors
+
+    for field, value in update_data.items():
+        setattr(retention_table, field, value)
+
+    if factors_changed:
+        result = await db.execute(
+            select(Product.id).where(Product.retention_table_id == retention_table_id)
+        )
+        await invalidate_content_hashes(db, result.scalars().all())
+        # Queued in the edit's transaction, so the recompute survives a restart
+        await enqueue(
+            db, "recalculate_retention_table", {"retention_table_id": str(retention_table_id)}, priority=10
+        )
+    await reference_cache.bump(db, RETENTION_TABLES)
+    await db.commit()
+    await db.refresh(retention_table)
+
+    return retention_table
+
+
+@router.delete("/{retention_table_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_retention_table(
+    retention_table_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """Delete a retention table (admin only)"""
+    retention_table = await _get_retention_table(db, retention_table_id)
+
+    result = await db.execute(
+        select(func.count(Product.id)).where(Product.retention_table_id == retention_table_id)
+    )
+    in_use = result.scalar()
+    if in_use:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Retention table is used by {in_use} product(s)"
+        )
+
+    await db.delete(retention_table)
+    await reference_cache.bump(db, RETENTION_TABLES)
+    await db.commit()
+
+
+@router.post("/{retention_table_id}/recompute", status_code=status.HTTP_200_OK)
+async def recompute_retention_table_products(
+    retention_table_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    _admin: dict = Depends(require_admin),
+):
+    """Recompute every product affected by a retention table now (admin only)"""
+    retention_table = await _get_retention_table(db, retention_table_id)
+    updated_count = await recompute_for_retention_table(retention_table_id)
+
+    return {
+        "message": f"Recomputed {updated_count} products",
+        "retention_table": retention_table.name,
+        "updated_count": updated_count
+    }
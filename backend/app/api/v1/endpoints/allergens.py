@@ -2,7 +2,7 @@
 Allergen Endpoints
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
@@ -10,22 +10,28 @@ from typing import List
 from app.core.database import get_db
 from app.models.allergen import Allergen
 from app.schemas import AllergenResponse
+from app.services.reference_cache import reference_cache, ALLERGENS
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[AllergenResponse])
 async def list_allergens(
+    request: Request,
     major_only: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """List all allergens"""
-    query = select(Allergen).where(Allergen.is_active == True)
+    """List all allergens (served from the reference data cache, supports If-None-Match)"""
+    async def load():
+        query = select(Allergen).where(Allergen.is_active == True)
+        
+        if major_only:
+            query = query.where(Allergen.is_major == True)
+        
+        query = query.order_by(Allergen.is_major.desc(), Allergen.name)
+        
+        result = await db.execute(query)
+        return [AllergenResponse.model_validate(a).model_dump(mode="json") for a in result.scalars().all()]
     
-    if major_only:
-        query = query.where(Allergen.is_major == True)
-    
-    query = query.order_by(Allergen.is_major.desc(), Allergen.name)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    entry = await reference_cache.get(db, ALLERGENS, ("list", major_only), load)
+    return entry.respond(request)
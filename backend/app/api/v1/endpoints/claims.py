@@ -0,0 +1,119 @@
+"""
+Nutrient Claim Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.product import Product, ProductClaim
+from app.schemas import (
+    ClaimConditionResponse, ClaimRuleResponse,
+    ProductClaimResponse, ClaimRefreshResponse
+)
+from app.services.claims import CLAIM_RULES, refresh_claims
+
+router = APIRouter()
+
+
+def _claims_query(user_id: UUID):
+    return (
+        select(
+            ProductClaim.product_id,
+            Product.name.label("product_name"),
+            ProductClaim.regulation,
+            ProductClaim.claim,
+            ProductClaim.evaluated_at,
+        )
+        .join(Product, ProductClaim.product_id == Product.id)
+        .where(Product.user_id == user_id)
+    )
+
+
+@router.get("/rules", response_model=List[ClaimRuleResponse])
+async def list_claim_rules(
+    regulation: Optional[str] = None,
+):
+    """List the claim rules per regulation"""
+    if regulation and regulation not in CLAIM_RULES:
+        raise HTTPException(status_code=400, detail=f"Unknown claim regulation '{regulation}'")
+
+    return [
+        ClaimRuleResponse(
+            regulation=code,
+            code=rule.code,
+            name=rule.name,
+            conditions=[
+                ClaimConditionResponse(
+                    nutrient=c.nutrient, op=c.op, value=c.value, basis=c.basis, liquid_value=c.liquid_value
+                )
+                for c in rule.conditions
+            ],
+        )
+        for code, rules in CLAIM_RULES.items()
+        if not regulation or code == regulation
+        for rule in rules
+    ]
+
+
+@router.get("", response_model=List[ProductClaimResponse])
+async def list_claims(
+    regulation: Optional[str] = None,
+    claim: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List products qualifying for claims (from the materialized results; see POST /claims/refresh)"""
+    query = _claims_query(current_user["id"])
+
+    if regulation:
+        query = query.where(ProductClaim.regulation == regulation)
+    if claim:
+        query = query.where(ProductClaim.claim == claim)
+
+    query = query.order_by(Product.name, ProductClaim.regulation, ProductClaim.claim).offset(skip).limit(limit)
+
+    result = await db.execute(query)
+    return [ProductClaimResponse(**row._mapping) for row in result.all()]
+
+
+@router.get("/products/{product_id}", response_model=List[ProductClaimResponse])
+async def get_product_claims(
+    product_id: UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the claims one product qualifies for"""
+    result = await db.execute(
+        select(Product.id).where(Product.id == product_id, Product.user_id == current_user["id"])
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    result = await db.execute(
+        _claims_query(current_user["id"])
+        .where(ProductClaim.product_id == product_id)
+        .order_by(ProductClaim.regulation, ProductClaim.claim)
+    )
+    return [ProductClaimResponse(**row._mapping) for row in result.all()]
+
+
+@router.post("/refresh", response_model=ClaimRefreshResponse)
+async def refresh_product_claims(
+    force: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-evaluate claims for the current user's products
+
+    Only products whose recipe, serving size or the rule set changed since the
+    last refresh are rewritten, unless `force` is set.
+    """
+    evaluated, updated = await refresh_claims(db, user_id=current_user["id"], force=force)
+    return ClaimRefreshResponse(evaluated=evaluated, updated=updated)
@@ -11,7 +11,10 @@ from uuid import UUID
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.ingredient import Ingredient
+from app.models.product import ProductIngredient
 from app.schemas import IngredientCreate, IngredientUpdate, IngredientResponse
+from app.services.jobs import enqueue
+from app.services.label_snapshots import invalidate_content_hashes
 
 router = APIRouter()
 
@@ -82,7 +85,7 @@ async def update_ingredient(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Update an ingredient"""
+    """Update an ingredient (recipes using it are recalculated by a queued job)"""
     result = await db.execute(
         select(Ingredient).where(Ingredient.id == ingredient_id)
     )
@@ -95,6 +98,13 @@ async def update_ingredient(
     for field, value in update_data.items():
         setattr(ingredient, field, value)
     
+    # Recipes using it stop validating nutrition/export ETags until the job rehashes them
+    result = await db.execute(
+        select(ProductIngredient.product_id).where(ProductIngredient.ingredient_id == ingredient_id)
+    )
+    await invalidate_content_hashes(db, result.scalars().all())
+    # Queued in the edit's transaction, so the rehash can't be lost between the two
+    await enqueue(db, "recalculate_ingredient", {"ingredient_id": str(ingredient_id)}, priority=10)
     await db.commit()
     await db.refresh(ingredient)
     
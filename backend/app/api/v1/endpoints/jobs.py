@@ -0,0 +1,148 @@
+"""
+Job Endpoints - Queue background work and follow its progress
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.job import Job
+from app.models.label import Label
+from app.models.product import Product
+from app.schemas import JobCreate, JobResponse
+from app.services.admission import export_admission
+from app.services.jobs import QUEUED, RUNNING, CANCELLED, enqueue
+
+router = APIRouter()
+
+# Kinds users may queue themselves; the rest are queued by the system or admins
+USER_JOB_KINDS = {"compliance_sweep", "export_labels"}
+ADMIN_JOB_KINDS = {"recalculate_ingredient", "recalculate_retention_table", "backfill_content_hashes", "seed"}
+
+
+async def _get_job(db: AsyncSession, job_id: UUID, current_user: dict) -> Job:
+    query = select(Job).where(Job.id == job_id)
+    if not current_user.get("is_admin", False):
+        query = query.where(Job.user_id == current_user["id"])
+    result = await db.execute(query)
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def _validate_export(db: AsyncSession, payload: dict, user_id: UUID) -> dict:
+    if payload.get("format", "pdf") not in ("png", "pdf", "svg"):
+        raise HTTPException(status_code=400, detail="Invalid export format")
+    try:
+        label_ids = {UUID(str(label_id)) for label_id in payload.get("label_ids", [])}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="label_ids must be label UUIDs")
+    if not label_ids:
+        raise HTTPException(status_code=400, detail="label_ids is required")
+
+    result = await db.execute(
+        select(func.count(Label.id))
+        .join(Product, Label.product_id == Product.id)
+        .where(Label.id.in_(label_ids), Product.user_id == user_id)
+    )
+    if result.scalar() != len(label_ids):
+        raise HTTPException(status_code=404, detail="Label not found")
+    return {"format": payload.get("format", "pdf"), "label_ids": sorted(str(label_id) for label_id in label_ids)}
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    kind: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the current user's jobs, newest first"""
+    query = select(Job).where(Job.user_id == current_user["id"])
+
+    if status_filter:
+        query = query.where(Job.status == status_filter)
+    if kind:
+        query = query.where(Job.kind == kind)
+
+    query = query.order_by(Job.created_at.desc()).offset(skip).limit(limit)
+
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a job; poll GET /jobs/{id} for its progress and result"""
+    if job_data.kind in ADMIN_JOB_KINDS:
+        if not current_user.get("is_admin", False):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    elif job_data.kind not in USER_JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind '{job_data.kind}'")
+
+    payload = dict(job_data.payload)
+    if job_data.kind == "export_labels":
+        payload = await _validate_export(db, payload, current_user["id"])
+        # A bulk export costs as much of the user's export rate as its size allows
+        export_admission.check_rate(current_user["id"], cost=len(payload["label_ids"]))
+    elif job_data.kind == "compliance_sweep":
+        payload = {"force": bool(payload.get("force"))}
+    elif job_data.kind == "recalculate_ingredient":
+        try:
+            payload = {"ingredient_id": str(UUID(str(payload.get("ingredient_id"))))}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ingredient_id must be an ingredient UUID")
+    elif job_data.kind == "recalculate_retention_table":
+        try:
+            payload = {"retention_table_id": str(UUID(str(payload.get("retention_table_id"))))}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="retention_table_id must be a retention table UUID")
+
+    job = await enqueue(
+        db, job_data.kind, payload, user_id=current_user["id"], priority=job_data.priority
+    )
+    await db.commit()
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a job's status, progress and result"""
+    return await _get_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a queued or running job (a running job stops at its next progress update)"""
+    job = await _get_job(db, job_id, current_user)
+
+    if job.status not in (QUEUED, RUNNING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is already {job.status}")
+
+    job.status = CANCELLED
+    job.finished_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(job)
+
+    return job
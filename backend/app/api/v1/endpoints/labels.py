@@ -2,24 +2,55 @@
 Label Endpoints - Generate and export labels
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_, update
 from sqlalchemy.orm import selectinload
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.http_cache import PRIVATE_IMMUTABLE, PRIVATE_REVALIDATE, conditional, make_etag
 from app.core.security import get_current_user
 from app.models.label import Label
 from app.models.product import Product
 from app.models.template import Template
-from app.schemas import LabelCreate, LabelResponse, LabelExportRequest
-from app.services.label_exporter import LabelExporter
+from app.schemas import (
+    LabelCreate, LabelResponse, LabelExportRequest,
+    ComplianceSweepResponse, StaleLabelResponse
+)
+from app.services.admission import export_admission
+from app.services.blob_store import BlobNotFound, get_blob_store
+from app.services.compliance import check_labels, run_compliance_sweep
+from app.services.label_snapshots import (
+    capture_snapshot, label_content_hash, product_content_hash, template_regulation
+)
+from app.services.recipe_graph import RecipeEvaluator, RecipeError
+from app.services.single_flight import export_flight
+from app.services.units import UnitConversionError
 from app.services.nutrition_calculator import NutritionCalculator
 
 router = APIRouter()
-exporter = LabelExporter()
+
+
+@lru_cache(maxsize=1)
+def get_exporter():
+    """Load the export/rendering stack on first use rather than at worker startup"""
+    from app.services.label_exporter import LabelExporter
+    return LabelExporter()
+
+
+EXPORT_MEDIA_TYPES = {
+    "png": "image/png",
+    "pdf": "application/pdf",
+    "svg": "image/svg+xml",
+}
+
+
+def _render_key(product: Product, template: Template) -> tuple:
+    """What a render depends on: the product's and the template's current state"""
+    return (product.id, product.content_hash, product.updated_at, template.id, template.version)
 
 
 @router.get("", response_model=List[LabelResponse])
@@ -92,41 +123,47 @@ async def preview_label(
         "potassium": 0,
     }
     
-    # Generate HTML preview
-    html = await exporter.render_html(
-        template_data={
-            "type": template.type,
-            "width": template.width,
-            "height": template.height,
-            "language": template.language,
-            "elements": template.elements,
-            "styles": template.styles,
-            "nutrition_config": template.nutrition_config,
-            "display_preferences": template.display_preferences,
-        },
-        product_data={
-            "name": product.name,
-            "ingredients_text": "",  # TODO: Build from product ingredients
-            "allergens_text": "",    # TODO: Build from product allergens
-        },
-        nutrition=nutrition
+    # Generate HTML preview (identical concurrent previews share one render)
+    html = await export_flight.do(
+        ("html", _render_key(product, template)),
+        lambda: get_exporter().render_html(
+            template_data={
+                "type": template.type,
+                "width": template.width,
+                "height": template.height,
+                "language": template.language,
+                "elements": template.elements,
+                "styles": template.styles,
+                "nutrition_config": template.nutrition_config,
+                "display_preferences": template.display_preferences,
+            },
+            product_data={
+                "name": product.name,
+                "ingredients_text": "",  # TODO: Build from product ingredients
+                "allergens_text": "",    # TODO: Build from product allergens
+            },
+            nutrition=nutrition
+        ),
     )
     
     return Response(content=html, media_type="text/html")
 
 
-@router.post("/export")
-async def export_label(
-    request: LabelExportRequest,
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Export label as PNG, PDF, or SVG"""
+async def _export(
+    export_request: LabelExportRequest,
+    http_request: Request,
+    current_user: dict,
+    db: AsyncSession,
+) -> Response:
+    """Render a label for the current state of a product and template
+
+    The ETag is derived from that state, so a GET whose If-None-Match matches
+    gets a 304 before rendering or spending the user's export rate.
+    """
     # Get product
     product_result = await db.execute(
         select(Product)
-        .where(Product.id == request.product_id, Product.user_id == current_user["id"])
-        .options(selectinload(Product.ingredients))
+        .where(Product.id == export_request.product_id, Product.user_id == current_user["id"])
     )
     product = product_result.scalar_one_or_none()
     
@@ -135,13 +172,25 @@ async def export_label(
     
     # Get template
     template_result = await db.execute(
-        select(Template).where(Template.id == request.template_id)
+        select(Template).where(Template.id == export_request.template_id)
     )
     template = template_result.scalar_one_or_none()
     
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
+    media_type = EXPORT_MEDIA_TYPES.get(export_request.format)
+    if media_type is None:
+        raise HTTPException(status_code=400, detail="Invalid export format")
+    
+    render_key = _render_key(product, template)
+    # No ETag while the product's content hash is being recomputed after an edit
+    etag = make_etag(export_request.format, render_key) if product.content_hash else None
+    if etag:
+        not_modified = conditional(http_request, None, etag)
+        if not_modified:
+            return not_modified
+    
     # Calculate nutrition
     nutrition = {
         "serving_size": float(product.serving_size),
@@ -166,33 +215,50 @@ async def export_label(
         "allergens_text": "",
     }
     
-    # Export based on format
-    if request.format == "png":
-        data = await exporter.export_png(template_data, product_data, nutrition)
-        return Response(
-            content=data,
-            media_type="image/png",
-            headers={"Content-Disposition": f"attachment; filename={product.name}_label.png"}
-        )
+    # Every export counts against the user's rate; identical concurrent exports
+    # share one render, which waits for a slot in the render pool
+    export_admission.check_rate(current_user["id"])
+    export = getattr(get_exporter(), f"export_{export_request.format}")
     
-    elif request.format == "pdf":
-        data = await exporter.export_pdf(template_data, product_data, nutrition)
-        return Response(
-            content=data,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={product.name}_label.pdf"}
-        )
+    async def render():
+        async with export_admission.slot():
+            return await export(template_data, product_data, nutrition)
     
-    elif request.format == "svg":
-        data = await exporter.export_svg(template_data, product_data, nutrition)
-        return Response(
-            content=data,
-            media_type="image/svg+xml",
-            headers={"Content-Disposition": f"attachment; filename={product.name}_label.svg"}
-        )
+    data = await export_flight.do((export_request.format, render_key), render)
     
-    else:
-        raise HTTPException(status_code=400, detail="Invalid export format")
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={product.name}_label.{export_request.format}",
+            **({"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE} if etag else {}),
+        }
+    )
+
+
+@router.post("/export")
+async def export_label(
+    request: LabelExportRequest,
+    http_request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Export label as PNG, PDF, or SVG"""
+    return await _export(request, http_request, current_user, db)
+
+
+@router.get("/export")
+async def get_label_export(
+    http_request: Request,
+    product_id: UUID,
+    template_id: UUID,
+    format: str = "png",
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Export label as PNG, PDF, or SVG; supports If-None-Match (304 without rendering)"""
+    request = LabelExportRequest(product_id=product_id, template_id=template_id, format=format)
+    return await _export(request, http_request, current_user, db)
 
 
 @router.post("", response_model=LabelResponse, status_code=status.HTTP_201_CREATED)
@@ -201,28 +267,54 @@ async def create_label(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Save a generated label"""
+    """Save a generated label
+
+    The declared nutrition is captured into the label's snapshot, along with the
+    product content hash and template version it was captured from.
+    """
     # Verify product belongs to user
     product_result = await db.execute(
         select(Product)
         .where(Product.id == label_data.product_id, Product.user_id == current_user["id"])
+        .options(selectinload(Product.ingredients))
     )
-    if not product_result.scalar_one_or_none():
+    product = product_result.scalar_one_or_none()
+    if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Verify template exists
     template_result = await db.execute(
-        select(Template).where(Template.id == label_data.template_id)
+        select(Template)
+        .where(Template.id == label_data.template_id)
+        .options(selectinload(Template.label_type))
     )
-    if not template_result.scalar_one_or_none():
+    template = template_result.scalar_one_or_none()
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
+    evaluator = RecipeEvaluator(db)
+    try:
+        node = await evaluator.evaluate(product)
+    except (RecipeError, UnitConversionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    product_hash = product_content_hash(evaluator, product, node)
+    if product_hash != product.content_hash:
+        # Keep the stored hash in step with what this label was captured from
+        await db.execute(
+            update(Product),
+            [{"id": product.id, "content_hash": product_hash, "updated_at": product.updated_at}],
+        )
+    
     # Create label
     label = Label(
         product_id=label_data.product_id,
         template_id=label_data.template_id,
         name=label_data.name,
-        nutrition_snapshot={},  # TODO: Capture nutrition at time of creation
+        nutrition_snapshot=capture_snapshot(evaluator, product, node, template_regulation(template)),
+        product_hash=product_hash,
+        template_version=template.version,
+        content_hash=label_content_hash(product_hash, template),
     )
     
     db.add(label)
@@ -232,6 +324,129 @@ async def create_label(
     return label
 
 
+@router.get("/stale", response_model=List[StaleLabelResponse])
+async def list_stale_labels(
+    product_id: UUID = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List labels whose product or template changed since they were captured (need reprinting)
+
+    Compares each label's stored hashes with the product's current content hash
+    and the template's version; nothing is recomputed or written. A product whose
+    hash is missing (an edit's refresh still pending, or not yet backfilled by the
+    backfill_content_hashes job) counts as changed.
+    """
+    product_changed = or_(
+        Label.product_hash.is_(None),
+        Product.content_hash.is_(None),
+        Label.product_hash != Product.content_hash,
+    )
+    template_changed = or_(Label.template_version.is_(None), Label.template_version != Template.version)
+    query = (
+        select(
+            Label.id,
+            Label.name,
+            Label.product_id,
+            Product.name.label("product_name"),
+            Label.template_id,
+            product_changed.label("product_changed"),
+            template_changed.label("template_changed"),
+            Label.created_at,
+        )
+        .join(Product, Label.product_id == Product.id)
+        .join(Template, Label.template_id == Template.id)
+        .where(Product.user_id == current_user["id"], or_(product_changed, template_changed))
+    )
+    
+    if product_id:
+        query = query.where(Label.product_id == product_id)
+    
+    result = await db.execute(query.order_by(Label.created_at.desc()))
+    return [StaleLabelResponse(**row._mapping) for row in result.all()]
+
+
+@router.post("/compliance-sweep", response_model=ComplianceSweepResponse)
+async def sweep_label_compliance(
+    force: bool = False,
+    current_user: dict = Depends(get_current_user),
+):
+    """Check all of the current user's labels for compliance
+
+    Labels whose snapshot, template and label type are unchanged since their
+    last check are skipped, unless `force` is set.
+    """
+    return await run_compliance_sweep(force=force, user_id=current_user["id"])
+
+
+@router.post("/{label_id}/check-compliance", response_model=LabelResponse)
+async def check_label_compliance(
+    label_id: UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-check one label for compliance"""
+    result = await db.execute(
+        select(Label.id)
+        .join(Product)
+        .where(Label.id == label_id, Product.user_id == current_user["id"])
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Label not found")
+
+    await check_labels(db, [label_id], force=True)
+
+    result = await db.execute(select(Label).where(Label.id == label_id).execution_options(populate_existing=True))
+    return result.scalar_one()
+
+
+@router.get("/{label_id}/exports/{export_format}")
+async def download_label_export(
+    label_id: UUID,
+    export_format: str,
+    http_request: Request,
+    v: Optional[str] = Query(None, description="Digest of the export (png_hash etc.); makes the response cacheable forever"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download a saved label's cached export (queue an export_labels job to create it)
+
+    Served from the blob store: a file response from local storage, or a
+    redirect to a presigned URL from S3. The ETag is the export's digest, and
+    requests naming the current digest in `v` get an immutable Cache-Control.
+    """
+    media_type = EXPORT_MEDIA_TYPES.get(export_format)
+    if media_type is None:
+        raise HTTPException(status_code=400, detail="Invalid export format")
+    
+    result = await db.execute(
+        select(Label.name, Product.name, getattr(Label, f"{export_format}_hash"))
+        .join(Product)
+        .where(Label.id == label_id, Product.user_id == current_user["id"])
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Label not found")
+    
+    label_name, product_name, digest = row
+    if not digest:
+        raise HTTPException(status_code=404, detail=f"Label has no {export_format} export yet")
+    
+    etag = f'"{digest}"'
+    cache_control = PRIVATE_IMMUTABLE if v == digest else PRIVATE_REVALIDATE
+    not_modified = conditional(http_request, None, etag, cache_control)
+    if not_modified:
+        return not_modified
+    
+    try:
+        return get_blob_store().response(
+            digest, media_type, f"{label_name or product_name}_label.{export_format}",
+            headers={"ETag": etag, "Cache-Control": cache_control},
+        )
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail=f"Label has no {export_format} export yet")
+
+
 @router.delete("/{label_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_label(
     label_id: UUID,
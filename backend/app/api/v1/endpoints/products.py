@@ -2,36 +2,263 @@
 Product Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, insert, update, or_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 
 from app.core.database import get_db
+from app.core.http_cache import conditional, make_etag
 from app.core.security import get_current_user
 from app.models.product import Product, ProductIngredient
 from app.models.ingredient import Ingredient
+from app.models.retention_table import RetentionTable
 from app.schemas import (
     ProductCreate, ProductUpdate, ProductResponse,
     ProductIngredientCreate, ProductIngredientResponse,
-    NutritionSummary
+    NutritionSummary, MultiRegimeNutrition,
+    RecipeOptimizationRequest, RecipeOptimizationResponse, OptimizedQuantity,
+    VariantEvaluationRequest, VariantEvaluationResponse, VariantNutrition
 )
 from app.services.nutrition_calculator import NutritionCalculator
+from app.services.label_snapshots import invalidate_content_hashes
+from app.services.daily_values import daily_values
+from app.services.reference_cache import reference_cache, RDA_TABLES, LABEL_TYPES
+from app.services.rounding import get_rounding_table
+from app.services.single_flight import nutrition_flight
+from app.services.recipe_graph import RecipeEvaluator, RecipeError, RecipeNode, base_unit_for, descendant_ids
+from app.services.recipe_optimizer import RecipeOptimizationError, optimize_quantities, recipe_totals
+from app.services.recipe_refresh import refresh_after_edit
+from app.services.recipe_variants import VariantError, evaluate_variants, variant_sources
+from app.services.units import UnitConversionError, conversion_factor
 
 router = APIRouter()
 
 
+async def _evaluate_recipe(db: AsyncSession, product: Product) -> Tuple[RecipeNode, Decimal]:
+    """Whole-recipe totals (sub-recipes included) and the serving size in the recipe's unit"""
+    evaluator = RecipeEvaluator(db)
+    try:
+        return await evaluator.evaluate(product), evaluator.serving_weight(product)
+    except (RecipeError, UnitConversionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _product_version(db: AsyncSession, product_id: UUID, user_id: UUID) -> tuple:
+    """Ownership check that also returns what identifies the product's current content
+
+    Used as the single-flight key prefix, so requests only share a calculation
+    for the same product in the same state.
+    """
+    result = await db.execute(
+        select(Product.content_hash, Product.updated_at)
+        .where(Product.id == product_id, Product.user_id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return (product_id, row.content_hash, row.updated_at)
+
+
+async def _nutrition_etag(db: AsyncSession, version: tuple, *params) -> Optional[str]:
+    """ETag of a calculated response: product content version, daily value versions and query
+
+    None until the product's content hash has been computed, since updated_at
+    alone doesn't change when an ingredient or sub-recipe does.
+    """
+    if version[1] is None:
+        return None
+    return make_etag(
+        version,
+        await reference_cache.version(db, RDA_TABLES),
+        await reference_cache.version(db, LABEL_TYPES),
+        *params,
+    )
+
+
+async def _touch_product(db: AsyncSession, product_id: UUID) -> None:
+    """Recipe rows changed: bump the product's updated_at and clear its and its parents' content hashes
+
+    ETags and render keys follow both, so they change in the edit's own transaction.
+    """
+    await invalidate_content_hashes(db, {product_id})
+    await db.execute(update(Product).where(Product.id == product_id).values(updated_at=datetime.utcnow()))
+
+
+def _recipe_changed(background_tasks: BackgroundTasks, product_ids: Set[UUID]) -> None:
+    """Queue the refresh of content hashes and claims for edited recipes and every recipe using them"""
+    background_tasks.add_task(refresh_after_edit, set(product_ids))
+
+
+async def _load_product(db: AsyncSession, product_id: UUID) -> Product:
+    result = await db.execute(
+        select(Product)
+        .where(Product.id == product_id)
+        .options(selectinload(Product.ingredients))
+    )
+    product = result.scalar_one_or_none()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+INCLUDE_OPTIONS = {"nutrition"}
+
+
+def _parse_include(include: Optional[str]) -> Set[str]:
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested - INCLUDE_OPTIONS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include option(s): {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+async def _with_nutrition(db: AsyncSession, products: List[Product], strict: bool = False) -> List[ProductResponse]:
+    """Product responses with per-serving nutrition filled in.
+
+    The whole page shares one RecipeEvaluator, so the sub-recipe graph and
+    ingredients load in a constant number of queries regardless of page size.
+    Products whose recipe cannot be evaluated get no nutrition unless `strict`.
+    """
+    evaluator = RecipeEvaluator(db)
+    try:
+        nodes = await evaluator.evaluate_many(products, strict=strict)
+    except (RecipeError, UnitConversionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    responses = []
+    for product in products:
+        response = ProductResponse.model_validate(product)
+        node = nodes.get(product.id)
+        if node is not None:
+            response.nutrition = NutritionCalculator.calculate_from_ingredients(
+                ingredients=[],
+                serving_size=Decimal(str(product.serving_size)),
+                serving_unit=product.serving_unit,
+                total_recipe_weight=node.weight,
+                serving_weight=evaluator.serving_weight(product),
+                totals=node.totals,
+            )
+        responses.append(response)
+    return responses
+
+
+async def _check_retention_table(db: AsyncSession, retention_table_id: Optional[UUID]) -> None:
+    if retention_table_id is None:
+        return
+    result = await db.execute(
+        select(RetentionTable.id).where(RetentionTable.id == retention_table_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Retention table not found")
+
+
+async def _check_sources(
+    db: AsyncSession, user_id: UUID, ingredient_ids: Set[UUID], sub_product_ids: Set[UUID]
+) -> Dict[UUID, Tuple[str, str, Optional[Decimal]]]:
+    """404 unless every ingredient exists and every sub-recipe is one of the user's products (one IN query each)
+
+    Returns each source's (name, unit its amounts are in, density) for unit checks.
+    """
+    sources: Dict[UUID, Tuple[str, str, Optional[Decimal]]] = {}
+    if ingredient_ids:
+        result = await db.execute(
+            select(Ingredient.id, Ingredient.name, Ingredient.per_unit, Ingredient.density)
+            .where(Ingredient.id.in_(ingredient_ids))
+        )
+        sources.update({row.id: (row.name, row.per_unit or "g", row.density) for row in result.all()})
+        missing = ingredient_ids - set(sources)
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Ingredient(s) not found: {', '.join(sorted(str(i) for i in missing))}"
+            )
+
+    if sub_product_ids:
+        result = await db.execute(
+            select(Product.id, Product.name, Product.serving_unit)
+            .where(Product.id.in_(sub_product_ids), Product.user_id == user_id)
+        )
+        sub_products = {row.id: (row.name, base_unit_for(row.serving_unit), None) for row in result.all()}
+        missing = sub_product_ids - set(sub_products)
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Sub-recipe product(s) not found: {', '.join(sorted(str(i) for i in missing))}"
+            )
+        sources.update(sub_products)
+    return sources
+
+
+async def _insert_product_ingredients(
+    db: AsyncSession,
+    product_id: UUID,
+    user_id: UUID,
+    serving_unit: str,
+    ingredients: List[ProductIngredientCreate],
+) -> List[dict]:
+    """Validate ingredient and sub-recipe IDs with IN queries and insert all rows in one executemany.
+
+    Sub-recipes must be the user's own products and must not contain `product_id`
+    anywhere below them. Each row's unit must convert to its source's unit and to
+    the recipe's base unit (via the ingredient's density where needed), so a row
+    can't be saved that would make the recipe impossible to evaluate. Returns the
+    inserted rows as dicts so callers can build responses without re-querying.
+    """
+    if not ingredients:
+        return []
+
+    sub_product_ids = {ing.sub_product_id for ing in ingredients if ing.sub_product_id}
+    sources = await _check_sources(
+        db,
+        user_id,
+        {ing.ingredient_id for ing in ingredients if ing.ingredient_id},
+        sub_product_ids,
+    )
+    base_unit = base_unit_for(serving_unit)
+    for ing in ingredients:
+        name, source_unit, density = sources[ing.ingredient_id or ing.sub_product_id]
+        try:
+            conversion_factor(ing.unit, source_unit, density)
+            conversion_factor(ing.unit, base_unit, density)
+        except UnitConversionError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"'{name}': {e}")
+    if sub_product_ids and product_id in await descendant_ids(db, sub_product_ids):
+        raise HTTPException(
+            status_code=400,
+            detail="A product cannot contain itself as a sub-recipe"
+        )
+
+    rows = [
+        {
+            "id": uuid4(),
+            "product_id": product_id,
+            **ing.model_dump(),
+        }
+        for ing in ingredients
+    ]
+    await db.execute(insert(ProductIngredient), rows)
+    return rows
+
+
 @router.get("", response_model=List[ProductResponse])
 async def list_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Comma-separated extras to embed, e.g. nutrition"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List all products for current user"""
+    includes = _parse_include(include)
     query = select(Product).where(Product.user_id == current_user["id"])
     
     if search:
@@ -40,18 +267,23 @@ async def list_products(
     query = query.offset(skip).limit(limit).options(selectinload(Product.ingredients))
     
     result = await db.execute(query)
-    products = result.scalars().all()
+    products = list(result.scalars().all())
     
+    if "nutrition" in includes:
+        return await _with_nutrition(db, products)
     return products
 
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_data: ProductCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new product"""
+    await _check_retention_table(db, product_data.retention_table_id)
+
     product = Product(
         user_id=current_user["id"],
         name=product_data.name,
@@ -62,37 +294,53 @@ async def create_product(
         serving_unit=product_data.serving_unit,
         serving_description=product_data.serving_description,
         servings_per_container=product_data.servings_per_container,
+        yield_factor=product_data.yield_factor,
+        retention_table_id=product_data.retention_table_id,
     )
     
     db.add(product)
-    await db.commit()
-    await db.refresh(product)
+    await db.flush()
     
-    # Add ingredients if provided
-    if product_data.ingredients:
-        for ing_data in product_data.ingredients:
-            product_ingredient = ProductIngredient(
-                product_id=product.id,
-                ingredient_id=ing_data.ingredient_id,
-                quantity=ing_data.quantity,
-                unit=ing_data.unit,
-                display_name=ing_data.display_name,
-                display_name_ar=ing_data.display_name_ar,
-                display_order=ing_data.display_order,
-            )
-            db.add(product_ingredient)
-        await db.commit()
+    # Add ingredients if provided (single bulk insert)
+    await _insert_product_ingredients(
+        db, product.id, current_user["id"], product.serving_unit, product_data.ingredients or []
+    )
+    await db.commit()
+    _recipe_changed(background_tasks, {product.id})
     
-    return product
+    result = await db.execute(
+        select(Product)
+        .where(Product.id == product.id)
+        .options(selectinload(Product.ingredients))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: UUID,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Comma-separated extras to embed, e.g. nutrition"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get product by ID with calculated nutrition"""
+    """Get product by ID (with calculated nutrition when include=nutrition)
+
+    Supports If-None-Match; a match returns 304 before the product is loaded.
+    """
+    includes = _parse_include(include)
+    version = await _product_version(db, product_id, current_user["id"])
+    if "nutrition" in includes:
+        etag = await _nutrition_etag(db, version, "product", sorted(includes))
+    else:
+        etag = make_etag(version, "product")
+    if etag:
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
+    
     result = await db.execute(
         select(Product)
         .where(Product.id == product_id, Product.user_id == current_user["id"])
@@ -103,6 +351,8 @@ async def get_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    if "nutrition" in includes:
+        return (await _with_nutrition(db, [product], strict=True))[0]
     return product
 
 
@@ -110,6 +360,7 @@ async def get_product(
 async def update_product(
     product_id: UUID,
     product_data: ProductUpdate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -125,10 +376,13 @@ async def update_product(
     
     # Update fields
     update_data = product_data.model_dump(exclude_unset=True)
+    await _check_retention_table(db, update_data.get("retention_table_id"))
     for field, value in update_data.items():
         setattr(product, field, value)
+    await invalidate_content_hashes(db, {product_id})
     
     await db.commit()
+    _recipe_changed(background_tasks, {product_id})
     await db.refresh(product)
     
     return product
@@ -150,6 +404,18 @@ async def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    result = await db.execute(
+        select(Product.name)
+        .join(ProductIngredient, ProductIngredient.product_id == Product.id)
+        .where(ProductIngredient.sub_product_id == product_id)
+    )
+    parents = sorted(set(result.scalars().all()))
+    if parents:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Product is used as a sub-recipe in: {', '.join(parents)}"
+        )
+    
     await db.delete(product)
     await db.commit()
 
@@ -157,10 +423,105 @@ async def delete_product(
 @router.get("/{product_id}/nutrition", response_model=NutritionSummary)
 async def get_product_nutrition(
     product_id: UUID,
+    request: Request,
+    response: Response,
+    rda_table: Optional[str] = Query(None, description="RDA table code for %DV, e.g. gso_2024"),
+    label_type_id: Optional[UUID] = Query(None, description="Label type whose daily values to use for %DV"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Calculate nutrition facts for a product (%DV from FDA 2020 unless an RDA table or label type is given)
+
+    Identical concurrent requests share one calculation. Supports If-None-Match;
+    a match returns 304 without calculating.
+    """
+    version = await _product_version(db, product_id, current_user["id"])
+    etag = await _nutrition_etag(db, version, "nutrition", rda_table, label_type_id)
+    if etag:
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
+    
+    async def calculate():
+        product = await _load_product(db, product_id)
+        node, serving_weight = await _evaluate_recipe(db, product)
+        
+        return NutritionCalculator.calculate_from_ingredients(
+            ingredients=[],
+            serving_size=Decimal(str(product.serving_size)),
+            serving_unit=product.serving_unit,
+            total_recipe_weight=node.weight,
+            daily_values=await daily_values.resolve(db, rda_table=rda_table, label_type_id=label_type_id),
+            serving_weight=serving_weight,
+            totals=node.totals,
+        )
+    
+    return await nutrition_flight.do(("nutrition", version, rda_table, label_type_id), calculate)
+
+
+@router.get("/{product_id}/nutrition/panels", response_model=MultiRegimeNutrition)
+async def get_product_nutrition_panels(
+    product_id: UUID,
+    request: Request,
+    response: Response,
+    regulation: List[str] = Query(["fda", "gso", "eu"], description="Regulations to build panels for"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Calculate nutrition panels for several regulations (per serving, per 100 g/ml, per container) in one pass
+
+    Supports If-None-Match; a match returns 304 without calculating.
+    """
+    version = await _product_version(db, product_id, current_user["id"])
+    
+    tables = []
+    for code in dict.fromkeys(regulation):
+        try:
+            tables.append(get_rounding_table(code))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    etag = await _nutrition_etag(db, version, "panels", [t.code for t in tables])
+    if etag:
+        not_modified = conditional(request, response, etag)
+        if not_modified:
+            return not_modified
+    
+    async def calculate():
+        product = await _load_product(db, product_id)
+        regimes = [(rounding, await daily_values.for_regulation(db, rounding.code)) for rounding in tables]
+        node, serving_weight = await _evaluate_recipe(db, product)
+        
+        return NutritionCalculator.calculate_panels(
+            ingredients=[],
+            serving_size=Decimal(str(product.serving_size)),
+            serving_unit=product.serving_unit,
+            total_recipe_weight=node.weight,
+            regimes=regimes,
+            servings_per_container=(
+                Decimal(str(product.servings_per_container)) if product.servings_per_container else None
+            ),
+            serving_weight=serving_weight,
+            totals=node.totals,
+        )
+    
+    return await nutrition_flight.do(("panels", version, tuple(t.code for t in tables)), calculate)
+
+
+@router.post("/{product_id}/optimize", response_model=RecipeOptimizationResponse)
+async def optimize_product(
+    product_id: UUID,
+    request: RecipeOptimizationRequest,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Calculate nutrition facts for a product"""
+    """Solve for ingredient quantities that meet per-serving nutrient targets
+    
+    Rows listed in `bounds` may change within their range; all other rows keep
+    their quantity. The solution is the feasible recipe closest (by weight) to
+    the current one. With `apply`, the quantities are saved to the product.
+    """
     result = await db.execute(
         select(Product)
         .where(Product.id == product_id, Product.user_id == current_user["id"])
@@ -171,59 +532,143 @@ async def get_product_nutrition(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Get ingredient details
-    ingredients_data = []
-    total_weight = 0
+    evaluator = RecipeEvaluator(db)
+    try:
+        terms = await evaluator.linear_terms(product)
+        serving_weight = evaluator.serving_weight(product)
+    except (RecipeError, UnitConversionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    bounds = {}
+    for bound in request.bounds:
+        source_id = bound.ingredient_id or bound.sub_product_id
+        matched = [
+            j for j, term in enumerate(terms)
+            if (term.row.ingredient_id or term.row.sub_product_id) == source_id
+        ]
+        if not matched:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{source_id} is not an ingredient of this product"
+            )
+        bounds.update({j: (bound.min, bound.max) for j in matched})
     
-    for pi in product.ingredients:
-        ing_result = await db.execute(
-            select(Ingredient).where(Ingredient.id == pi.ingredient_id)
+    yield_factor = product.yield_factor
+    retention = evaluator.retention_for(product)
+    try:
+        quantities = optimize_quantities(
+            terms,
+            [(t.nutrient, t.min, t.max) for t in request.targets],
+            bounds,
+            serving_weight,
+            yield_factor=yield_factor,
+            retention=retention,
+            keep_total_weight=request.keep_total_weight,
         )
-        ingredient = ing_result.scalar_one_or_none()
-        if ingredient:
-            ingredients_data.append({
-                "ingredient": {
-                    "calories": float(ingredient.calories),
-                    "total_fat": float(ingredient.total_fat),
-                    "saturated_fat": float(ingredient.saturated_fat),
-                    "trans_fat": float(ingredient.trans_fat),
-                    "cholesterol": float(ingredient.cholesterol),
-                    "sodium": float(ingredient.sodium),
-                    "total_carbs": float(ingredient.total_carbs),
-                    "dietary_fiber": float(ingredient.dietary_fiber),
-                    "total_sugars": float(ingredient.total_sugars),
-                    "added_sugars": float(ingredient.added_sugars),
-                    "protein": float(ingredient.protein),
-                    "vitamin_d": float(ingredient.vitamin_d),
-                    "calcium": float(ingredient.calcium),
-                    "iron": float(ingredient.iron),
-                    "potassium": float(ingredient.potassium),
-                    "per_amount": float(ingredient.per_amount),
-                },
-                "quantity": float(pi.quantity),
-            })
-            total_weight += float(pi.quantity)
-    
-    # Calculate nutrition
-    from decimal import Decimal
+    except RecipeOptimizationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    totals, weight = recipe_totals(terms, quantities, yield_factor, retention)
     nutrition = NutritionCalculator.calculate_from_ingredients(
-        ingredients=ingredients_data,
+        ingredients=[],
         serving_size=Decimal(str(product.serving_size)),
         serving_unit=product.serving_unit,
-        total_recipe_weight=Decimal(str(total_weight)),
+        total_recipe_weight=weight,
+        serving_weight=serving_weight,
+        totals=totals,
+    )
+    
+    response = RecipeOptimizationResponse(
+        quantities=[
+            OptimizedQuantity(
+                ingredient_id=term.row.ingredient_id,
+                sub_product_id=term.row.sub_product_id,
+                unit=term.row.unit,
+                original_quantity=term.row.quantity,
+                quantity=q,
+            )
+            for term, q in zip(terms, quantities)
+        ],
+        nutrition=nutrition,
+        applied=request.apply,
     )
     
-    return nutrition
+    if request.apply:
+        await db.execute(
+            update(ProductIngredient),
+            [{"id": term.row.id, "quantity": q} for term, q in zip(terms, quantities)],
+        )
+        await _touch_product(db, product_id)
+        await db.commit()
+        _recipe_changed(background_tasks, {product_id})
+    
+    return response
+
+
+@router.post("/{product_id}/variants", response_model=VariantEvaluationResponse)
+async def evaluate_product_variants(
+    product_id: UUID,
+    request: VariantEvaluationRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Evaluate what-if variants of a recipe without changing it
+    
+    Each variant is a list of changes (quantity, scale, substitution, addition,
+    removal) applied to the stored recipe. All variants share one coefficient
+    matrix, so each one costs a single dot product.
+    """
+    result = await db.execute(
+        select(Product)
+        .where(Product.id == product_id, Product.user_id == current_user["id"])
+        .options(selectinload(Product.ingredients))
+    )
+    product = result.scalar_one_or_none()
+    
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    changes = [variant.changes for variant in request.variants]
+    await _check_sources(db, current_user["id"], *variant_sources(changes))
+    
+    evaluator = RecipeEvaluator(db)
+    try:
+        results = await evaluate_variants(evaluator, product, changes)
+        serving_weight = evaluator.serving_weight(product)
+    except (VariantError, RecipeError, UnitConversionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    serving_size = Decimal(str(product.serving_size))
+    summaries = [
+        VariantNutrition(
+            name=name,
+            total_weight=round(weight, 2),
+            nutrition=NutritionCalculator.calculate_from_ingredients(
+                ingredients=[],
+                serving_size=serving_size,
+                serving_unit=product.serving_unit,
+                total_recipe_weight=weight,
+                serving_weight=serving_weight,
+                totals=totals,
+            ),
+        )
+        for name, (totals, weight) in zip(
+            [product.name] + [variant.name for variant in request.variants], results
+        )
+    ]
+    
+    return VariantEvaluationResponse(base=summaries[0], variants=summaries[1:])
 
 
 @router.post("/{product_id}/ingredients", response_model=ProductIngredientResponse)
 async def add_ingredient_to_product(
     product_id: UUID,
     ingredient_data: ProductIngredientCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Add an ingredient to a product"""
+    """Add an ingredient (or a sub-recipe product) to a product"""
     # Verify product belongs to user
     result = await db.execute(
         select(Product)
@@ -234,45 +679,65 @@ async def add_ingredient_to_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Verify ingredient exists
+    rows = await _insert_product_ingredients(db, product_id, current_user["id"], product.serving_unit, [ingredient_data])
+    await _touch_product(db, product_id)
+    await db.commit()
+    _recipe_changed(background_tasks, {product_id})
+    
+    return rows[0]
+
+
+@router.put("/{product_id}/ingredients", response_model=List[ProductIngredientResponse])
+async def replace_product_ingredients(
+    product_id: UUID,
+    ingredients: List[ProductIngredientCreate],
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Replace all ingredients of a product in bulk
+    
+    Validates every ingredient ID in a single query, then deletes the existing
+    rows and inserts the new list with one executemany.
+    """
+    # Verify product belongs to user
     result = await db.execute(
-        select(Ingredient).where(Ingredient.id == ingredient_data.ingredient_id)
-    )
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Ingredient not found")
-    
-    # Add to product
-    product_ingredient = ProductIngredient(
-        product_id=product_id,
-        ingredient_id=ingredient_data.ingredient_id,
-        quantity=ingredient_data.quantity,
-        unit=ingredient_data.unit,
-        display_name=ingredient_data.display_name,
-        display_name_ar=ingredient_data.display_name_ar,
-        display_order=ingredient_data.display_order,
+        select(Product.serving_unit)
+        .where(Product.id == product_id, Product.user_id == current_user["id"])
     )
+    serving_unit = result.scalar_one_or_none()
+    if serving_unit is None:
+        raise HTTPException(status_code=404, detail="Product not found")
     
-    db.add(product_ingredient)
+    await db.execute(
+        delete(ProductIngredient).where(ProductIngredient.product_id == product_id)
+    )
+    rows = await _insert_product_ingredients(db, product_id, current_user["id"], serving_unit, ingredients)
+    await _touch_product(db, product_id)
     await db.commit()
-    await db.refresh(product_ingredient)
+    _recipe_changed(background_tasks, {product_id})
     
-    return product_ingredient
+    return rows
 
 
 @router.delete("/{product_id}/ingredients/{ingredient_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_ingredient_from_product(
     product_id: UUID,
     ingredient_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Remove an ingredient from a product"""
+    """Remove an ingredient (or a sub-recipe product, by its product ID) from a product"""
     result = await db.execute(
         select(ProductIngredient)
-        .join(Product)
+        .join(Product, ProductIngredient.product_id == Product.id)
         .where(
             ProductIngredient.product_id == product_id,
-            ProductIngredient.ingredient_id == ingredient_id,
+            or_(
+                ProductIngredient.ingredient_id == ingredient_id,
+                ProductIngredient.sub_product_id == ingredient_id,
+            ),
             Product.user_id == current_user["id"]
         )
     )
@@ -282,4 +747,6 @@ async def remove_ingredient_from_product(
         raise HTTPException(status_code=404, detail="Product ingredient not found")
     
     await db.delete(pi)
+    await _touch_product(db, product_id)
     await db.commit()
+    _recipe_changed(background_tasks, {product_id})
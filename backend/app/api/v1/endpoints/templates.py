@@ -2,13 +2,14 @@
 Template Endpoints - Label Template Builder
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.http_cache import conditional, make_etag
 from app.core.security import get_current_user
 from app.models.template import Template
 from app.schemas import TemplateCreate, TemplateUpdate, TemplateResponse
@@ -16,8 +17,15 @@ from app.schemas import TemplateCreate, TemplateUpdate, TemplateResponse
 router = APIRouter()
 
 
+def _templates_etag(templates: List[Template]) -> str:
+    """ETag of a template list: each template's id, version and last edit, in order"""
+    return make_etag([(t.id, t.version, t.updated_at) for t in templates])
+
+
 @router.get("", response_model=List[TemplateResponse])
 async def list_templates(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     type: Optional[str] = None,
@@ -25,7 +33,7 @@ async def list_templates(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List templates (user's own + public presets)"""
+    """List templates (user's own + public presets); supports If-None-Match"""
     query = select(Template)
     
     if include_presets:
@@ -45,31 +53,37 @@ async def list_templates(
     query = query.offset(skip).limit(limit).order_by(Template.created_at.desc())
     
     result = await db.execute(query)
-    return result.scalars().all()
+    templates = result.scalars().all()
+    return conditional(request, response, _templates_etag(templates)) or templates
 
 
 @router.get("/presets", response_model=List[TemplateResponse])
 async def list_preset_templates(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """List system preset templates"""
+    """List system preset templates; supports If-None-Match"""
     query = select(Template).where(Template.is_preset == True)
     
     if type:
         query = query.where(Template.type == type)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    templates = result.scalars().all()
+    return conditional(request, response, _templates_etag(templates)) or templates
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
 async def get_template(
     template_id: UUID,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get template by ID"""
+    """Get template by ID; supports If-None-Match (the ETag follows the template's version)"""
     result = await db.execute(
         select(Template).where(
             Template.id == template_id,
@@ -85,7 +99,7 @@ async def get_template(
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    return template
+    return conditional(request, response, make_etag(template.id, template.version, template.updated_at)) or template
 
 
 @router.post("", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
@@ -149,6 +163,7 @@ async def update_template(
     
     for field, value in update_data.items():
         setattr(template, field, value)
+    template.version = (template.version or 1) + 1
     
     await db.commit()
     await db.refresh(template)
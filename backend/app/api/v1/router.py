@@ -2,10 +2,9 @@
 API v1 Router - Combines all endpoint routers
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
 
-from app.api.v1.endpoints import auth, products, ingredients, templates, labels, allergens
-from app.api.v1.endpoints.admin import label_types, nutrients, rda_tables
+from app.api.v1.endpoints import auth, products, ingredients, templates, labels, allergens, claims, jobs
 
 api_router = APIRouter()
 
@@ -16,8 +15,22 @@ api_router.include_router(ingredients.router, prefix="/ingredients", tags=["Ingr
 api_router.include_router(templates.router, prefix="/templates", tags=["Templates"])
 api_router.include_router(labels.router, prefix="/labels", tags=["Labels"])
 api_router.include_router(allergens.router, prefix="/allergens", tags=["Allergens"])
+api_router.include_router(claims.router, prefix="/claims", tags=["Claims"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
-# Admin endpoints
-api_router.include_router(label_types.router, prefix="/admin/label-types", tags=["Admin - Label Types"])
-api_router.include_router(nutrients.router, prefix="/admin/nutrients", tags=["Admin - Nutrients"])
-api_router.include_router(rda_tables.router, prefix="/admin/rda-tables", tags=["Admin - RDA Tables"])
+# Admin endpoints: mounted on the first admin request (see app.main), so workers
+# that only serve public or export traffic never import them
+ADMIN_PREFIX = "/admin"
+
+
+def include_admin_routers(app: FastAPI, prefix: str) -> None:
+    """Import the admin endpoint modules and mount their routers under `prefix`"""
+    from app.api.v1.endpoints.admin import label_types, metrics, nutrients, rda_tables, retention_tables
+
+    admin_router = APIRouter()
+    admin_router.include_router(label_types.router, prefix="/label-types", tags=["Admin - Label Types"])
+    admin_router.include_router(nutrients.router, prefix="/nutrients", tags=["Admin - Nutrients"])
+    admin_router.include_router(rda_tables.router, prefix="/rda-tables", tags=["Admin - RDA Tables"])
+    admin_router.include_router(retention_tables.router, prefix="/retention-tables", tags=["Admin - Retention Tables"])
+    admin_router.include_router(metrics.router, prefix="/metrics", tags=["Admin - Metrics"])
+    app.include_router(admin_router, prefix=prefix + ADMIN_PREFIX)
@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./nutrical.db"
+    DB_AUTO_MIGRATE: bool = False  # Run "alembic upgrade head" on startup if the schema is behind
+    
+    # Seeded SQLite snapshot (see app/db/seeds/snapshot.py)
+    DB_SNAPSHOT_DIR: str = ".db_snapshots"
+    DB_SNAPSHOT_ON_STARTUP: bool = False  # Clone the snapshot when the SQLite database file is missing
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -22,8 +27,38 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176", "http://localhost:3000"]
     
+    # Reference data cache (allergens, nutrient definitions, RDA tables)
+    REFERENCE_CACHE_POLL_SECONDS: float = 2.0  # How often each worker checks the version counters
+    REFERENCE_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Label compliance sweep (python -m app.services.compliance)
+    COMPLIANCE_CONCURRENCY: int = 4  # Batches checked at once, each on its own connection
+    COMPLIANCE_BATCH_SIZE: int = 200
+    
+    # Job queue (app/services/jobs.py; standalone workers: python -m app.worker)
+    JOB_WORKERS: int = 1  # Worker tasks started inside each API process; 0 leaves jobs to standalone workers
+    JOB_POLL_SECONDS: float = 1.0  # Idle wait between claim attempts
+    JOB_LEASE_SECONDS: int = 300  # Running jobs whose worker stopped renewing the lease for this long are requeued
+    JOB_RETRY_BACKOFF_SECONDS: float = 10.0  # Doubles with each failed attempt
+    
+    # Blob store for rendered label files (app/services/blob_store.py)
+    BLOB_STORE: str = "local"  # "local" (files under BLOB_STORE_DIR) or "s3" (needs boto3)
+    BLOB_STORE_DIR: str = ".blobs"
+    BLOB_S3_BUCKET: str = ""
+    BLOB_S3_ENDPOINT_URL: str = ""  # S3-compatible endpoint (e.g. MinIO); empty for AWS
+    BLOB_S3_PREFIX: str = "blobs/"
+    BLOB_URL_EXPIRE_SECONDS: int = 300  # Lifetime of presigned download URLs
+    
+    # Routers
+    ENABLE_ADMIN_API: bool = True  # Admin routers load on the first admin request; disable to turn them off
+    
     # Export settings
     EXPORT_DPI: int = 300
+    EXPORT_CONCURRENCY: int = 2  # Renders at once per process (size of the render pool)
+    EXPORT_QUEUE_SIZE: int = 16  # Exports waiting for a render slot before new ones get 429
+    EXPORT_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    EXPORT_RATE_PER_MINUTE: float = 30.0  # Per user, sustained
+    EXPORT_BURST: int = 5  # Per user, back to back
     DEFAULT_LABEL_WIDTH: int = 400
     DEFAULT_LABEL_HEIGHT: int = 600
     
@@ -0,0 +1,53 @@
+"""
+HTTP conditional requests: strong ETags, If-None-Match and Cache-Control
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# User-specific JSON: caches must revalidate on every use (cheap with If-None-Match)
+PRIVATE_REVALIDATE = "private, no-cache"
+# Content-addressed downloads: the URL names the exact bytes, which never change
+PRIVATE_IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from whatever identifies a representation (versions, hashes, timestamps, params)"""
+    encoded = json.dumps(parts, default=str, separators=(",", ":")).encode("utf-8")
+    return f'"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names `etag` (weak comparison, as RFC 9110 requires)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in client_etags or "*" in client_etags
+
+
+def conditional(
+    request: Request,
+    response: Optional[Response],
+    etag: str,
+    cache_control: str = PRIVATE_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Return a bare 304 if the client's copy is current; otherwise set the
+    validators on `response` (the endpoint's injected Response) and return None.
+
+    Call it before doing the work the representation needs, so a match skips it:
+
+        not_modified = conditional(request, response, make_etag(...))
+        if not_modified:
+            return not_modified
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.method in ("GET", "HEAD") and etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return None
@@ -0,0 +1,37 @@
+"""
+Lazily mounted routers: endpoint modules imported and routed on the first
+request that needs them instead of at worker startup
+"""
+
+from typing import Callable, Sequence
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class LazyRoutes:
+    """
+    ASGI middleware that calls `mount(app)` before the first request whose path
+    starts with one of `prefixes` (or asks for the OpenAPI schema, so the docs
+    list every route), then stays out of the way.
+
+    Mounting is synchronous and happens between two awaits, so concurrent
+    first requests can't mount twice.
+    """
+
+    def __init__(self, app: ASGIApp, fastapi_app: FastAPI, prefixes: Sequence[str], mount: Callable[[FastAPI], None]):
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.prefixes = tuple(prefixes)
+        self.mount = mount
+        self.mounted = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.mounted and scope["type"] == "http":
+            path = scope["path"]
+            if path.startswith(self.prefixes) or path == self.fastapi_app.openapi_url:
+                self.mount(self.fastapi_app)
+                # The schema may have been generated before these routes existed
+                self.fastapi_app.openapi_schema = None
+                self.mounted = True
+        await self.app(scope, receive, send)
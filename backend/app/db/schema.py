@@ -0,0 +1,140 @@
+"""
+Schema revision check - verifies the database is at the Alembic head revision
+
+Startup only reads the alembic_version stamp (one query) instead of reflecting
+tables with create_all. Schema changes go through `alembic upgrade head`.
+"""
+
+import asyncio
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+VERSIONS_DIR = BACKEND_DIR / "migrations" / "versions"
+
+# Schema of databases built by metadata.create_all before migrations existed
+INITIAL_REVISION = "3e7b3ee93a9d"
+
+_REVISION_RE = re.compile(r"^revision\s*(?::[^=]+)?=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\s*(?::[^=]+)?=\s*(.+)$", re.MULTILINE)
+
+
+class SchemaRevisionError(RuntimeError):
+    """Raised when the database schema is not at the expected Alembic revision"""
+
+
+def alembic_config():
+    """Alembic config that works regardless of the current working directory"""
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """
+    Head revision of the migration scripts (read once per process).
+
+    Scans the revision identifiers in migrations/versions directly, which avoids
+    importing Alembic and every migration module on the startup path. Falls back
+    to Alembic's ScriptDirectory if the scripts don't resolve to a single head.
+    """
+    revisions = set()
+    down_revisions = set()
+
+    for path in VERSIONS_DIR.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION_RE.search(source)
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if not revision or not down_revision:
+            continue
+        revisions.add(revision.group(1))
+        down_revisions.update(re.findall(r"['\"]([^'\"]+)['\"]", down_revision.group(1)))
+
+    heads = revisions - down_revisions
+    if len(heads) == 1:
+        return heads.pop()
+
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    """Read the alembic_version stamp, or None if the database was never migrated"""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            return None
+        return result.scalar_one_or_none()
+
+
+async def has_tables(engine: AsyncEngine) -> bool:
+    """Whether the database already has application tables"""
+    async with engine.connect() as conn:
+        table_names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    return any(name != "alembic_version" for name in table_names)
+
+
+def stamp_head(connection) -> None:
+    """Mark a database built with metadata.create_all as being at head (sync connection)"""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(alembic_config())
+    MigrationContext.configure(connection).stamp(script, "head")
+
+
+async def upgrade_head(stamp_initial: bool = False) -> None:
+    """Run `alembic upgrade head` (env.py drives its own event loop, so use a thread)
+
+    With `stamp_initial`, first stamp an unversioned create_all database at the
+    initial revision, so only the later migrations run against it.
+    """
+    from alembic import command
+
+    if stamp_initial:
+        await asyncio.to_thread(command.stamp, alembic_config(), INITIAL_REVISION)
+    await asyncio.to_thread(command.upgrade, alembic_config(), "head")
+
+
+async def ensure_schema_current(engine: AsyncEngine, auto_migrate: bool = False) -> None:
+    """
+    Verify the schema revision with a single query.
+
+    When the database is behind and auto_migrate is set, run the migrations;
+    otherwise fail fast with instructions. An unversioned database that already
+    has tables was built by create_all from the initial schema, so it is stamped
+    at the initial revision before upgrading.
+    """
+    expected = head_revision()
+    current = await current_revision(engine)
+
+    if current == expected:
+        return
+
+    unversioned_tables = current is None and await has_tables(engine)
+    if auto_migrate:
+        await upgrade_head(stamp_initial=unversioned_tables)
+        return
+
+    if unversioned_tables:
+        instructions = (
+            "It was created without migrations: run "
+            f"`alembic stamp {INITIAL_REVISION} && alembic upgrade head` (or start with DB_AUTO_MIGRATE=true)."
+        )
+    else:
+        instructions = "Run `alembic upgrade head` (or start with DB_AUTO_MIGRATE=true)."
+    raise SchemaRevisionError(
+        f"Database schema is at revision {current or '<none>'}, expected {expected}. {instructions}"
+    )
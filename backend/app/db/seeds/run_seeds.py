@@ -5,100 +5,126 @@ Run with: python -m app.db.seeds.run_seeds
 
 import asyncio
 import sys
+import time
 from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Type
 
 # Add backend directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import engine, AsyncSessionLocal, Base
+from app.db.schema import ensure_schema_current
 from app.models.nutrient_definition import NutrientDefinition
 from app.models.label_type import LabelType
 from app.models.label_type_nutrient import LabelTypeNutrient
 from app.models.rda_table import RDATable
+from app.services import reference_cache as cache
 
 from app.db.seeds.nutrients import NUTRIENT_DEFINITIONS
 from app.db.seeds.rda_tables import RDA_TABLES
 from app.db.seeds.label_types import LABEL_TYPES
 
 
-async def seed_nutrients(session: AsyncSession) -> dict:
-    """Seed nutrient definitions and return a mapping of key -> id"""
-    print("Seeding nutrient definitions...")
+async def insert_missing(
+    session: AsyncSession,
+    model: Type[Base],
+    rows: Sequence[dict],
+    key: str,
+) -> None:
+    """
+    Bulk insert seed rows, leaving rows whose unique `key` column already exists untouched.
 
-    nutrient_map = {}
+    Uses INSERT ... ON CONFLICT DO NOTHING on PostgreSQL and SQLite; other dialects
+    fall back to one existence query followed by a plain bulk insert.
+    """
+    if not rows:
+        return
 
-    for nutrient_data in NUTRIENT_DEFINITIONS:
-        # Check if nutrient already exists
-        result = await session.execute(
-            select(NutrientDefinition).where(NutrientDefinition.key == nutrient_data["key"])
-        )
-        existing = result.scalar_one_or_none()
+    dialect = session.bind.dialect.name
 
-        if existing:
-            print(f"  - Nutrient '{nutrient_data['key']}' already exists, skipping")
-            nutrient_map[nutrient_data["key"]] = existing.id
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
         else:
-            nutrient = NutrientDefinition(**nutrient_data)
-            session.add(nutrient)
-            await session.flush()  # Get the ID
-            nutrient_map[nutrient_data["key"]] = nutrient.id
-            print(f"  + Created nutrient: {nutrient_data['name_en']}")
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(model).on_conflict_do_nothing(index_elements=[key])
+        await session.execute(stmt, list(rows))
+        return
+
+    column = getattr(model, key)
+    result = await session.execute(select(column).where(column.in_([row[key] for row in rows])))
+    existing = set(result.scalars().all())
+    missing = [row for row in rows if row[key] not in existing]
+    if missing:
+        await session.execute(insert(model), missing)
+
 
+async def fetch_id_map(session: AsyncSession, model: Type[Base], key: str, values: List[str]) -> Dict[str, object]:
+    """Resolve a mapping of unique key -> id with a single query"""
+    column = getattr(model, key)
+    result = await session.execute(select(column, model.id).where(column.in_(values)))
+    return {row[0]: row[1] for row in result.all()}
+
+
+async def seed_nutrients(session: AsyncSession) -> dict:
+    """Seed nutrient definitions and return a mapping of key -> id"""
+    print("Seeding nutrient definitions...")
+    started = time.perf_counter()
+
+    await insert_missing(session, NutrientDefinition, NUTRIENT_DEFINITIONS, "key")
+    nutrient_map = await fetch_id_map(
+        session, NutrientDefinition, "key", [n["key"] for n in NUTRIENT_DEFINITIONS]
+    )
+
+    await cache.reference_cache.bump(session, cache.NUTRIENTS)
     await session.commit()
-    print(f"✓ Seeded {len(NUTRIENT_DEFINITIONS)} nutrients")
+    print(f"✓ Seeded {len(NUTRIENT_DEFINITIONS)} nutrients ({(time.perf_counter() - started) * 1000:.1f} ms)")
     return nutrient_map
 
 
 async def seed_rda_tables(session: AsyncSession) -> None:
     """Seed RDA tables"""
     print("\nSeeding RDA tables...")
+    started = time.perf_counter()
 
-    for rda_data in RDA_TABLES:
-        # Check if RDA table already exists
-        result = await session.execute(
-            select(RDATable).where(RDATable.code == rda_data["code"])
-        )
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            print(f"  - RDA table '{rda_data['code']}' already exists, skipping")
-        else:
-            rda_table = RDATable(**rda_data)
-            session.add(rda_table)
-            print(f"  + Created RDA table: {rda_data['name']}")
+    await insert_missing(session, RDATable, RDA_TABLES, "code")
 
+    await cache.reference_cache.bump(session, cache.RDA_TABLES)
     await session.commit()
-    print(f"✓ Seeded {len(RDA_TABLES)} RDA tables")
+    print(f"✓ Seeded {len(RDA_TABLES)} RDA tables ({(time.perf_counter() - started) * 1000:.1f} ms)")
 
 
 async def seed_label_types(session: AsyncSession, nutrient_map: dict) -> None:
     """Seed label types and their nutrient configurations"""
     print("\nSeeding label types...")
-
+    started = time.perf_counter()
+
+    # Nutrient configs are stored separately; don't mutate the seed data
+    label_type_rows = [
+        {k: v for k, v in label_type_data.items() if k != "nutrients"}
+        for label_type_data in LABEL_TYPES
+    ]
+    await insert_missing(session, LabelType, label_type_rows, "code")
+    label_type_map = await fetch_id_map(
+        session, LabelType, "code", [lt["code"] for lt in LABEL_TYPES]
+    )
+
+    # Existing (label_type_id, nutrient_id) pairs for the seeded label types, in one query
+    result = await session.execute(
+        select(LabelTypeNutrient.label_type_id, LabelTypeNutrient.nutrient_id)
+        .where(LabelTypeNutrient.label_type_id.in_(list(label_type_map.values())))
+    )
+    existing_pairs = {tuple(row) for row in result.all()}
+
+    config_rows = []
     for label_type_data in LABEL_TYPES:
-        # Extract nutrients config
-        nutrients_config = label_type_data.pop("nutrients", [])
-
-        # Check if label type already exists
-        result = await session.execute(
-            select(LabelType).where(LabelType.code == label_type_data["code"])
-        )
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            print(f"  - Label type '{label_type_data['code']}' already exists, skipping")
-            label_type = existing
-        else:
-            label_type = LabelType(**label_type_data)
-            session.add(label_type)
-            await session.flush()  # Get the ID
-            print(f"  + Created label type: {label_type_data['name']}")
+        label_type_id = label_type_map[label_type_data["code"]]
 
-        # Seed nutrient configurations for this label type
-        for order, nutrient_config in enumerate(nutrients_config):
+        for order, nutrient_config in enumerate(label_type_data.get("nutrients", [])):
             nutrient_key = nutrient_config["key"]
             nutrient_id = nutrient_map.get(nutrient_key)
 
@@ -106,60 +132,65 @@ async def seed_label_types(session: AsyncSession, nutrient_map: dict) -> None:
                 print(f"    ! Warning: Nutrient '{nutrient_key}' not found, skipping")
                 continue
 
-            # Check if config already exists
-            result = await session.execute(
-                select(LabelTypeNutrient).where(
-                    LabelTypeNutrient.label_type_id == label_type.id,
-                    LabelTypeNutrient.nutrient_id == nutrient_id
-                )
-            )
-            existing_config = result.scalar_one_or_none()
-
-            if existing_config:
+            if (label_type_id, nutrient_id) in existing_pairs:
                 continue  # Skip if already configured
 
-            label_nutrient = LabelTypeNutrient(
-                label_type_id=label_type.id,
-                nutrient_id=nutrient_id,
-                is_mandatory=nutrient_config.get("is_mandatory", False),
-                show_by_default=True,
-                show_percent_dv=nutrient_config.get("show_percent_dv", True),
-                display_order=order,
-                indent_level=nutrient_config.get("indent_level", 0),
-                is_bold=nutrient_config.get("is_bold", False),
-            )
-            session.add(label_nutrient)
+            config_rows.append({
+                "label_type_id": label_type_id,
+                "nutrient_id": nutrient_id,
+                "is_mandatory": nutrient_config.get("is_mandatory", False),
+                "show_by_default": True,
+                "show_percent_dv": nutrient_config.get("show_percent_dv", True),
+                "display_order": order,
+                "indent_level": nutrient_config.get("indent_level", 0),
+                "is_bold": nutrient_config.get("is_bold", False),
+            })
+
+    if config_rows:
+        await session.execute(insert(LabelTypeNutrient), config_rows)
 
     await session.commit()
-    print(f"✓ Seeded {len(LABEL_TYPES)} label types with nutrient configs")
+    print(
+        f"✓ Seeded {len(LABEL_TYPES)} label types with {len(config_rows)} new nutrient configs "
+        f"({(time.perf_counter() - started) * 1000:.1f} ms)"
+    )
 
 
 async def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("✓ Database tables created")
+    """Bring the database schema to the latest migration"""
+    print("Running database migrations...")
+    await ensure_schema_current(engine, auto_migrate=True)
+    print("✓ Database schema up to date")
 
 
-async def run_all_seeds():
-    """Run all seed operations"""
+async def run_all_seeds(progress: Optional[Callable[[int, int], Awaitable[None]]] = None):
+    """Run all seed operations; `progress(done, total)` is awaited after each step"""
     print("=" * 50)
     print("NutriCal CMS - Database Seeding")
     print("=" * 50)
 
+    started = time.perf_counter()
+
+    async def step(done: int) -> None:
+        if progress is not None:
+            await progress(done, 4)
+
     # Create tables first
     await create_tables()
+    await step(1)
 
     async with AsyncSessionLocal() as session:
         try:
             # Seed in order (nutrients first, then RDA tables, then label types)
             nutrient_map = await seed_nutrients(session)
+            await step(2)
             await seed_rda_tables(session)
+            await step(3)
             await seed_label_types(session, nutrient_map)
+            await step(4)
 
             print("\n" + "=" * 50)
-            print("✓ All seeds completed successfully!")
+            print(f"✓ All seeds completed successfully in {(time.perf_counter() - started) * 1000:.1f} ms!")
             print("=" * 50)
 
         except Exception as e:
@@ -0,0 +1,130 @@
+"""
+Pre-built seeded SQLite snapshot for fast test and dev database startup
+
+The snapshot is a SQLite file with all tables created and all seeds applied.
+It is keyed by a hash of the table DDL and the seed data, so it is rebuilt
+automatically whenever models or seeds change.
+
+Build with: python -m app.db.seeds.snapshot
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.schema import CreateTable
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401 - register all tables on Base.metadata
+
+from app.db.seeds.nutrients import NUTRIENT_DEFINITIONS
+from app.db.seeds.rda_tables import RDA_TABLES
+from app.db.seeds.label_types import LABEL_TYPES
+from app.db.seeds.run_seeds import seed_nutrients, seed_rda_tables, seed_label_types
+from app.db.schema import head_revision, stamp_head
+
+
+def snapshot_fingerprint() -> str:
+    """Hash of the SQLite DDL for all tables, the migration head and the seed data"""
+    digest = hashlib.sha256()
+    digest.update(head_revision().encode("utf-8"))
+    dialect = sqlite.dialect()
+
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf-8"))
+
+    seed_data = [NUTRIENT_DEFINITIONS, RDA_TABLES, LABEL_TYPES]
+    digest.update(json.dumps(seed_data, sort_keys=True, default=str).encode("utf-8"))
+
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path() -> Path:
+    """Location of the snapshot for the current models and seed data"""
+    return Path(settings.DB_SNAPSHOT_DIR) / f"nutrical-seeded-{snapshot_fingerprint()}.db"
+
+
+def sqlite_database_path(database_url: str) -> Optional[Path]:
+    """Return the file path of a file-backed SQLite URL, or None for other databases"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return Path(url.database)
+
+
+async def build_snapshot(force: bool = False) -> Path:
+    """Create and seed the snapshot file if it does not exist yet"""
+    path = snapshot_path()
+    if path.exists() and not force:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(stamp_head)
+
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            nutrient_map = await seed_nutrients(session)
+            await seed_rda_tables(session)
+            await seed_label_types(session, nutrient_map)
+    finally:
+        await engine.dispose()
+
+    # Atomic publish so concurrent builders never see a half-written file
+    os.replace(tmp_path, path)
+    return path
+
+
+def restore_snapshot(source: Path, target: Path) -> None:
+    """Copy a snapshot into `target` using the sqlite3 backup API"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+async def clone_snapshot(target: Path) -> Path:
+    """Build the snapshot if needed and clone it into `target`
+
+    Typical test fixture usage:
+
+        db_path = tmp_path / "test.db"
+        await clone_snapshot(db_path)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    """
+    source = await build_snapshot()
+    restore_snapshot(source, target)
+    return target
+
+
+async def main(force: bool = False):
+    started = time.perf_counter()
+    path = await build_snapshot(force=force)
+    print(f"✓ Snapshot ready at {path} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(force="--force" in sys.argv))
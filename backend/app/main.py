@@ -8,18 +8,37 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.v1.router import api_router
+from app.core.database import engine
+from app.core.lazy_routes import LazyRoutes
+from app.db.schema import ensure_schema_current
+from app.api.v1.router import ADMIN_PREFIX, api_router, include_admin_routers
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    # Startup: Create tables if not exist
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    db_path = None
+    if settings.DB_SNAPSHOT_ON_STARTUP:
+        from app.db.seeds.snapshot import sqlite_database_path, clone_snapshot
+        db_path = sqlite_database_path(settings.DATABASE_URL)
+
+    if db_path and not db_path.exists():
+        # Startup: Fresh SQLite database - clone the pre-seeded snapshot
+        await clone_snapshot(db_path)
+    else:
+        # Startup: Verify the schema revision (single query, no DDL)
+        await ensure_schema_current(engine, auto_migrate=settings.DB_AUTO_MIGRATE)
+
+    # Startup: Job workers inside this process (0 leaves jobs to `python -m app.worker`)
+    workers = None
+    if settings.JOB_WORKERS > 0:
+        from app.worker import WorkerPool
+        workers = WorkerPool(settings.JOB_WORKERS)
+        workers.start()
     yield
-    # Shutdown: Close connections
+    # Shutdown: Hand running jobs back to the queue, then close connections
+    if workers is not None:
+        await workers.stop()
     await engine.dispose()
 
 
@@ -42,6 +61,15 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Admin routes load on first use (can be disabled for public-facing or export-only workers)
+if settings.ENABLE_ADMIN_API:
+    app.add_middleware(
+        LazyRoutes,
+        fastapi_app=app,
+        prefixes=["/api/v1" + ADMIN_PREFIX],
+        mount=lambda target: include_admin_routers(target, "/api/v1"),
+    )
+
 
 @app.get("/")
 async def root():
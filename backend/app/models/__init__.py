@@ -4,16 +4,19 @@ Database Models
 
 from app.models.user import User
 from app.models.ingredient import Ingredient
-from app.models.product import Product, ProductIngredient, ProductAllergen
+from app.models.product import Product, ProductIngredient, ProductAllergen, ProductClaim
 from app.models.template import Template
 from app.models.label import Label
 from app.models.allergen import Allergen
+from app.models.job import Job
 
 # CMS Models
 from app.models.nutrient_definition import NutrientDefinition
 from app.models.label_type import LabelType
 from app.models.label_type_nutrient import LabelTypeNutrient
 from app.models.rda_table import RDATable
+from app.models.reference_data_version import ReferenceDataVersion
+from app.models.retention_table import RetentionTable
 
 __all__ = [
     "User",
@@ -21,12 +24,16 @@ __all__ = [
     "Product",
     "ProductIngredient",
     "ProductAllergen",
+    "ProductClaim",
     "Template",
     "Label",
     "Allergen",
+    "Job",
     # CMS Models
     "NutrientDefinition",
     "LabelType",
     "LabelTypeNutrient",
     "RDATable",
+    "ReferenceDataVersion",
+    "RetentionTable",
 ]
@@ -79,6 +79,7 @@ class Ingredient(Base):
     # Per unit configuration
     per_amount = Column(Numeric(10, 2), default=100)  # Default 100g
     per_unit = Column(String(10), default="g")  # g or ml
+    density = Column(Numeric(10, 4), nullable=True)  # g/ml, converts between mass and volume units
     
     # Metadata
     is_verified = Column(Boolean, default=False)  # Admin verified data
@@ -0,0 +1,55 @@
+"""
+Job model - Durable queue entries for work that outlives a request
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class Job(Base):
+    """
+    Background job (recalculation, export, compliance sweep, seeding) claimed
+    and run by workers; see app/services/jobs.py
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order: queued jobs that are due, highest priority first
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, index=True)  # Null for system jobs
+
+    # recalculate_ingredient, recalculate_retention_table, backfill_content_hashes,
+    # compliance_sweep, export_labels, seed
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, default=dict)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+
+    # queued, running, succeeded, failed, cancelled
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Pushed back between retries
+
+    # Progress reported by the handler
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    error = Column(Text)
+
+    # Lease held by the running worker, renewed with each progress update
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.status}>"
@@ -2,7 +2,7 @@
 Label model - Generated labels from product + template
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, LargeBinary, JSON
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,6 +16,10 @@ class Label(Base):
     Generated label - result of combining a product with a template
     """
     __tablename__ = "labels"
+    __table_args__ = (
+        # Stale-label lookups compare product_hash against products.content_hash per product
+        Index("ix_labels_product_id_product_hash", "product_id", "product_hash"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
@@ -25,29 +29,38 @@ class Label(Base):
     name = Column(String(255))
     version = Column(String(50), default="1.0")
     
-    # Rendered data snapshot (nutrition values at time of generation)
+    # Rendered data snapshot (declared nutrition values at time of generation, never updated)
     nutrition_snapshot = Column(JSON)
     # Example:
     # {
-    #   "servingSize": 250,
-    #   "servingUnit": "g",
-    #   "calories": 564,
-    #   "totalFat": 13.2,
-    #   "saturatedFat": 1.5,
+    #   "regulation": "fda",
+    #   "serving_size": 250,
+    #   "serving_unit": "g",
+    #   "calories": 560,
+    #   "total_fat": 13,
+    #   "dietary_fiber": "Less than 1g",
     #   ...
     # }
     
+    # What the snapshot was captured from: products.content_hash and templates.version
+    product_hash = Column(String(64))
+    template_version = Column(Integer)
+    content_hash = Column(String(64))  # Hash of product_hash, template and template_version
+    
     # Rendered content
     rendered_html = Column(Text)  # HTML version for preview
     rendered_svg = Column(Text)   # SVG version for export
     
-    # Cached exports (optional - can regenerate)
-    png_data = Column(LargeBinary)  # Cached PNG
-    pdf_data = Column(LargeBinary)  # Cached PDF
+    # Cached exports (optional - can regenerate): SHA-256 digests of files in the blob store
+    png_hash = Column(String(64))
+    pdf_hash = Column(String(64))
+    svg_hash = Column(String(64))
     
     # Compliance check results
     compliance_status = Column(String(20), default="pending")  # pending, passed, failed
     compliance_issues = Column(JSON, default=list)
+    compliance_hash = Column(String(64))  # Hash of the inputs the last check ran on
+    compliance_checked_at = Column(DateTime)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
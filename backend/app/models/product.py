@@ -2,7 +2,7 @@
 Product model - User's products/recipes with calculated nutrition
 """
 
-from sqlalchemy import Column, String, DateTime, Numeric, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Numeric, Integer, ForeignKey, Text, CheckConstraint, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -32,29 +32,55 @@ class Product(Base):
     serving_description = Column(String(100))  # e.g., "1 Cup" or "2 slices"
     servings_per_container = Column(Numeric(10, 2))  # e.g., 8
     
+    # Cooking: yield_factor = finished weight / raw weight (e.g. 0.85 for 15% moisture loss)
+    yield_factor = Column(Numeric(6, 4), nullable=True)
+    retention_table_id = Column(UUID(as_uuid=True), ForeignKey("retention_tables.id"), nullable=True)
+    
     # Calculated totals (auto-calculated from ingredients)
     total_weight = Column(Numeric(10, 2))  # Total weight of recipe in grams
     
+    # Recipe fingerprint + claim rules version the stored claims were evaluated from
+    claims_fingerprint = Column(String(64))
+    
+    # Hash of the recipe (rows, quantities, ingredient versions, sub-recipes) and serving size,
+    # kept current on edits; labels store the value they were captured from
+    content_hash = Column(String(64))
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="products")
-    ingredients = relationship("ProductIngredient", back_populates="product", cascade="all, delete-orphan")
+    ingredients = relationship(
+        "ProductIngredient",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        foreign_keys="ProductIngredient.product_id",
+    )
     allergens = relationship("ProductAllergen", back_populates="product", cascade="all, delete-orphan")
     labels = relationship("Label", back_populates="product", cascade="all, delete-orphan")
+    claims = relationship("ProductClaim", back_populates="product", cascade="all, delete-orphan")
 
 
 class ProductIngredient(Base):
     """
-    Junction table linking products to ingredients with quantities
+    Junction table linking products to ingredients with quantities.
+    A row references either a base ingredient or another product used as a
+    sub-recipe (sauce, dough, ...), never both.
     """
     __tablename__ = "product_ingredients"
+    __table_args__ = (
+        CheckConstraint(
+            "(ingredient_id IS NULL) <> (sub_product_id IS NULL)",
+            name="ck_product_ingredients_one_source",
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
-    ingredient_id = Column(UUID(as_uuid=True), ForeignKey("ingredients.id"), nullable=False)
+    ingredient_id = Column(UUID(as_uuid=True), ForeignKey("ingredients.id"), nullable=True)
+    sub_product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=True, index=True)
     
     # Quantity used in recipe
     quantity = Column(Numeric(10, 2), nullable=False)  # Amount of ingredient
@@ -66,8 +92,9 @@ class ProductIngredient(Base):
     display_order = Column(Integer, default=0)  # Order in ingredients list
     
     # Relationships
-    product = relationship("Product", back_populates="ingredients")
+    product = relationship("Product", back_populates="ingredients", foreign_keys=[product_id])
     ingredient = relationship("Ingredient")
+    sub_product = relationship("Product", foreign_keys=[sub_product_id])
 
 
 class ProductAllergen(Base):
@@ -86,3 +113,23 @@ class ProductAllergen(Base):
     # Relationships
     product = relationship("Product", back_populates="allergens")
     allergen = relationship("Allergen")
+
+
+class ProductClaim(Base):
+    """
+    Nutrient content claim a product qualifies for under a regulation
+    (materialized by the claims engine)
+    """
+    __tablename__ = "product_claims"
+    __table_args__ = (
+        UniqueConstraint("product_id", "regulation", "claim", name="uq_product_claims_product_regulation_claim"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
+    regulation = Column(String(10), nullable=False)  # fda, gso
+    claim = Column(String(50), nullable=False, index=True)  # low_fat, high_protein, ...
+    evaluated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    product = relationship("Product", back_populates="claims")
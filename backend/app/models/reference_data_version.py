@@ -0,0 +1,24 @@
+"""
+ReferenceDataVersion model - Version counters for cached reference data
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class ReferenceDataVersion(Base):
+    """
+    One row per reference-data namespace (allergens, nutrients, rda_tables).
+    Admin writes bump the counter in the same transaction as the data change;
+    every worker polls this small table to invalidate its in-memory cache.
+    """
+    __tablename__ = "reference_data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ReferenceDataVersion {self.name}: {self.version}>"
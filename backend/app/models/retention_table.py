@@ -0,0 +1,40 @@
+"""
+RetentionTable model - Nutrient retention factors for cooking methods
+"""
+
+from sqlalchemy import Column, String, Boolean, DateTime, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class RetentionTable(Base):
+    """
+    Per-nutrient retention factors for a preparation method (baking, boiling, frying...).
+    A factor is the fraction of a nutrient left after cooking; nutrients without
+    a factor are fully retained. Products reference one table.
+    """
+    __tablename__ = "retention_tables"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Basic info
+    name = Column(String(100), nullable=False)  # "Baked, bread"
+    code = Column(String(50), unique=True, nullable=False)  # "baked_bread"
+    description = Column(String(500))
+    source = Column(String(255))  # e.g. "USDA Retention Factors Release 6"
+
+    # Key: nutrient_key, Value: retention factor (0-1)
+    factors = Column(JSON, default=dict)
+    # Example: {"vitamin_d": 0.85, "potassium": 0.95}
+
+    is_active = Column(Boolean, default=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RetentionTable {self.code}: {self.name}>"
@@ -91,6 +91,9 @@ class Template(Base):
     custom_typography = Column(JSON, nullable=True)  # Override fonts
     custom_footnotes = Column(JSON, nullable=True)  # Override footnotes
 
+    # Bumped on every edit; labels record the version they were rendered from
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -2,7 +2,7 @@
 Pydantic Schemas for API validation and serialization
 """
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
@@ -68,6 +68,7 @@ class IngredientBase(BaseModel):
     
     per_amount: Decimal = 100
     per_unit: str = "g"
+    density: Optional[Decimal] = None  # g/ml
 
 
 class IngredientCreate(IngredientBase):
@@ -93,6 +94,7 @@ class IngredientUpdate(BaseModel):
     calcium: Optional[Decimal] = None
     iron: Optional[Decimal] = None
     potassium: Optional[Decimal] = None
+    density: Optional[Decimal] = None
 
 
 class IngredientResponse(IngredientBase):
@@ -107,17 +109,26 @@ class IngredientResponse(IngredientBase):
 # ============== Product Schemas ==============
 
 class ProductIngredientCreate(BaseModel):
-    ingredient_id: UUID
+    """A base ingredient or another product used as a sub-recipe (exactly one)"""
+    ingredient_id: Optional[UUID] = None
+    sub_product_id: Optional[UUID] = None
     quantity: Decimal
     unit: str
     display_name: Optional[str] = None
     display_name_ar: Optional[str] = None
     display_order: int = 0
 
+    @model_validator(mode="after")
+    def check_one_source(self):
+        if (self.ingredient_id is None) == (self.sub_product_id is None):
+            raise ValueError("Provide exactly one of ingredient_id or sub_product_id")
+        return self
+
 
 class ProductIngredientResponse(BaseModel):
     id: UUID
-    ingredient_id: UUID
+    ingredient_id: Optional[UUID] = None
+    sub_product_id: Optional[UUID] = None
     ingredient_name: Optional[str] = None
     quantity: Decimal
     unit: str
@@ -137,6 +148,8 @@ class ProductBase(BaseModel):
     serving_unit: str
     serving_description: Optional[str] = None
     servings_per_container: Optional[Decimal] = None
+    yield_factor: Optional[Decimal] = Field(None, gt=0, le=5)  # finished weight / raw weight
+    retention_table_id: Optional[UUID] = None
 
 
 class ProductCreate(ProductBase):
@@ -152,6 +165,8 @@ class ProductUpdate(BaseModel):
     serving_unit: Optional[str] = None
     serving_description: Optional[str] = None
     servings_per_container: Optional[Decimal] = None
+    yield_factor: Optional[Decimal] = Field(None, gt=0, le=5)
+    retention_table_id: Optional[UUID] = None
 
 
 class NutritionSummary(BaseModel):
@@ -188,6 +203,28 @@ class NutritionSummary(BaseModel):
     potassium_dv: Decimal = 0
 
 
+class RegimeBasisPanel(BaseModel):
+    """%DV and rounded declarations for one basis under one regulation"""
+    percent_dv: Dict[str, Decimal]
+    declared: Dict[str, str]
+
+
+class RegimePanel(BaseModel):
+    """Nutrition panel for one regulation (FDA, GSO, EU)"""
+    regulation: str
+    daily_values_source: str
+    bases: Dict[str, RegimeBasisPanel]  # per_serving, per_100g / per_100ml, per_container
+
+
+class MultiRegimeNutrition(BaseModel):
+    """Nutrition for one product across bases and regulations, from a single set of totals"""
+    serving_size: Decimal
+    serving_unit: str
+    servings_per_container: Optional[Decimal] = None
+    amounts: Dict[str, Dict[str, Decimal]]  # basis -> nutrient -> amount
+    panels: List[RegimePanel]
+
+
 class ProductResponse(ProductBase):
     id: UUID
     user_id: UUID
@@ -200,6 +237,137 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
+class NutrientTarget(BaseModel):
+    """Per-serving bound on one nutrient, e.g. sodium <= 140 for a low sodium claim"""
+    nutrient: str
+    min: Optional[Decimal] = Field(None, ge=0)
+    max: Optional[Decimal] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.min is None and self.max is None:
+            raise ValueError("Provide min, max or both")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError("min must not exceed max")
+        return self
+
+
+class QuantityBound(BaseModel):
+    """Allowed quantity range (in the row's unit) for a recipe row the solver may change"""
+    ingredient_id: Optional[UUID] = None
+    sub_product_id: Optional[UUID] = None
+    min: Decimal = Field(Decimal("0"), ge=0)
+    max: Optional[Decimal] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_one_source(self):
+        if (self.ingredient_id is None) == (self.sub_product_id is None):
+            raise ValueError("Provide exactly one of ingredient_id or sub_product_id")
+        if self.max is not None and self.min > self.max:
+            raise ValueError("min must not exceed max")
+        return self
+
+
+class RecipeOptimizationRequest(BaseModel):
+    """Rows without a bound keep their current quantity"""
+    targets: List[NutrientTarget] = Field(..., min_length=1)
+    bounds: List[QuantityBound] = Field(..., min_length=1)
+    keep_total_weight: bool = False  # hold the raw batch weight constant
+    apply: bool = False  # write the solved quantities to the product
+
+
+class OptimizedQuantity(BaseModel):
+    ingredient_id: Optional[UUID] = None
+    sub_product_id: Optional[UUID] = None
+    unit: str
+    original_quantity: Decimal
+    quantity: Decimal
+
+
+class RecipeOptimizationResponse(BaseModel):
+    quantities: List[OptimizedQuantity]
+    nutrition: NutritionSummary  # per serving with the solved quantities
+    applied: bool
+
+
+class VariantChange(BaseModel):
+    """
+    One edit to the base recipe, targeting the rows of an ingredient or sub-recipe.
+
+    Set `quantity` (optionally in a new `unit`), multiply by `scale`, `remove` it,
+    or substitute another ingredient / sub-recipe. Targets not in the recipe are
+    added as new rows (requires quantity and unit).
+    """
+    ingredient_id: Optional[UUID] = None
+    sub_product_id: Optional[UUID] = None
+    quantity: Optional[Decimal] = Field(None, ge=0)
+    unit: Optional[str] = None
+    scale: Optional[Decimal] = Field(None, ge=0)
+    remove: bool = False
+    substitute_ingredient_id: Optional[UUID] = None
+    substitute_sub_product_id: Optional[UUID] = None
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if (self.ingredient_id is None) == (self.sub_product_id is None):
+            raise ValueError("Provide exactly one of ingredient_id or sub_product_id")
+        if self.substitute_ingredient_id and self.substitute_sub_product_id:
+            raise ValueError("Provide at most one substitute")
+        if self.quantity is not None and self.scale is not None:
+            raise ValueError("Provide quantity or scale, not both")
+        return self
+
+
+class RecipeVariant(BaseModel):
+    name: str
+    changes: List[VariantChange] = []
+
+
+class VariantEvaluationRequest(BaseModel):
+    variants: List[RecipeVariant] = Field(..., min_length=1, max_length=1000)
+
+
+class VariantNutrition(BaseModel):
+    name: str
+    total_weight: Decimal  # cooked batch weight in g (or ml)
+    nutrition: NutritionSummary
+
+
+class VariantEvaluationResponse(BaseModel):
+    base: VariantNutrition
+    variants: List[VariantNutrition]
+
+
+# ============== Claim Schemas ==============
+
+class ClaimConditionResponse(BaseModel):
+    nutrient: str
+    op: str  # lt, le, ge
+    value: Decimal
+    basis: str  # per_serving, per_100, percent_energy
+    liquid_value: Optional[Decimal] = None
+
+
+class ClaimRuleResponse(BaseModel):
+    regulation: str
+    code: str
+    name: str
+    conditions: List[ClaimConditionResponse]
+
+
+class ProductClaimResponse(BaseModel):
+    product_id: UUID
+    product_name: str
+    regulation: str
+    claim: str
+    evaluated_at: datetime
+
+
+class ClaimRefreshResponse(BaseModel):
+    evaluated: int  # products checked
+    updated: int  # products whose claims were re-evaluated
+
+
 # ============== Template Schemas ==============
 
 class LabelElement(BaseModel):
@@ -288,6 +456,7 @@ class TemplateResponse(TemplateBase):
     corner_radius: int = 0
     is_preset: bool
     is_public: bool
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -318,7 +487,59 @@ class LabelResponse(BaseModel):
     nutrition_snapshot: Optional[Dict[str, Any]] = None
     compliance_status: str
     compliance_issues: List[Dict[str, Any]] = []
+    compliance_checked_at: Optional[datetime] = None
+    template_version: Optional[int] = None
+    content_hash: Optional[str] = None
+    # Digests of cached exports (download with GET /labels/{id}/exports/{format})
+    png_hash: Optional[str] = None
+    pdf_hash: Optional[str] = None
+    svg_hash: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class StaleLabelResponse(BaseModel):
+    id: UUID
+    name: Optional[str] = None
+    product_id: UUID
+    product_name: str
+    template_id: UUID
+    product_changed: bool  # recipe, ingredient values or serving size changed since capture
+    template_changed: bool  # template edited since capture
+    created_at: datetime
+
+
+class ComplianceSweepResponse(BaseModel):
+    labels: int
+    checked: int  # labels whose inputs changed and were re-checked
+    skipped: int  # labels unchanged since their last check
+
+
+# ============== Job Schemas ==============
+
+class JobCreate(BaseModel):
+    kind: str  # compliance_sweep, export_labels; admins also recalculate_ingredient, recalculate_retention_table, backfill_content_hashes, seed
+    payload: Dict[str, Any] = {}
+    priority: int = Field(0, ge=-100, le=100)  # Higher runs first
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int
+    status: str  # queued, running, succeeded, failed, cancelled
+    attempts: int
+    max_attempts: int
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
     created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -568,5 +789,38 @@ class RDATableResponse(RDATableBase):
         from_attributes = True
 
 
+# ============== Retention Table Schemas ==============
+
+class RetentionTableBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    code: str = Field(..., min_length=1, max_length=50)
+    description: Optional[str] = Field(None, max_length=500)
+    source: Optional[str] = Field(None, max_length=255)
+    factors: Dict[str, Decimal] = {}  # nutrient_key -> retention factor (0-1)
+
+
+class RetentionTableCreate(RetentionTableBase):
+    pass
+
+
+class RetentionTableUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    code: Optional[str] = Field(None, min_length=1, max_length=50)
+    description: Optional[str] = Field(None, max_length=500)
+    source: Optional[str] = Field(None, max_length=255)
+    factors: Optional[Dict[str, Decimal]] = None
+    is_active: Optional[bool] = None
+
+
+class RetentionTableResponse(RetentionTableBase):
+    id: UUID
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # Update forward references
 LabelTypeDetailResponse.model_rebuild()
@@ -0,0 +1,177 @@
+"""
+Admission Control Service
+Keeps label rendering from starving the rest of the API: per-user token
+buckets limit how fast one account can start exports, a semaphore caps
+concurrent renders at the size of the render pool, and a bounded wait queue
+sheds load with 429 + Retry-After instead of letting requests pile up.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Hashable
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+# Per-user buckets kept before full (idle) ones are dropped
+MAX_BUCKETS = 10_000
+
+
+class AdmissionRejected(HTTPException):
+    """429 with Retry-After (seconds, rounded up)"""
+
+    def __init__(self, detail: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class TokenBucket:
+    """`burst` tokens, refilled continuously at `rate` tokens per second"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 on success, else seconds until they are available"""
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class AdmissionController:
+    """
+    Admission for one kind of expensive work within a process.
+
+    `check_rate(user)` charges the user's bucket when a request arrives;
+    `slot()` holds one of `concurrency` render slots for the duration of the
+    work, waiting in a queue of at most `max_waiting` requests for up to
+    `wait_timeout` seconds. Background jobs use `slot(bounded=False)`, which
+    waits as long as it takes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        max_waiting: int,
+        wait_timeout: float,
+        rate_per_minute: float,
+        burst: int,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+        # Metrics
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {"rate_limited": 0, "queue_full": 0, "timeout": 0}
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._work_total = 0.0
+
+    def check_rate(self, user_id: Hashable, cost: float = 1.0) -> None:
+        """Charge a user's bucket; raises AdmissionRejected when it is empty"""
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                now = time.monotonic()
+                self._buckets = {key: b for key, b in self._buckets.items() if not b.is_full(now)}
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+
+        wait = bucket.take(min(cost, self.burst))
+        if wait:
+            self.rejected["rate_limited"] += 1
+            raise AdmissionRejected("Export rate limit reached, retry later", wait)
+
+    def _estimated_wait(self) -> float:
+        """Seconds until a slot frees up for a newcomer, from the average work time"""
+        average = self._work_total / self.admitted if self.admitted else 1.0
+        return average * (self.waiting + 1) / self.concurrency
+
+    @asynccontextmanager
+    async def slot(self, bounded: bool = True):
+        if self._semaphore.locked() and bounded and self.waiting >= self.max_waiting:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected("Export queue is full, retry later", self._estimated_wait())
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            if bounded:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+            else:
+                await self._semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.rejected["timeout"] += 1
+            raise AdmissionRejected("Timed out waiting for an export slot, retry later", self._estimated_wait())
+        finally:
+            self.waiting -= 1
+
+        acquired = time.monotonic()
+        waited = acquired - started
+        self._waits += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.admitted += 1
+            self._work_total += time.monotonic() - acquired
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait_avg_ms": round(self._wait_total / self._waits * 1000, 1) if self._waits else 0.0,
+            "wait_max_ms": round(self._wait_max * 1000, 1),
+            "work_avg_ms": round(self._work_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "tracked_users": len(self._buckets),
+        }
+
+
+# Label rendering (export endpoint and export_labels jobs)
+export_admission = AdmissionController(
+    "export",
+    concurrency=settings.EXPORT_CONCURRENCY,
+    max_waiting=settings.EXPORT_QUEUE_SIZE,
+    wait_timeout=settings.EXPORT_QUEUE_TIMEOUT_SECONDS,
+    rate_per_minute=settings.EXPORT_RATE_PER_MINUTE,
+    burst=settings.EXPORT_BURST,
+)
@@ -0,0 +1,300 @@
+"""
+Blob Store Service
+Content-addressed storage for rendered label files (PNG, PDF, SVG). Blobs are
+keyed by the SHA-256 of their bytes, so the database only keeps the hex digest
+and identical renders are stored once.
+
+Two backends, chosen with BLOB_STORE:
+- "local": files under BLOB_STORE_DIR, served with FileResponse (the server
+  streams the file itself; no bytes pass through the database driver)
+- "s3": any S3-compatible bucket (AWS, MinIO, ...); downloads redirect to a
+  short-lived presigned URL
+
+Unreferenced blobs are removed with: python -m app.services.blob_store gc
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+from uuid import uuid4
+
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from app.core.config import settings
+
+
+def blob_digest(data: bytes) -> str:
+    """Key of a blob: SHA-256 hex digest of its bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobNotFound(LookupError):
+    """Raised when a digest has no blob in the store"""
+
+
+class BlobStore(ABC):
+    """
+    Base class for blob stores.
+
+    Backends implement the blocking primitives (`contains`, `touch`, `write`,
+    `read`, `remove`, `digests`, `response`); request handlers use the async `put`,
+    `get` and `delete`, which run them in a thread.
+    """
+
+    @abstractmethod
+    def contains(self, digest: str) -> bool:
+        """Whether a blob with this digest is stored"""
+
+    @abstractmethod
+    def touch(self, digest: str) -> bool:
+        """Reset a stored blob's last-modified time to now; False if it isn't stored"""
+
+    @abstractmethod
+    def write(self, digest: str, data: bytes) -> None:
+        """Store `data` under `digest` (overwriting is harmless: same digest, same bytes)"""
+
+    @abstractmethod
+    def read(self, digest: str) -> bytes:
+        """Bytes of a blob; raises BlobNotFound"""
+
+    @abstractmethod
+    def remove(self, digest: str) -> None:
+        """Delete a blob if present"""
+
+    @abstractmethod
+    def digests(self) -> Iterator[Tuple[str, float]]:
+        """Every stored (digest, last-modified timestamp)"""
+
+    @abstractmethod
+    def response(self, digest: str, media_type: str, filename: str, headers: Optional[dict] = None) -> Response:
+        """Download response for a blob"""
+
+    def put_sync(self, data: bytes) -> str:
+        """Store `data` unless an identical blob exists; returns its digest
+
+        A reused blob is touched, so garbage collection gives it the same grace
+        period as a fresh write while the label referencing it is committed.
+        """
+        digest = blob_digest(data)
+        if not self.touch(digest):
+            self.write(digest, data)
+        return digest
+
+    async def put(self, data: bytes) -> str:
+        return await asyncio.to_thread(self.put_sync, data)
+
+    async def get(self, digest: str) -> bytes:
+        return await asyncio.to_thread(self.read, digest)
+
+    async def delete(self, digest: str) -> None:
+        await asyncio.to_thread(self.remove, digest)
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, fanned out as ab/cd/abcd... by digest"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def contains(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def touch(self, digest: str) -> bool:
+        try:
+            os.utime(self.path(digest))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def write(self, digest: str, data: bytes) -> None:
+        path = self.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{digest}.{os.getpid()}.{uuid4().hex[:8]}.tmp")
+        tmp_path.write_bytes(data)
+        # Atomic publish: readers never see a partial file, and concurrent
+        # writers of the same digest write the same bytes
+        os.replace(tmp_path, path)
+
+    def read(self, digest: str) -> bytes:
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+
+    def remove(self, digest: str) -> None:
+        self.path(digest).unlink(missing_ok=True)
+
+    def digests(self) -> Iterator[Tuple[str, float]]:
+        for path in self.root.glob("??/??/*"):
+            if path.is_file() and len(path.name) == 64:
+                yield path.name, path.stat().st_mtime
+
+    def response(self, digest: str, media_type: str, filename: str, headers: Optional[dict] = None) -> Response:
+        path = self.path(digest)
+        if not path.is_file():
+            raise BlobNotFound(digest)
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs as objects in an S3-compatible bucket.
+
+    `client` is a boto3 S3 client or anything with the same methods
+    (put_object, head_object, copy_object, get_object, delete_object,
+    list_objects_v2, generate_presigned_url), e.g. one pointed at a local MinIO.
+    """
+
+    def __init__(self, client: Any, bucket: str, prefix: str = "", url_expires_seconds: int = 300):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expires_seconds = url_expires_seconds
+
+    def key(self, digest: str) -> str:
+        return f"{self.prefix}{digest}"
+
+    def contains(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(digest))
+        except Exception as e:
+            if _s3_not_found(e):
+                return False
+            raise
+        return True
+
+    def touch(self, digest: str) -> bool:
+        # Copying an object onto itself is how S3 updates LastModified
+        key = self.key(digest)
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket, Key=key, CopySource={"Bucket": self.bucket, "Key": key}, MetadataDirective="REPLACE"
+            )
+        except Exception as e:
+            if _s3_not_found(e):
+                return False
+            raise
+        return True
+
+    def write(self, digest: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.key(digest), Body=data)
+
+    def read(self, digest: str) -> bytes:
+        try:
+            result = self.client.get_object(Bucket=self.bucket, Key=self.key(digest))
+        except Exception as e:
+            if _s3_not_found(e):
+                raise BlobNotFound(digest)
+            raise
+        return result["Body"].read()
+
+    def remove(self, digest: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(digest))
+
+    def digests(self) -> Iterator[Tuple[str, float]]:
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        while True:
+            result = self.client.list_objects_v2(**kwargs)
+            for item in result.get("Contents", []):
+                digest = item["Key"][len(self.prefix):]
+                modified = item.get("LastModified")
+                yield digest, modified.timestamp() if isinstance(modified, datetime) else 0.0
+            if not result.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = result["NextContinuationToken"]
+
+    def response(self, digest: str, media_type: str, filename: str, headers: Optional[dict] = None) -> Response:
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.key(digest),
+                "ResponseContentType": media_type,
+                "ResponseContentDisposition": f'attachment; filename="{filename}"',
+            },
+            ExpiresIn=self.url_expires_seconds,
+        )
+        return RedirectResponse(url, status_code=307, headers=headers)
+
+
+def _s3_not_found(error: Exception) -> bool:
+    """Whether a botocore ClientError (or look-alike) is a 404"""
+    code = str(getattr(error, "response", {}).get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    """The configured blob store (BLOB_STORE = local | s3)"""
+    if settings.BLOB_STORE == "s3":
+        import boto3  # Optional dependency, only needed for the S3 backend
+
+        client = boto3.client("s3", endpoint_url=settings.BLOB_S3_ENDPOINT_URL or None)
+        return S3BlobStore(
+            client,
+            settings.BLOB_S3_BUCKET,
+            prefix=settings.BLOB_S3_PREFIX,
+            url_expires_seconds=settings.BLOB_URL_EXPIRE_SECONDS,
+        )
+    if settings.BLOB_STORE != "local":
+        raise ValueError(f"Unknown BLOB_STORE '{settings.BLOB_STORE}' (expected 'local' or 's3')")
+    return LocalBlobStore(settings.BLOB_STORE_DIR)
+
+
+async def collect_garbage(grace_seconds: float = 3600.0) -> int:
+    """Delete blobs no label references
+
+    Blobs written or reused (touched) within `grace_seconds` are kept: an export
+    job stores its blobs before committing the labels that reference them.
+    """
+    from sqlalchemy import select, union
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.label import Label
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            union(select(Label.png_hash), select(Label.pdf_hash), select(Label.svg_hash))
+        )
+        referenced = set(result.scalars().all())
+
+    store = get_blob_store()
+    cutoff = time.time() - grace_seconds
+
+    def sweep() -> int:
+        removed = 0
+        # Listed lazily, so each timestamp is read just before its blob is judged
+        for digest, modified in store.digests():
+            if digest not in referenced and modified < cutoff:
+                store.remove(digest)
+                removed += 1
+        return removed
+
+    return await asyncio.to_thread(sweep)
+
+
+async def main(grace_seconds: float):
+    from app.core.database import engine
+
+    removed = await collect_garbage(grace_seconds)
+    await engine.dispose()
+    print(f"✓ Removed {removed} unreferenced blob(s)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] != "gc":
+        print("Usage: python -m app.services.blob_store gc [--grace-hours N]")
+        sys.exit(1)
+    grace_hours = float(args[args.index("--grace-hours") + 1]) if "--grace-hours" in args else 1.0
+    asyncio.run(main(grace_hours * 3600))
@@ -0,0 +1,302 @@
+"""
+Nutrient Claims Service
+Declarative per-regulation claim rules (low fat, high protein, sugar free, ...)
+evaluated column-wise across a whole catalog's nutrient vectors, with results
+materialized in product_claims and refreshed only for products that changed
+"""
+
+import hashlib
+import operator
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.product import Product, ProductClaim
+from app.services.daily_values import NUTRIENT_INDEX
+from app.services.nutrition_calculator import NutritionCalculator
+from app.services.recipe_graph import RecipeEvaluator, RecipeNode
+from app.services.units import VOLUME, unit_dimension
+
+
+PER_SERVING = "per_serving"
+PER_100 = "per_100"  # per 100 g, or per 100 ml for liquids
+PERCENT_ENERGY = "percent_energy"  # share of calories from the nutrient
+
+# kcal per gram, for PERCENT_ENERGY conditions
+ENERGY_FACTORS = {"total_fat": 9, "saturated_fat": 9, "trans_fat": 9, "total_carbs": 4, "protein": 4}
+
+_OPERATORS: Dict[str, Callable[[Decimal, Decimal], bool]] = {
+    "lt": operator.lt,
+    "le": operator.le,
+    "ge": operator.ge,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    """`nutrient` on `basis` compared with `value` (`liquid_value` for products served by volume)"""
+    nutrient: str
+    op: str
+    value: Decimal
+    basis: str = PER_SERVING
+    liquid_value: Optional[Decimal] = None
+
+
+@dataclass(frozen=True)
+class ClaimRule:
+    """A claim qualifies when every condition holds"""
+    code: str
+    name: str
+    conditions: Tuple[Condition, ...]
+
+
+def _c(nutrient: str, op: str, value: str, basis: str = PER_SERVING, liquid: Optional[str] = None) -> Condition:
+    return Condition(nutrient, op, Decimal(value), basis, Decimal(liquid) if liquid else None)
+
+
+# 21 CFR 101.54, 101.60, 101.61, 101.62 - per serving (labeled serving used for RACC);
+# "high" / "good source" are 20% / 10% of the Daily Value
+FDA_CLAIMS: Tuple[ClaimRule, ...] = (
+    ClaimRule("calorie_free", "Calorie free", (_c("calories", "lt", "5"),)),
+    ClaimRule("low_calorie", "Low calorie", (_c("calories", "le", "40"),)),
+    ClaimRule("fat_free", "Fat free", (_c("total_fat", "lt", "0.5"),)),
+    ClaimRule("low_fat", "Low fat", (_c("total_fat", "le", "3"),)),
+    ClaimRule("saturated_fat_free", "Saturated fat free", (
+        _c("saturated_fat", "lt", "0.5"), _c("trans_fat", "lt", "0.5"),
+    )),
+    ClaimRule("low_saturated_fat", "Low saturated fat", (
+        _c("saturated_fat", "le", "1"), _c("saturated_fat", "le", "15", PERCENT_ENERGY),
+    )),
+    ClaimRule("cholesterol_free", "Cholesterol free", (
+        _c("cholesterol", "lt", "2"), _c("saturated_fat", "le", "2"),
+    )),
+    ClaimRule("low_cholesterol", "Low cholesterol", (
+        _c("cholesterol", "le", "20"), _c("saturated_fat", "le", "2"),
+    )),
+    ClaimRule("sodium_free", "Sodium free", (_c("sodium", "lt", "5"),)),
+    ClaimRule("very_low_sodium", "Very low sodium", (_c("sodium", "le", "35"),)),
+    ClaimRule("low_sodium", "Low sodium", (_c("sodium", "le", "140"),)),
+    ClaimRule("sugar_free", "Sugar free", (_c("total_sugars", "lt", "0.5"),)),
+    ClaimRule("high_protein", "High protein", (_c("protein", "ge", "10"),)),
+    ClaimRule("source_of_protein", "Good source of protein", (_c("protein", "ge", "5"),)),
+    ClaimRule("high_fiber", "High fiber", (_c("dietary_fiber", "ge", "5.6"),)),
+    ClaimRule("source_of_fiber", "Good source of fiber", (_c("dietary_fiber", "ge", "2.8"),)),
+)
+
+# GSO 2333 / Codex CAC/GL 23-1997 - per 100 g (liquids per 100 ml)
+GSO_CLAIMS: Tuple[ClaimRule, ...] = (
+    ClaimRule("low_calorie", "Low energy", (_c("calories", "le", "40", PER_100, liquid="20"),)),
+    ClaimRule("fat_free", "Fat free", (_c("total_fat", "le", "0.5", PER_100),)),
+    ClaimRule("low_fat", "Low fat", (_c("total_fat", "le", "3", PER_100, liquid="1.5"),)),
+    ClaimRule("saturated_fat_free", "Saturated fat free", (_c("saturated_fat", "le", "0.1", PER_100),)),
+    ClaimRule("low_saturated_fat", "Low saturated fat", (
+        _c("saturated_fat", "le", "1.5", PER_100, liquid="0.75"),
+        _c("saturated_fat", "le", "10", PERCENT_ENERGY),
+    )),
+    ClaimRule("cholesterol_free", "Cholesterol free", (
+        _c("cholesterol", "le", "5", PER_100),
+        _c("saturated_fat", "le", "1.5", PER_100, liquid="0.75"),
+        _c("saturated_fat", "le", "10", PERCENT_ENERGY),
+    )),
+    ClaimRule("low_cholesterol", "Low cholesterol", (
+        _c("cholesterol", "le", "20", PER_100, liquid="10"),
+        _c("saturated_fat", "le", "1.5", PER_100, liquid="0.75"),
+        _c("saturated_fat", "le", "10", PERCENT_ENERGY),
+    )),
+    ClaimRule("sodium_free", "Sodium free", (_c("sodium", "le", "5", PER_100),)),
+    ClaimRule("very_low_sodium", "Very low sodium", (_c("sodium", "le", "40", PER_100),)),
+    ClaimRule("low_sodium", "Low sodium", (_c("sodium", "le", "120", PER_100),)),
+    ClaimRule("sugar_free", "Sugars free", (_c("total_sugars", "le", "0.5", PER_100),)),
+    ClaimRule("low_sugar", "Low sugars", (_c("total_sugars", "le", "5", PER_100),)),
+    ClaimRule("high_protein", "High in protein", (_c("protein", "ge", "10", PER_100, liquid="5"),)),
+    ClaimRule("source_of_protein", "Source of protein", (_c("protein", "ge", "5", PER_100, liquid="2.5"),)),
+    ClaimRule("high_fiber", "High in fibre", (_c("dietary_fiber", "ge", "6", PER_100),)),
+    ClaimRule("source_of_fiber", "Source of fibre", (_c("dietary_fiber", "ge", "3", PER_100),)),
+)
+
+CLAIM_RULES: Dict[str, Tuple[ClaimRule, ...]] = {
+    "fda": FDA_CLAIMS,
+    "gso": GSO_CLAIMS,
+}
+
+# Changes whenever a rule does, so stored claims are re-evaluated after rule edits
+RULES_VERSION = hashlib.sha256(repr(sorted(CLAIM_RULES.items())).encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ClaimInput:
+    """One product's nutrient vectors (aligned with NUTRIENT_KEYS)"""
+    per_serving: Tuple[Decimal, ...]
+    per_100: Tuple[Decimal, ...]
+    liquid: bool
+
+
+def claim_input(product: Product, totals: Sequence[Decimal], weight: Decimal, serving_weight: Decimal) -> ClaimInput:
+    """Per-serving and per-100 g/ml vectors for a product's recipe totals"""
+    return ClaimInput(
+        per_serving=tuple(NutritionCalculator.scale_totals(list(totals), serving_weight, weight)),
+        per_100=tuple(NutritionCalculator.scale_totals(list(totals), Decimal("100"), weight)),
+        liquid=unit_dimension(product.serving_unit) == VOLUME,
+    )
+
+
+def evaluate_claims(
+    inputs: Sequence[ClaimInput],
+    regulations: Iterable[str] = tuple(CLAIM_RULES),
+) -> List[List[Tuple[str, str]]]:
+    """
+    (regulation, claim) pairs each product qualifies for.
+
+    Works column-wise: every (basis, nutrient) column is extracted once, every
+    distinct condition becomes one boolean column over all products, and a
+    rule is the AND of its condition columns, so shared conditions (e.g. the
+    saturated fat limits) are checked once per catalog rather than per rule.
+    """
+    count = len(inputs)
+    liquid = [item.liquid for item in inputs]
+    columns: Dict[Tuple[str, str], List[Decimal]] = {}
+    masks: Dict[Condition, List[bool]] = {}
+
+    def column(basis: str, nutrient: str) -> List[Decimal]:
+        key = (basis, nutrient)
+        if key not in columns:
+            index = NUTRIENT_INDEX[nutrient]
+            if basis == PERCENT_ENERGY:
+                calories = column(PER_100, "calories")
+                amounts = column(PER_100, nutrient)
+                factor = ENERGY_FACTORS[nutrient]
+                columns[key] = [
+                    amount * factor * 100 / kcal if kcal else Decimal("0")
+                    for amount, kcal in zip(amounts, calories)
+                ]
+            else:
+                columns[key] = [getattr(item, basis)[index] for item in inputs]
+        return columns[key]
+
+    def mask(condition: Condition) -> List[bool]:
+        if condition not in masks:
+            compare = _OPERATORS[condition.op]
+            values = column(condition.basis, condition.nutrient)
+            if condition.liquid_value is None:
+                masks[condition] = [compare(v, condition.value) for v in values]
+            else:
+                masks[condition] = [
+                    compare(v, condition.liquid_value if is_liquid else condition.value)
+                    for v, is_liquid in zip(values, liquid)
+                ]
+        return masks[condition]
+
+    results: List[List[Tuple[str, str]]] = [[] for _ in range(count)]
+    for regulation in regulations:
+        for rule in CLAIM_RULES[regulation]:
+            qualifies = [True] * count
+            for condition in rule.conditions:
+                qualifies = [a and b for a, b in zip(qualifies, mask(condition))]
+            for i, ok in enumerate(qualifies):
+                if ok:
+                    results[i].append((regulation, rule.code))
+    return results
+
+
+async def write_claims(
+    db: AsyncSession,
+    evaluator: RecipeEvaluator,
+    products: Sequence[Product],
+    nodes: Dict[UUID, RecipeNode],
+    force: bool = False,
+) -> int:
+    """
+    Replace the claim rows of evaluated products whose recipe fingerprint,
+    serving size or rule set changed since their last refresh (all of them with
+    `force`), in the caller's transaction; returns how many were rewritten.
+    """
+    changed, inputs, fingerprints = [], [], []
+    for product in products:
+        node = nodes.get(product.id)
+        recipe_key = evaluator.fingerprint(product.id) if node else "unevaluable"
+        fingerprint = hashlib.sha256(
+            f"{recipe_key}|{product.serving_size}|{product.serving_unit}|{RULES_VERSION}".encode()
+        ).hexdigest()
+        if not force and fingerprint == product.claims_fingerprint:
+            continue
+        changed.append(product)
+        fingerprints.append(fingerprint)
+        inputs.append(
+            claim_input(product, node.totals, node.weight, evaluator.serving_weight(product)) if node else None
+        )
+
+    if not changed:
+        return 0
+
+    qualified = evaluate_claims([item for item in inputs if item is not None])
+    claims_by_product: Dict[UUID, List[Tuple[str, str]]] = {}
+    evaluable = iter(qualified)
+    for product, item in zip(changed, inputs):
+        claims_by_product[product.id] = next(evaluable) if item is not None else []
+
+    now = datetime.utcnow()
+    await db.execute(delete(ProductClaim).where(ProductClaim.product_id.in_(claims_by_product)))
+    rows = [
+        {"id": uuid4(), "product_id": product_id, "regulation": regulation, "claim": claim, "evaluated_at": now}
+        for product_id, claims in claims_by_product.items()
+        for regulation, claim in claims
+    ]
+    if rows:
+        await db.execute(insert(ProductClaim), rows)
+    # updated_at is passed through so a refresh doesn't look like a user edit
+    await db.execute(
+        update(Product),
+        [
+            {"id": product.id, "claims_fingerprint": fingerprint, "updated_at": product.updated_at}
+            for product, fingerprint in zip(changed, fingerprints)
+        ],
+    )
+    return len(changed)
+
+
+async def refresh_claims(
+    db: AsyncSession,
+    product_ids: Optional[Iterable[UUID]] = None,
+    user_id: Optional[UUID] = None,
+    force: bool = False,
+    batch_size: int = 500,
+) -> Tuple[int, int]:
+    """
+    Bring materialized claims up to date; returns (products evaluated, products rewritten).
+
+    Products are evaluated in batches through the recipe graph (fingerprint-cached
+    nodes make unchanged recipes cheap). Only products whose recipe fingerprint,
+    serving size or rule set changed since the last refresh get their claim
+    rows replaced.
+    """
+    query = select(Product.id)
+    if product_ids is not None:
+        query = query.where(Product.id.in_(set(product_ids)))
+    if user_id is not None:
+        query = query.where(Product.user_id == user_id)
+    ids = sorted((await db.execute(query)).scalars().all(), key=str)
+
+    evaluator = RecipeEvaluator(db)
+    evaluated = rewritten = 0
+    for start in range(0, len(ids), batch_size):
+        result = await db.execute(
+            select(Product)
+            .where(Product.id.in_(ids[start:start + batch_size]))
+            .options(selectinload(Product.ingredients))
+        )
+        products = list(result.scalars().all())
+        nodes = await evaluator.evaluate_many(products, strict=False)
+        evaluated += len(products)
+
+        changed = await write_claims(db, evaluator, products, nodes, force)
+        if changed:
+            await db.commit()
+            rewritten += changed
+
+    return evaluated, rewritten
@@ -0,0 +1,364 @@
+"""
+Label Compliance Service
+Checks saved labels against their label type (mandatory nutrients, required
+footnotes, regulatory rounding, minimum type size) and stores the result on
+the label. Labels whose inputs are unchanged since their last check are skipped.
+
+Nightly sweep over every label:
+    python -m app.services.compliance [--force]
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.label import Label
+from app.models.label_type import LabelType
+from app.models.label_type_nutrient import LabelTypeNutrient
+from app.models.nutrient_definition import NutrientDefinition
+from app.models.product import Product
+from app.models.template import Template
+from app.services.daily_values import NUTRIENT_KEYS
+from app.services.rounding import REGION_REGULATIONS, RoundingTable, get_rounding_table
+
+
+# Smallest permitted type size in CSS px at 96 DPI (FDA 21 CFR 101.9(d)(1)(iii): 6 pt;
+# EU 1169/2011 Annex IV: 1.2 mm x-height, roughly 8 pt)
+MIN_FONT_PX: Dict[str, Decimal] = {
+    "fda": Decimal("8"),
+    "gso": Decimal("8"),
+    "eu": Decimal("10.7"),
+}
+
+# Mandatory nutrients declared from another matrix nutrient
+DERIVED_NUTRIENTS = {"salt": "sodium"}
+
+# Bump when the checks change so every label is re-checked on the next sweep
+CHECKS_VERSION = "1"
+
+ERROR = "error"
+WARNING = "warning"
+
+
+@dataclass(frozen=True)
+class LabelRequirements:
+    """What a label type demands of every label using it"""
+    code: str
+    regulation: str
+    mandatory: Tuple[Tuple[str, str, bool], ...]  # (nutrient key, name, shown by default)
+    required_footnotes: Tuple[str, ...]
+
+
+DEFAULT_REQUIREMENTS = LabelRequirements(code="", regulation="fda", mandatory=(), required_footnotes=())
+
+
+def _issue(code: str, message: str, severity: str = ERROR, **details) -> dict:
+    return {"code": code, "severity": severity, "message": message, **details}
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def _displayed_nutrients(template: Template) -> Optional[Dict[str, bool]]:
+    """Nutrient key -> shown, from the template's overrides; None when the label type defaults apply"""
+    configured = template.custom_nutrients or (template.nutrition_config or {}).get("nutrients")
+    if not configured:
+        return None
+    if isinstance(configured, dict):
+        return {
+            key: bool(value.get("show", True) if isinstance(value, dict) else value)
+            for key, value in configured.items()
+        }
+    return {
+        item["key"]: bool(item.get("show", True))
+        for item in configured
+        if isinstance(item, dict) and item.get("key")
+    }
+
+
+def _nutrition_boxes(template: Template) -> List[dict]:
+    return [
+        element for element in (template.elements or [])
+        if isinstance(element, dict) and element.get("type") == "nutrition-box"
+    ]
+
+
+def check_label(label: Label, template: Template, requirements: Optional[LabelRequirements]) -> List[dict]:
+    """All compliance issues for one label"""
+    issues: List[dict] = []
+    if requirements is None:
+        issues.append(_issue(
+            "no_label_type", "Template has no label type; checked against FDA defaults", WARNING
+        ))
+        requirements = DEFAULT_REQUIREMENTS
+    rounding = get_rounding_table(requirements.regulation)
+    snapshot = label.nutrition_snapshot or {}
+
+    # Mandatory nutrients must be displayed and have a value
+    displayed = _displayed_nutrients(template)
+    for key, name, shown_by_default in requirements.mandatory:
+        shown = shown_by_default if displayed is None else displayed.get(key, False)
+        if not shown:
+            issues.append(_issue("mandatory_nutrient_hidden", f"{name} must be declared", nutrient=key))
+        source = DERIVED_NUTRIENTS.get(key, key)
+        if snapshot and source not in snapshot:
+            issues.append(_issue(
+                "mandatory_nutrient_missing", f"No value for {name} in the nutrition snapshot", nutrient=key
+            ))
+
+    # Required footnotes must not be dropped by template overrides
+    if requirements.required_footnotes:
+        if template.custom_footnotes is not None:
+            texts = {
+                (f.get("text") if isinstance(f, dict) else f)
+                for f in template.custom_footnotes
+            }
+            for text in requirements.required_footnotes:
+                if text not in texts:
+                    issues.append(_issue("footnote_missing", f"Required footnote missing: {text}"))
+        for box in _nutrition_boxes(template):
+            if (box.get("properties") or {}).get("dailyValueFootnote") is False:
+                issues.append(_issue(
+                    "footnote_hidden", "Nutrition box hides the required footnote", element=box.get("id")
+                ))
+
+    # Declared values must already be rounded per the regulation
+    if not snapshot:
+        issues.append(_issue("snapshot_missing", "Label has no nutrition snapshot to verify", WARNING))
+    else:
+        issues.extend(_rounding_issues(snapshot, rounding))
+
+    # Minimum type size and panel placement
+    min_font = MIN_FONT_PX.get(requirements.regulation, MIN_FONT_PX["fda"])
+    base_size = _to_decimal((template.styles or {}).get("fontSize"))
+    if base_size is not None and base_size < min_font:
+        issues.append(_issue("font_too_small", f"Base font size {base_size}px is below {min_font}px"))
+    width, height = template.width or 0, template.height or 0
+    for box in _nutrition_boxes(template):
+        properties = box.get("properties") or {}
+        size = _to_decimal(properties.get("fontSize"))
+        if size is not None and size < min_font:
+            issues.append(_issue(
+                "font_too_small",
+                f"Nutrition box font size {size}px is below {min_font}px",
+                element=box.get("id"),
+            ))
+        x, y = box.get("x") or 0, box.get("y") or 0
+        if x < 0 or y < 0 or x + (box.get("width") or 0) > width or y + (box.get("height") or 0) > height:
+            issues.append(_issue(
+                "panel_out_of_bounds", "Nutrition box extends past the label edges", element=box.get("id")
+            ))
+
+    return issues
+
+
+def _rounding_issues(snapshot: dict, rounding: RoundingTable) -> List[dict]:
+    issues = []
+    for key in NUTRIENT_KEYS:
+        value = _to_decimal(snapshot.get(key)) if snapshot.get(key) is not None else None
+        if value is None:
+            continue
+        expected = rounding.round(value, key)
+        if expected.amount is not None and expected.amount != value:
+            issues.append(_issue(
+                "rounding",
+                f"{key} declared as {value}; {rounding.code.upper()} rounding gives {expected.text}",
+                nutrient=key,
+            ))
+    return issues
+
+
+def compliance_hash(label: Label, template: Template, requirements: Optional[LabelRequirements]) -> str:
+    """Hash of everything check_label reads; unchanged hash means an unchanged result"""
+    payload = {
+        "version": CHECKS_VERSION,
+        "snapshot": label.nutrition_snapshot,
+        "template": [
+            template.width, template.height, template.elements, template.styles,
+            template.nutrition_config, template.custom_nutrients, template.custom_footnotes,
+        ],
+        "requirements": repr(requirements),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+async def load_requirements(
+    db: AsyncSession,
+    label_type_ids: Iterable[UUID],
+    cache: Optional[Dict[UUID, LabelRequirements]] = None,
+) -> Dict[UUID, LabelRequirements]:
+    """Compile requirements for label types (two queries for all missing ones)"""
+    cache = {} if cache is None else cache
+    missing = set(label_type_ids) - cache.keys()
+    if not missing:
+        return cache
+
+    result = await db.execute(
+        select(LabelType.id, LabelType.code, LabelType.region, LabelType.footnotes)
+        .where(LabelType.id.in_(missing))
+    )
+    types = result.all()
+
+    result = await db.execute(
+        select(
+            LabelTypeNutrient.label_type_id,
+            NutrientDefinition.key,
+            NutrientDefinition.name_en,
+            LabelTypeNutrient.show_by_default,
+        )
+        .join(NutrientDefinition, LabelTypeNutrient.nutrient_id == NutrientDefinition.id)
+        .where(LabelTypeNutrient.label_type_id.in_(missing), LabelTypeNutrient.is_mandatory == True)
+        .order_by(LabelTypeNutrient.display_order)
+    )
+    mandatory: Dict[UUID, list] = {}
+    for label_type_id, key, name, shown in result.all():
+        mandatory.setdefault(label_type_id, []).append((key, name, shown is not False))
+
+    for row in types:
+        cache[row.id] = LabelRequirements(
+            code=row.code,
+            regulation=REGION_REGULATIONS.get(row.region or "", "fda"),
+            mandatory=tuple(mandatory.get(row.id, ())),
+            required_footnotes=tuple(
+                f["text"] for f in (row.footnotes or []) if isinstance(f, dict) and f.get("required")
+            ),
+        )
+    return cache
+
+
+async def check_labels(
+    db: AsyncSession,
+    label_ids: Iterable[UUID],
+    force: bool = False,
+    requirements_cache: Optional[Dict[UUID, LabelRequirements]] = None,
+) -> Tuple[int, int]:
+    """
+    Check a batch of labels and store the results; returns (checked, skipped).
+
+    Labels whose compliance_hash still matches are skipped unless `force`.
+    Results are written with one executemany UPDATE.
+    """
+    result = await db.execute(
+        select(Label)
+        .where(Label.id.in_(set(label_ids)))
+        .options(selectinload(Label.template))
+    )
+    labels = list(result.scalars().all())
+
+    requirements = await load_requirements(
+        db,
+        {label.template.label_type_id for label in labels if label.template.label_type_id},
+        requirements_cache,
+    )
+
+    now = datetime.utcnow()
+    rows = []
+    for label in labels:
+        template = label.template
+        label_requirements = requirements.get(template.label_type_id) if template.label_type_id else None
+        digest = compliance_hash(label, template, label_requirements)
+        if not force and digest == label.compliance_hash:
+            continue
+
+        issues = check_label(label, template, label_requirements)
+        rows.append({
+            "id": label.id,
+            "compliance_status": "failed" if any(i["severity"] == ERROR for i in issues) else "passed",
+            "compliance_issues": issues,
+            "compliance_hash": digest,
+            "compliance_checked_at": now,
+            "updated_at": label.updated_at,  # a check is not an edit
+        })
+
+    if rows:
+        await db.execute(update(Label), rows)
+        await db.commit()
+    return len(rows), len(labels) - len(rows)
+
+
+async def run_compliance_sweep(
+    force: bool = False,
+    user_id: Optional[UUID] = None,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> Dict[str, int]:
+    """
+    Check every label (or one user's) in batches, with at most `concurrency`
+    batches in flight, each on its own session. Label type requirements are
+    compiled once per sweep and shared by all batches.
+
+    `progress(done, total)` is awaited after each batch (labels done so far);
+    an exception it raises stops the sweep.
+    """
+    concurrency = concurrency or settings.COMPLIANCE_CONCURRENCY
+    batch_size = batch_size or settings.COMPLIANCE_BATCH_SIZE
+
+    async with AsyncSessionLocal() as db:
+        query = select(Label.id).order_by(Label.id)
+        if user_id is not None:
+            query = query.join(Product, Label.product_id == Product.id).where(Product.user_id == user_id)
+        label_ids = list((await db.execute(query)).scalars().all())
+
+    semaphore = asyncio.Semaphore(concurrency)
+    requirements_cache: Dict[UUID, LabelRequirements] = {}
+    done = 0
+
+    async def run(batch: List[UUID]) -> Tuple[int, int]:
+        nonlocal done
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                result = await check_labels(db, batch, force, requirements_cache)
+            done += len(batch)
+            if progress is not None:
+                await progress(done, len(label_ids))
+            return result
+
+    tasks = [
+        asyncio.create_task(run(label_ids[start:start + batch_size]))
+        for start in range(0, len(label_ids), batch_size)
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # Cancelled (or a batch failed): stop the batches still queued or running
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return {
+        "labels": len(label_ids),
+        "checked": sum(checked for checked, _ in results),
+        "skipped": sum(skipped for _, skipped in results),
+    }
+
+
+async def main(force: bool = False):
+    started = time.perf_counter()
+    summary = await run_compliance_sweep(force=force)
+    print(
+        f"✓ Compliance sweep: {summary['checked']} checked, {summary['skipped']} unchanged "
+        f"of {summary['labels']} labels ({(time.perf_counter() - started) * 1000:.1f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(force="--force" in sys.argv[1:]))
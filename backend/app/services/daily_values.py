@@ -0,0 +1,252 @@
+"""
+Daily Value Service
+Compiles RDA tables and label type configurations into DV vectors aligned with
+the nutrition calculator's nutrient order, so %DV is one pass over two arrays
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Hashable, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.label_type import LabelType
+from app.models.label_type_nutrient import LabelTypeNutrient
+from app.models.nutrient_definition import NutrientDefinition
+from app.models.rda_table import RDATable
+from app.services.reference_cache import reference_cache, RDA_TABLES, LABEL_TYPES
+
+
+# Nutrients carried in the calculator's nutrient matrix, in matrix order
+NUTRIENT_KEYS: Tuple[str, ...] = (
+    "calories",
+    "total_fat",
+    "saturated_fat",
+    "trans_fat",
+    "cholesterol",
+    "sodium",
+    "total_carbs",
+    "dietary_fiber",
+    "total_sugars",
+    "added_sugars",
+    "protein",
+    "vitamin_d",
+    "calcium",
+    "iron",
+    "potassium",
+)
+NUTRIENT_INDEX: Dict[str, int] = {key: i for i, key in enumerate(NUTRIENT_KEYS)}
+
+# FDA Daily Values (2020 update), used when no RDA table or label type is selected
+# https://www.fda.gov/food/new-nutrition-facts-label/daily-value-new-nutrition-and-supplement-facts-labels
+FDA_DAILY_VALUES = {
+    "total_fat": Decimal("78"),        # g
+    "saturated_fat": Decimal("20"),    # g
+    "cholesterol": Decimal("300"),     # mg
+    "sodium": Decimal("2300"),         # mg
+    "total_carbs": Decimal("275"),     # g
+    "dietary_fiber": Decimal("28"),    # g
+    "added_sugars": Decimal("50"),     # g
+    "vitamin_d": Decimal("20"),        # mcg
+    "calcium": Decimal("1300"),        # mg
+    "iron": Decimal("18"),             # mg
+    "potassium": Decimal("4700"),      # mg
+    "vitamin_a": Decimal("900"),       # mcg RAE
+    "vitamin_c": Decimal("90"),        # mg
+    "vitamin_e": Decimal("15"),        # mg
+    "vitamin_k": Decimal("120"),       # mcg
+    "thiamin": Decimal("1.2"),         # mg
+    "riboflavin": Decimal("1.3"),      # mg
+    "niacin": Decimal("16"),           # mg NE
+    "vitamin_b6": Decimal("1.7"),      # mg
+    "folate": Decimal("400"),          # mcg DFE
+    "vitamin_b12": Decimal("2.4"),     # mcg
+    "biotin": Decimal("30"),           # mcg
+    "pantothenic_acid": Decimal("5"),  # mg
+    "phosphorus": Decimal("1250"),     # mg
+    "iodine": Decimal("150"),          # mcg
+    "magnesium": Decimal("420"),       # mg
+    "zinc": Decimal("11"),             # mg
+    "selenium": Decimal("55"),         # mcg
+    "copper": Decimal("0.9"),          # mg
+    "manganese": Decimal("2.3"),       # mg
+    "chromium": Decimal("35"),         # mcg
+    "molybdenum": Decimal("45"),       # mcg
+    "chloride": Decimal("2300"),       # mg
+    "choline": Decimal("550"),         # mg
+    "protein": Decimal("50"),          # g (not required on label but useful)
+}
+
+_HUNDRED = Decimal("100")
+_ZERO = Decimal("0")
+
+
+@dataclass(frozen=True)
+class DailyValueVector:
+    """
+    Daily values aligned with NUTRIENT_KEYS (None where no DV is established),
+    so %DV for a whole nutrient row is a single element-wise divide.
+    """
+    source: str
+    values: Tuple[Optional[Decimal], ...]
+
+    def percent(self, amounts: Sequence[Decimal]) -> Tuple[Decimal, ...]:
+        """%DV for amounts aligned with NUTRIENT_KEYS, rounded to whole percent"""
+        return tuple(
+            round((amount / dv) * _HUNDRED, 0) if dv is not None else _ZERO
+            for amount, dv in zip(amounts, self.values)
+        )
+
+    def percent_of(self, value: Decimal, nutrient: str) -> Decimal:
+        """%DV for a single nutrient"""
+        index = NUTRIENT_INDEX.get(nutrient)
+        dv = self.values[index] if index is not None else None
+        return round((value / dv) * _HUNDRED, 0) if dv is not None else _ZERO
+
+
+def compile_vector(source: str, *layers: Optional[Mapping[str, object]]) -> DailyValueVector:
+    """
+    Compile DV mappings into a vector; earlier layers win over later ones.
+
+    Missing, null and zero values mean "no DV established" for that nutrient.
+    """
+    values = []
+    for key in NUTRIENT_KEYS:
+        dv = None
+        for layer in layers:
+            if layer and layer.get(key) not in (None, 0):
+                dv = Decimal(str(layer[key]))
+                break
+        values.append(dv)
+
+    return DailyValueVector(source=source, values=tuple(values))
+
+
+FDA_VECTOR = compile_vector("fda_2020", FDA_DAILY_VALUES)
+
+# Rounding regulation -> RDA table region
+REGULATION_REGIONS = {
+    "fda": "USA",
+    "gso": "GCC",
+    "eu": "EU",
+}
+
+
+class DailyValueRegistry:
+    """
+    Compiled DV vectors per RDA table and per label type.
+
+    Entries are tagged with the RDA_TABLES / LABEL_TYPES versions from the
+    reference data cache, so admin edits recompile them on next use.
+    """
+
+    def __init__(self):
+        self._vectors: Dict[Hashable, Tuple[Tuple[int, int], DailyValueVector]] = {}
+
+    async def _versions(self, db: AsyncSession) -> Tuple[int, int]:
+        return (
+            await reference_cache.version(db, RDA_TABLES),
+            await reference_cache.version(db, LABEL_TYPES),
+        )
+
+    async def for_rda_table(self, db: AsyncSession, code: str) -> DailyValueVector:
+        """DV vector for an RDA table by code"""
+        versions = await self._versions(db)
+        cached = self._vectors.get(("rda", code))
+        if cached and cached[0] == versions:
+            return cached[1]
+
+        result = await db.execute(select(RDATable.values).where(RDATable.code == code))
+        row = result.first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"RDA table with code '{code}' not found"
+            )
+
+        vector = compile_vector(code, row.values)
+        self._vectors[("rda", code)] = (versions, vector)
+        return vector
+
+    async def for_label_type(self, db: AsyncSession, label_type_id: UUID) -> DailyValueVector:
+        """
+        DV vector for a label type.
+
+        Per-nutrient daily values configured on the label type win; nutrients
+        without one fall back to the RDA table for the label type's region.
+        """
+        versions = await self._versions(db)
+        cached = self._vectors.get(("label_type", label_type_id))
+        if cached and cached[0] == versions:
+            return cached[1]
+
+        result = await db.execute(
+            select(LabelType.code, LabelType.region).where(LabelType.id == label_type_id)
+        )
+        label_type = result.first()
+        if label_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Label type not found"
+            )
+
+        result = await db.execute(
+            select(NutrientDefinition.key, LabelTypeNutrient.daily_value)
+            .join(NutrientDefinition, LabelTypeNutrient.nutrient_id == NutrientDefinition.id)
+            .where(
+                LabelTypeNutrient.label_type_id == label_type_id,
+                LabelTypeNutrient.daily_value.isnot(None),
+            )
+        )
+        configured = {key: dv for key, dv in result.all()}
+
+        region_vector = await self.for_region(db, label_type.region) if label_type.region else None
+        region_values = dict(zip(NUTRIENT_KEYS, region_vector.values)) if region_vector else None
+
+        vector = compile_vector(label_type.code, configured, region_values)
+        self._vectors[("label_type", label_type_id)] = (versions, vector)
+        return vector
+
+    async def for_region(self, db: AsyncSession, region: str) -> Optional[DailyValueVector]:
+        """DV vector for a region's active RDA table (the default one first), if any"""
+        versions = await self._versions(db)
+        cached = self._vectors.get(("region", region))
+        if cached and cached[0] == versions:
+            return cached[1]
+
+        result = await db.execute(
+            select(RDATable.code, RDATable.values)
+            .where(RDATable.region == region, RDATable.is_active == True)
+            .order_by(RDATable.is_default.desc(), RDATable.effective_date.desc())
+            .limit(1)
+        )
+        row = result.first()
+        vector = compile_vector(row.code, row.values) if row else None
+        self._vectors[("region", region)] = (versions, vector)
+        return vector
+
+    async def for_regulation(self, db: AsyncSession, regulation: str) -> DailyValueVector:
+        """DV vector for a rounding regulation (fda, gso, eu) via its region's RDA table"""
+        vector = await self.for_region(db, REGULATION_REGIONS.get(regulation, ""))
+        if vector is not None:
+            return vector
+        return FDA_VECTOR if regulation == "fda" else compile_vector(regulation)
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        rda_table: Optional[str] = None,
+        label_type_id: Optional[UUID] = None,
+    ) -> DailyValueVector:
+        """Pick the vector for a request: label type, then RDA table, then FDA defaults"""
+        if label_type_id is not None:
+            return await self.for_label_type(db, label_type_id)
+        if rda_table:
+            return await self.for_rda_table(db, rda_table)
+        return FDA_VECTOR
+
+
+daily_values = DailyValueRegistry()
@@ -0,0 +1,417 @@
+"""
+Job Queue Service
+A durable job queue on the `jobs` table, so long-running work (mass
+recalculation, bulk exports, compliance sweeps, seeding) runs outside the
+request on SQLite or Postgres without a separate broker.
+
+Workers (app/worker.py) claim the highest-priority due job. On Postgres the
+claim uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers never wait
+on each other; on SQLite the claim is a conditional UPDATE that only one
+worker can win. Failed jobs are retried with exponential backoff up to
+max_attempts, and a running job whose lease lapses (worker died) is requeued.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import case, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job
+from app.models.label import Label
+from app.models.product import Product, ProductIngredient
+from app.services.admission import export_admission
+from app.services.blob_store import get_blob_store
+from app.services.compliance import run_compliance_sweep
+from app.services.recipe_graph import ancestor_ids, recompute_products
+from app.services.recipe_refresh import refresh_recipes
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Minimum seconds between progress writes (each one also renews the lease)
+PROGRESS_INTERVAL = 0.5
+
+
+class JobError(ValueError):
+    """Raised for jobs that cannot run at all (unknown kind, bad payload); these are not retried"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled or its lease taken over"""
+
+
+class JobContext:
+    """What a handler gets besides its payload: the job and a progress reporter"""
+
+    def __init__(self, job: Job, worker_id: str):
+        self.job = job
+        self.worker_id = worker_id
+        self.done = 0
+        self.total: Optional[int] = None
+        self._reported_at = 0.0
+        self.lease_lost = False
+
+    @property
+    def user_id(self) -> Optional[UUID]:
+        return self.job.user_id
+
+    async def progress(self, done: int, total: Optional[int] = None, force: bool = False) -> None:
+        """Record progress (throttled) and renew the lease; raises JobCancelled if the job was cancelled"""
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if not force and now - self._reported_at < PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        if not await self.renew_lease(progress=self.done, total=self.total):
+            raise JobCancelled()
+
+    async def renew_lease(self, **values) -> bool:
+        """Extend the lease (and write `values`); False if the job was cancelled or taken over"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == self.job.id, Job.status == RUNNING, Job.locked_by == self.worker_id)
+                .values(locked_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+        if result.rowcount == 0:
+            self.lease_lost = True
+        return not self.lease_lost
+
+
+JobHandler = Callable[[JobContext, dict], Awaitable[Optional[dict]]]
+
+# Job kind -> handler; handlers return a JSON-serializable result (or None)
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Register a coroutine as the handler for a job kind"""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+# Set by enqueue so idle in-process workers pick new jobs up without waiting for the next poll
+_wakeup: Optional[asyncio.Event] = None
+
+
+def wakeup_event() -> asyncio.Event:
+    global _wakeup
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    return _wakeup
+
+
+def _wake_workers(session) -> None:
+    wakeup_event().set()
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[dict] = None,
+    user_id: Optional[UUID] = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+) -> Job:
+    """
+    Add a job in the caller's transaction: it is queued when the caller commits,
+    together with the change that needs it (or not at all if that rolls back).
+    """
+    if kind not in JOB_HANDLERS:
+        raise JobError(f"Unknown job kind '{kind}'")
+
+    now = datetime.utcnow()
+    job = Job(
+        id=uuid4(),
+        user_id=user_id,
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=now,
+        progress=0,
+        created_at=now,
+    )
+    db.add(job)
+    await db.flush()
+    event.listen(db.sync_session, "after_commit", _wake_workers, once=True)
+    return job
+
+
+async def claim_next(db: AsyncSession, worker_id: str) -> Optional[Job]:
+    """Claim the highest-priority due job for `worker_id`, or None if the queue is empty"""
+    while True:
+        now = datetime.utcnow()
+        result = await db.execute(
+            select(Job.id)
+            .where(Job.status == QUEUED, Job.run_after <= now)
+            .order_by(Job.priority.desc(), Job.run_after, Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)  # No-op on SQLite
+        )
+        job_id = result.scalar_one_or_none()
+        if job_id is None:
+            await db.rollback()
+            return None
+
+        result = await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == QUEUED)
+            .values(
+                status=RUNNING,
+                attempts=Job.attempts + 1,
+                locked_by=worker_id,
+                locked_at=now,
+                started_at=func.coalesce(Job.started_at, now),
+            )
+        )
+        await db.commit()
+        if result.rowcount == 1:
+            result = await db.execute(
+                select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
+            )
+            return result.scalar_one()
+        # Another worker won this one (no row locks on SQLite); try the next
+
+
+async def requeue_expired(db: AsyncSession) -> int:
+    """Requeue running jobs whose lease lapsed, or fail them if out of attempts"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS))
+        .values(
+            status=case((Job.attempts >= Job.max_attempts, FAILED), else_=QUEUED),
+            error="Worker lease expired",
+            run_after=now,
+            locked_by=None,
+            locked_at=None,
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def _finish(job: Job, worker_id: str, **values) -> None:
+    """Write a job's outcome, unless it was cancelled or taken over meanwhile"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == RUNNING, Job.locked_by == worker_id)
+            .values(**values)
+        )
+        await db.commit()
+
+
+async def _heartbeat(context: JobContext, handler_task: asyncio.Task) -> None:
+    """Renew the lease while the handler runs, however long it goes between progress
+    updates; stops the handler if the job was cancelled or taken over"""
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+        try:
+            if not await context.renew_lease():
+                handler_task.cancel()
+                return
+        except Exception:
+            logger.exception("Could not renew the lease of job %s", context.job.id)
+
+
+async def run_job(job: Job, worker_id: str) -> None:
+    """Run a claimed job and record its outcome (success, retry or failure)"""
+    context = JobContext(job, worker_id)
+    try:
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            raise JobError(f"Unknown job kind '{job.kind}'")
+        handler_task = asyncio.ensure_future(handler(context, job.payload or {}))
+        heartbeat = asyncio.create_task(_heartbeat(context, handler_task))
+        try:
+            await asyncio.wait({handler_task})
+        except asyncio.CancelledError:
+            handler_task.cancel()
+            await asyncio.wait({handler_task})
+            raise
+        finally:
+            heartbeat.cancel()
+        if handler_task.cancelled():
+            # Stopped by the heartbeat: the job is no longer ours to finish
+            return
+        result = handler_task.result()
+    except JobCancelled:
+        return
+    except asyncio.CancelledError:
+        # Worker shutting down: hand the job back without using up an attempt
+        await _finish(
+            job, worker_id,
+            status=QUEUED, attempts=job.attempts - 1, run_after=datetime.utcnow(), locked_by=None, locked_at=None,
+        )
+        raise
+    except Exception as e:
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        error = f"{type(e).__name__}: {e}"
+        now = datetime.utcnow()
+        if job.attempts < job.max_attempts and not isinstance(e, JobError):
+            delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            await _finish(
+                job, worker_id,
+                status=QUEUED, error=error, run_after=now + timedelta(seconds=delay), locked_by=None, locked_at=None,
+            )
+        else:
+            await _finish(job, worker_id, status=FAILED, error=error, finished_at=now)
+        return
+
+    await _finish(
+        job, worker_id,
+        status=SUCCEEDED,
+        result=result,
+        error=None,
+        progress=context.total if context.total is not None else context.done,
+        total=context.total,
+        finished_at=datetime.utcnow(),
+    )
+
+
+def _chunks(ids: List, size: int) -> Iterable[List]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# ============== Handlers ==============
+
+@job_handler("recalculate_ingredient")
+async def recalculate_ingredient(context: JobContext, payload: dict) -> dict:
+    """After an ingredient edit: refresh content hashes, claims and yields of every recipe using it"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ProductIngredient.product_id)
+            .where(ProductIngredient.ingredient_id == UUID(payload["ingredient_id"]))
+        )
+        product_ids = await ancestor_ids(db, result.scalars().all())
+        await context.progress(0, len(product_ids), force=True)
+        changed, claims_updated = await refresh_recipes(db, product_ids, progress=context.progress)
+        await recompute_products(db, product_ids)
+    return {"products": len(product_ids), "hashes_changed": changed, "claims_updated": claims_updated}
+
+
+@job_handler("recalculate_retention_table")
+async def recalculate_retention_table(context: JobContext, payload: dict) -> dict:
+    """After retention factors change: refresh content hashes, claims and yields of every
+    product cooked with the table and every recipe using one of them"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Product.id).where(Product.retention_table_id == UUID(payload["retention_table_id"]))
+        )
+        product_ids = await ancestor_ids(db, result.scalars().all())
+        await context.progress(0, len(product_ids), force=True)
+        changed, claims_updated = await refresh_recipes(db, product_ids, progress=context.progress)
+        await recompute_products(db, product_ids)
+    return {"products": len(product_ids), "hashes_changed": changed, "claims_updated": claims_updated}
+
+
+@job_handler("backfill_content_hashes")
+async def backfill_content_hashes(context: JobContext, payload: dict) -> dict:
+    """Compute the content hashes still missing (rows from before hashing, or cleared by an edit whose refresh never ran)"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Product.id).where(Product.content_hash.is_(None)))
+        product_ids = result.scalars().all()
+        await context.progress(0, len(product_ids), force=True)
+        changed, claims_updated = await refresh_recipes(db, product_ids, progress=context.progress)
+    return {"products": len(product_ids), "hashes_changed": changed, "claims_updated": claims_updated}
+
+
+@job_handler("compliance_sweep")
+async def compliance_sweep(context: JobContext, payload: dict) -> dict:
+    """Compliance check over the job owner's labels (every label for system jobs)"""
+    await context.progress(0, force=True)
+    return await run_compliance_sweep(
+        force=bool(payload.get("force")), user_id=context.user_id, progress=context.progress
+    )
+
+
+@job_handler("export_labels")
+async def export_labels(context: JobContext, payload: dict) -> dict:
+    """Render saved labels from their snapshots into the blob store and record each digest on its label"""
+    # Heavy rendering stack: imported on first export, never at worker startup
+    from app.services.label_exporter import LabelExporter
+
+    export_format = payload.get("format", "pdf")
+    column = {"png": "png_hash", "pdf": "pdf_hash", "svg": "svg_hash"}.get(export_format)
+    if column is None:
+        raise JobError(f"Invalid export format '{export_format}'")
+
+    label_ids = [UUID(label_id) for label_id in payload.get("label_ids", [])]
+    exporter = LabelExporter()
+    store = get_blob_store()
+    export = getattr(exporter, f"export_{export_format}")
+    exported = processed = 0
+    await context.progress(0, len(label_ids), force=True)
+
+    async with AsyncSessionLocal() as db:
+        for batch in _chunks(label_ids, 100):
+            query = (
+                select(Label)
+                .join(Product, Label.product_id == Product.id)
+                .where(Label.id.in_(batch))
+                .options(selectinload(Label.template), selectinload(Label.product))
+            )
+            if context.user_id is not None:
+                query = query.where(Product.user_id == context.user_id)
+            rows = []
+            for label in (await db.execute(query)).scalars().all():
+                snapshot = label.nutrition_snapshot or {}
+                template = label.template
+                template_data = {
+                    "type": template.type,
+                    "width": template.width,
+                    "height": template.height,
+                    "language": template.language,
+                    "elements": template.elements,
+                    "styles": template.styles,
+                    "nutrition_config": template.nutrition_config,
+                    "display_preferences": template.display_preferences,
+                    "regulation": snapshot.get("regulation"),
+                }
+                product_data = {"name": label.product.name, "ingredients_text": "", "allergens_text": ""}
+                # Shares the render pool with interactive exports; waits instead of being shed
+                async with export_admission.slot(bounded=False):
+                    data = await export(template_data, product_data, snapshot)
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                # updated_at is passed through so caching an export doesn't look like an edit
+                rows.append({"id": label.id, column: await store.put(data), "updated_at": label.updated_at})
+            if rows:
+                await db.execute(update(Label), rows)
+                await db.commit()
+            exported += len(rows)
+            processed += len(batch)
+            await context.progress(processed)
+    return {"format": export_format, "exported": exported}
+
+
+@job_handler("seed")
+async def seed(context: JobContext, payload: dict) -> None:
+    """Run the reference data seeds"""
+    from app.db.seeds.run_seeds import run_all_seeds
+
+    await context.progress(0, 4, force=True)
+    await run_all_seeds(progress=context.progress)
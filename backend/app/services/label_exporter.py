@@ -7,10 +7,12 @@ import io
 from typing import Optional, Dict, Any
 from pathlib import Path
 
-# Placeholder imports - implement with actual libraries
-# from weasyprint import HTML
-# from html2image import Html2Image
-# import cairosvg
+# Rendering libraries (WeasyPrint, html2image, cairosvg, Pillow) are heavy to import.
+# Import them inside the export methods that need them, never at module level,
+# so API workers that never export don't pay for them at startup.
+# benchmarks/import_time.py fails if any of them is imported by app.main.
+
+from app.services.rounding import get_rounding_table
 
 
 class LabelExporter:
@@ -158,6 +160,15 @@ class LabelExporter:
         serving_size = nutrition.get("serving_size", 0)
         serving_unit = nutrition.get("serving_unit", "g")
         
+        # Round every declared amount in one pass with the label's regulation;
+        # snapshot values that are already declarations ("Less than 1g") are kept as-is
+        amounts = {key: value for key, value in nutrition.items() if not isinstance(value, str)}
+        rounded = get_rounding_table(template_data.get("regulation")).round_values(amounts)
+        declared = {
+            key: nutrition[key] if isinstance(nutrition.get(key), str) else value.text
+            for key, value in rounded.items()
+        }
+        
         html = f"""
         <div class="nutrition-title">{title}</div>
         <div class="serving-info">
@@ -165,7 +176,7 @@ class LabelExporter:
         </div>
         <div class="calories-row">
             <span class="calories-label">Calories</span>
-            <span class="calories-value">{int(nutrition.get('calories', 0))}</span>
+            <span class="calories-value">{declared['calories']}</span>
         </div>
         <div class="dv-header">% Daily Value*</div>
         """
@@ -185,7 +196,7 @@ class LabelExporter:
         ]
         
         for name, key, unit, dv_key, indent, bold in nutrients:
-            value = nutrition.get(key, 0)
+            value = declared[key]
             dv = nutrition.get(dv_key, 0) if dv_key else None
             
             indent_class = "indent" if indent else ""
@@ -195,7 +206,7 @@ class LabelExporter:
             
             html += f"""
             <div class="nutrient-row {indent_class} {bold_class}">
-                <span>{name} {value}{unit}</span>
+                <span>{name} {value}</span>
                 <span>{dv_str}</span>
             </div>
             """
@@ -210,11 +221,11 @@ class LabelExporter:
         ]
         
         for name, key, unit, dv_key in micros:
-            value = nutrition.get(key, 0)
+            value = declared[key]
             dv = nutrition.get(dv_key, 0)
             html += f"""
             <div class="nutrient-row">
-                <span>{name} {value}{unit}</span>
+                <span>{name} {value}</span>
                 <span>{int(dv)}%</span>
             </div>
             """
@@ -281,6 +292,7 @@ class LabelExporter:
         html = await self.render_html(template_data, product_data, nutrition)
         
         # TODO: Implement with html2image or playwright
+        # from html2image import Html2Image
         # hti = Html2Image()
         # hti.screenshot(html_str=html, save_as='label.png')
         
@@ -297,6 +309,7 @@ class LabelExporter:
         html = await self.render_html(template_data, product_data, nutrition)
         
         # TODO: Implement with WeasyPrint
+        # from weasyprint import HTML
         # return HTML(string=html).write_pdf()
         
         # Placeholder
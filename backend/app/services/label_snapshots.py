@@ -0,0 +1,100 @@
+"""
+Label Snapshot Service
+Captures the declared nutrition a label is printed with and keeps per-product
+content hashes current, so labels that no longer match their product or
+template are found by comparing hashes instead of recomputing nutrition
+"""
+
+import hashlib
+from typing import Dict, Iterable, Optional, Sequence, Set
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.models.template import Template
+from app.services.daily_values import NUTRIENT_KEYS
+from app.services.nutrition_calculator import NutritionCalculator
+from app.services.recipe_graph import RecipeEvaluator, RecipeNode, ancestor_ids
+from app.services.rounding import REGION_REGULATIONS, get_rounding_table
+
+
+def product_content_hash(evaluator: RecipeEvaluator, product: Product, node: Optional[RecipeNode]) -> str:
+    """
+    Hash of what a product's label shows: the recipe fingerprint (rows, quantities,
+    ingredient versions, sub-recipes, cooking) plus the serving size
+    """
+    recipe_key = evaluator.fingerprint(product.id) if node else "unevaluable"
+    return hashlib.sha256(
+        f"{recipe_key}|{product.serving_size}|{product.serving_unit}".encode()
+    ).hexdigest()
+
+
+def label_content_hash(product_hash: str, template: Template) -> str:
+    """Hash identifying a label's content: the product it was captured from and the template version"""
+    return hashlib.sha256(f"{product_hash}|{template.id}|{template.version}".encode()).hexdigest()
+
+
+def template_regulation(template: Template) -> str:
+    """Rounding regulation for a template (its label type's region; FDA without one)"""
+    region = template.label_type.region if template.label_type else None
+    return REGION_REGULATIONS.get(region or "", "fda")
+
+
+def capture_snapshot(evaluator: RecipeEvaluator, product: Product, node: RecipeNode, regulation: str) -> dict:
+    """
+    Per-serving declared values, rounded per the regulation. "Less than"
+    declarations are stored as their declared text.
+    """
+    per_serving = NutritionCalculator.scale_totals(node.totals, evaluator.serving_weight(product), node.weight)
+    rounding = get_rounding_table(regulation)
+    snapshot = {
+        "regulation": rounding.code,
+        "serving_size": float(product.serving_size),
+        "serving_unit": product.serving_unit,
+    }
+    for key, declared in zip(NUTRIENT_KEYS, rounding.round_vector(per_serving)):
+        snapshot[key] = float(declared.amount) if declared.amount is not None else declared.text
+    return snapshot
+
+
+async def write_content_hashes(
+    db: AsyncSession,
+    evaluator: RecipeEvaluator,
+    products: Sequence[Product],
+    nodes: Dict[UUID, RecipeNode],
+) -> int:
+    """Write the changed content hashes of evaluated products in the caller's transaction; returns how many changed"""
+    rows = []
+    for product in products:
+        content_hash = product_content_hash(evaluator, product, nodes.get(product.id))
+        if content_hash != product.content_hash:
+            # updated_at is passed through so a hash refresh doesn't look like a user edit
+            rows.append({"id": product.id, "content_hash": content_hash, "updated_at": product.updated_at})
+    if rows:
+        await db.execute(update(Product), rows)
+    return len(rows)
+
+
+async def invalidate_content_hashes(db: AsyncSession, product_ids: Iterable[UUID]) -> Set[UUID]:
+    """
+    Clear the content hashes of the products and every recipe using them, in the
+    caller's transaction; returns the affected ids.
+
+    Called when an edit changes what those products declare, so nutrition and
+    export ETags (which follow the hash) stop validating until the hashes are
+    recomputed.
+    """
+    affected = await ancestor_ids(db, product_ids)
+    if affected:
+        # updated_at is kept so clearing the hash doesn't look like a user edit
+        await db.execute(
+            update(Product)
+            .where(Product.id.in_(affected))
+            .values(content_hash=None, updated_at=Product.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+    return affected
+
+
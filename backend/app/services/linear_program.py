@@ -0,0 +1,129 @@
+"""
+Linear Program Solver
+Small dense two-phase simplex for in-process optimization problems
+(recipe quantities against nutrient targets); no external solver needed
+"""
+
+from typing import List, Sequence
+
+
+class LinearProgramError(ValueError):
+    """Raised when a linear program has no optimal solution"""
+
+
+class InfeasibleProgramError(LinearProgramError):
+    """Raised when no point satisfies all constraints"""
+
+
+class UnboundedProgramError(LinearProgramError):
+    """Raised when the objective can decrease without limit"""
+
+
+_EPS = 1e-9
+
+
+def _pivot(tableau: List[List[float]], objective: List[float], row: int, col: int) -> None:
+    pivot_row = tableau[row]
+    pivot = pivot_row[col]
+    tableau[row] = pivot_row = [value / pivot for value in pivot_row]
+
+    for other in (*tableau, objective):
+        if other is pivot_row:
+            continue
+        factor = other[col]
+        if abs(factor) > _EPS:
+            for j, value in enumerate(pivot_row):
+                other[j] -= factor * value
+
+
+def _run(tableau: List[List[float]], objective: List[float], basis: List[int], columns: int, max_iterations: int) -> None:
+    """Pivot until no reduced cost is negative; Bland's rule (lowest index) prevents cycling"""
+    for _ in range(max_iterations):
+        col = next((j for j in range(columns) if objective[j] < -_EPS), None)
+        if col is None:
+            return
+
+        row, best = None, None
+        for i, line in enumerate(tableau):
+            if line[col] > _EPS:
+                ratio = line[-1] / line[col]
+                if best is None or ratio < best - _EPS or (abs(ratio - best) <= _EPS and basis[i] < basis[row]):
+                    row, best = i, ratio
+        if row is None:
+            raise UnboundedProgramError("Objective is unbounded")
+
+        _pivot(tableau, objective, row, col)
+        basis[row] = col
+
+    raise LinearProgramError("Iteration limit reached")
+
+
+def solve_lp(
+    c: Sequence[float],
+    a_ub: Sequence[Sequence[float]] = (),
+    b_ub: Sequence[float] = (),
+    a_eq: Sequence[Sequence[float]] = (),
+    b_eq: Sequence[float] = (),
+    max_iterations: int = 10000,
+) -> List[float]:
+    """
+    Minimize c·x subject to a_ub·x <= b_ub, a_eq·x = b_eq and x >= 0.
+
+    Returns the optimal x. Raises InfeasibleProgramError or UnboundedProgramError.
+    Intended for problems with up to a few hundred variables.
+    """
+    n = len(c)
+    slacks = len(a_ub)
+    width = n + slacks
+
+    rows = []
+    for i, (coefficients, rhs) in enumerate(zip(a_ub, b_ub)):
+        row = [float(v) for v in coefficients] + [0.0] * slacks
+        row[n + i] = 1.0
+        rows.append((row, float(rhs)))
+    for coefficients, rhs in zip(a_eq, b_eq):
+        rows.append(([float(v) for v in coefficients] + [0.0] * slacks, float(rhs)))
+
+    # Phase 1: one artificial variable per row, minimize their sum
+    m = len(rows)
+    tableau = []
+    for i, (row, rhs) in enumerate(rows):
+        sign = -1.0 if rhs < 0 else 1.0
+        artificials = [0.0] * m
+        artificials[i] = 1.0
+        tableau.append([v * sign for v in row] + artificials + [rhs * sign])
+    basis = [width + i for i in range(m)]
+
+    objective = [0.0] * width + [1.0] * m + [0.0]
+    for line in tableau:
+        objective = [o - v for o, v in zip(objective, line)]
+
+    _run(tableau, objective, basis, width + m, max_iterations)
+    if -objective[-1] > 1e-7 * max(1.0, max((abs(rhs) for _, rhs in rows), default=1.0)):
+        raise InfeasibleProgramError("Constraints cannot all be satisfied")
+
+    # Drive remaining artificials out of the basis; rows where that is impossible are redundant
+    for i in reversed(range(m)):
+        if basis[i] < width:
+            continue
+        col = next((j for j in range(width) if abs(tableau[i][j]) > _EPS), None)
+        if col is None:
+            del tableau[i], basis[i]
+        else:
+            _pivot(tableau, objective, i, col)
+            basis[i] = col
+
+    # Phase 2: drop artificial columns and minimize the real objective
+    tableau = [line[:width] + line[-1:] for line in tableau]
+    objective = [float(v) for v in c] + [0.0] * slacks + [0.0]
+    for i, col in enumerate(basis):
+        factor = objective[col]
+        if factor:
+            objective = [o - factor * v for o, v in zip(objective, tableau[i])]
+
+    _run(tableau, objective, basis, width, max_iterations)
+
+    x = [0.0] * width
+    for i, col in enumerate(basis):
+        x[col] = tableau[i][-1]
+    return [max(v, 0.0) for v in x[:n]]
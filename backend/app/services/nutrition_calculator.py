@@ -4,50 +4,33 @@ Auto-calculates nutrition values from ingredients
 """
 
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
-from app.schemas import NutritionSummary
+from app.schemas import NutritionSummary, MultiRegimeNutrition, RegimePanel, RegimeBasisPanel
+from app.services.daily_values import (
+    DailyValueVector,
+    FDA_DAILY_VALUES as DAILY_VALUES,
+    FDA_VECTOR,
+    NUTRIENT_KEYS,
+)
+from app.services.rounding import RoundingTable, get_rounding_table
+from app.services.units import VOLUME, unit_dimension
 
 
-# FDA Daily Values (2020 update)
-# https://www.fda.gov/food/new-nutrition-facts-label/daily-value-new-nutrition-and-supplement-facts-labels
-DAILY_VALUES = {
-    "total_fat": Decimal("78"),        # g
-    "saturated_fat": Decimal("20"),    # g
-    "cholesterol": Decimal("300"),     # mg
-    "sodium": Decimal("2300"),         # mg
-    "total_carbs": Decimal("275"),     # g
-    "dietary_fiber": Decimal("28"),    # g
-    "added_sugars": Decimal("50"),     # g
-    "vitamin_d": Decimal("20"),        # mcg
-    "calcium": Decimal("1300"),        # mg
-    "iron": Decimal("18"),             # mg
-    "potassium": Decimal("4700"),      # mg
-    "vitamin_a": Decimal("900"),       # mcg RAE
-    "vitamin_c": Decimal("90"),        # mg
-    "vitamin_e": Decimal("15"),        # mg
-    "vitamin_k": Decimal("120"),       # mcg
-    "thiamin": Decimal("1.2"),         # mg
-    "riboflavin": Decimal("1.3"),      # mg
-    "niacin": Decimal("16"),           # mg NE
-    "vitamin_b6": Decimal("1.7"),      # mg
-    "folate": Decimal("400"),          # mcg DFE
-    "vitamin_b12": Decimal("2.4"),     # mcg
-    "biotin": Decimal("30"),           # mcg
-    "pantothenic_acid": Decimal("5"),  # mg
-    "phosphorus": Decimal("1250"),     # mg
-    "iodine": Decimal("150"),          # mcg
-    "magnesium": Decimal("420"),       # mg
-    "zinc": Decimal("11"),             # mg
-    "selenium": Decimal("55"),         # mcg
-    "copper": Decimal("0.9"),          # mg
-    "manganese": Decimal("2.3"),       # mg
-    "chromium": Decimal("35"),         # mcg
-    "molybdenum": Decimal("45"),       # mcg
-    "chloride": Decimal("2300"),       # mg
-    "choline": Decimal("550"),         # mg
-    "protein": Decimal("50"),          # g (not required on label but useful)
-}
+# Nutrients with a %DV column in NutritionSummary
+DV_NUTRIENTS = (
+    "total_fat",
+    "saturated_fat",
+    "cholesterol",
+    "sodium",
+    "total_carbs",
+    "dietary_fiber",
+    "added_sugars",
+    "vitamin_d",
+    "calcium",
+    "iron",
+    "potassium",
+)
 
 
 class NutritionCalculator:
@@ -56,49 +39,30 @@ class NutritionCalculator:
     """
     
     @staticmethod
-    def calculate_percent_dv(value: Decimal, nutrient: str) -> Decimal:
-        """Calculate % Daily Value for a nutrient"""
+    def calculate_percent_dv(
+        value: Decimal,
+        nutrient: str,
+        daily_values: Optional[DailyValueVector] = None,
+    ) -> Decimal:
+        """Calculate % Daily Value for a nutrient (FDA 2020 unless a DV vector is given)"""
+        if daily_values is not None:
+            return daily_values.percent_of(value, nutrient)
         if nutrient not in DAILY_VALUES or DAILY_VALUES[nutrient] == 0:
             return Decimal("0")
         return round((value / DAILY_VALUES[nutrient]) * 100, 0)
     
     @staticmethod
-    def calculate_from_ingredients(
-        ingredients: List[Dict[str, Any]],
-        serving_size: Decimal,
-        serving_unit: str,
-        total_recipe_weight: Decimal
-    ) -> NutritionSummary:
+    def calculate_totals(ingredients: List[Dict[str, Any]]) -> List[Decimal]:
         """
-        Calculate nutrition per serving from ingredient list
+        Sum nutrients over the whole recipe
         
         Args:
             ingredients: List of dicts with ingredient data and quantity
-            serving_size: Serving size value
-            serving_unit: Serving size unit
-            total_recipe_weight: Total weight of recipe in grams
         
         Returns:
-            NutritionSummary with calculated values
+            Recipe totals aligned with NUTRIENT_KEYS
         """
-        # Sum up all nutrients from ingredients
-        totals = {
-            "calories": Decimal("0"),
-            "total_fat": Decimal("0"),
-            "saturated_fat": Decimal("0"),
-            "trans_fat": Decimal("0"),
-            "cholesterol": Decimal("0"),
-            "sodium": Decimal("0"),
-            "total_carbs": Decimal("0"),
-            "dietary_fiber": Decimal("0"),
-            "total_sugars": Decimal("0"),
-            "added_sugars": Decimal("0"),
-            "protein": Decimal("0"),
-            "vitamin_d": Decimal("0"),
-            "calcium": Decimal("0"),
-            "iron": Decimal("0"),
-            "potassium": Decimal("0"),
-        }
+        totals = [Decimal("0")] * len(NUTRIENT_KEYS)
         
         for item in ingredients:
             ing = item.get("ingredient", {})
@@ -112,94 +76,137 @@ class NutritionCalculator:
                 multiplier = Decimal("0")
             
             # Add each nutrient
-            for nutrient in totals.keys():
-                value = Decimal(str(ing.get(nutrient, 0)))
-                totals[nutrient] += value * multiplier
+            totals = [
+                total + Decimal(str(ing.get(nutrient, 0))) * multiplier
+                for total, nutrient in zip(totals, NUTRIENT_KEYS)
+            ]
         
-        # Calculate per serving
+        return totals
+    
+    @staticmethod
+    def scale_totals(totals: List[Decimal], amount: Decimal, total_recipe_weight: Decimal) -> List[Decimal]:
+        """Scale recipe totals to `amount` of product (2 decimal places)"""
         if total_recipe_weight > 0:
-            serving_multiplier = serving_size / total_recipe_weight
+            multiplier = amount / total_recipe_weight
         else:
-            serving_multiplier = Decimal("1")
+            multiplier = Decimal("1")
+        return [round(v * multiplier, 2) for v in totals]
+    
+    @staticmethod
+    def calculate_from_ingredients(
+        ingredients: List[Dict[str, Any]],
+        serving_size: Decimal,
+        serving_unit: str,
+        total_recipe_weight: Decimal,
+        daily_values: Optional[DailyValueVector] = None,
+        serving_weight: Optional[Decimal] = None,
+        totals: Optional[Sequence[Decimal]] = None,
+    ) -> NutritionSummary:
+        """
+        Calculate nutrition per serving from ingredient list
         
-        per_serving = {k: round(v * serving_multiplier, 2) for k, v in totals.items()}
+        Args:
+            ingredients: List of dicts with ingredient data and quantity
+            serving_size: Serving size value
+            serving_unit: Serving size unit
+            total_recipe_weight: Total weight of recipe in grams
+            daily_values: Compiled DV vector (defaults to FDA 2020)
+            serving_weight: Serving size in the recipe's unit, if serving_unit differs
+            totals: Precomputed recipe totals (e.g. from the recipe graph) instead of summing ingredients
         
-        # Calculate % Daily Values
+        Returns:
+            NutritionSummary with calculated values
+        """
+        totals = NutritionCalculator.calculate_totals(ingredients) if totals is None else list(totals)
+        per_serving = NutritionCalculator.scale_totals(totals, serving_weight or serving_size, total_recipe_weight)
+        
+        # Calculate % Daily Values in one pass over the DV vector
+        percent_dv = (daily_values or FDA_VECTOR).percent(per_serving)
+        
+        values = dict(zip(NUTRIENT_KEYS, per_serving))
+        dv_values = dict(zip(NUTRIENT_KEYS, percent_dv))
         return NutritionSummary(
             serving_size=serving_size,
             serving_unit=serving_unit,
-            calories=per_serving["calories"],
-            total_fat=per_serving["total_fat"],
-            saturated_fat=per_serving["saturated_fat"],
-            trans_fat=per_serving["trans_fat"],
-            cholesterol=per_serving["cholesterol"],
-            sodium=per_serving["sodium"],
-            total_carbs=per_serving["total_carbs"],
-            dietary_fiber=per_serving["dietary_fiber"],
-            total_sugars=per_serving["total_sugars"],
-            added_sugars=per_serving["added_sugars"],
-            protein=per_serving["protein"],
-            vitamin_d=per_serving["vitamin_d"],
-            calcium=per_serving["calcium"],
-            iron=per_serving["iron"],
-            potassium=per_serving["potassium"],
-            total_fat_dv=NutritionCalculator.calculate_percent_dv(per_serving["total_fat"], "total_fat"),
-            saturated_fat_dv=NutritionCalculator.calculate_percent_dv(per_serving["saturated_fat"], "saturated_fat"),
-            cholesterol_dv=NutritionCalculator.calculate_percent_dv(per_serving["cholesterol"], "cholesterol"),
-            sodium_dv=NutritionCalculator.calculate_percent_dv(per_serving["sodium"], "sodium"),
-            total_carbs_dv=NutritionCalculator.calculate_percent_dv(per_serving["total_carbs"], "total_carbs"),
-            dietary_fiber_dv=NutritionCalculator.calculate_percent_dv(per_serving["dietary_fiber"], "dietary_fiber"),
-            added_sugars_dv=NutritionCalculator.calculate_percent_dv(per_serving["added_sugars"], "added_sugars"),
-            vitamin_d_dv=NutritionCalculator.calculate_percent_dv(per_serving["vitamin_d"], "vitamin_d"),
-            calcium_dv=NutritionCalculator.calculate_percent_dv(per_serving["calcium"], "calcium"),
-            iron_dv=NutritionCalculator.calculate_percent_dv(per_serving["iron"], "iron"),
-            potassium_dv=NutritionCalculator.calculate_percent_dv(per_serving["potassium"], "potassium"),
+            **values,
+            **{f"{nutrient}_dv": dv_values[nutrient] for nutrient in DV_NUTRIENTS},
         )
     
     @staticmethod
-    def round_nutrient(value: Decimal, nutrient: str) -> str:
-        """
-        Round nutrient values according to FDA rounding rules
-        https://www.fda.gov/files/food/published/Food-Labeling-Guide-%28PDF%29.pdf
+    def calculate_panels(
+        ingredients: List[Dict[str, Any]],
+        serving_size: Decimal,
+        serving_unit: str,
+        total_recipe_weight: Decimal,
+        regimes: Sequence[Tuple[RoundingTable, DailyValueVector]],
+        servings_per_container: Optional[Decimal] = None,
+        serving_weight: Optional[Decimal] = None,
+        totals: Optional[Sequence[Decimal]] = None,
+    ) -> MultiRegimeNutrition:
         """
-        v = float(value)
+        Calculate panels for several regulations from one set of recipe totals
         
-        # Calories
-        if nutrient == "calories":
-            if v < 5:
-                return "0"
-            elif v <= 50:
-                return str(round(v / 5) * 5)  # Nearest 5
-            else:
-                return str(round(v / 10) * 10)  # Nearest 10
+        Ingredients are summed once; each basis (per serving, per 100 g/ml,
+        per container) is a scaling of those totals, and each regulation only
+        adds a %DV divide and a rounding pass over the basis vectors.
         
-        # Fat, Carbs, Protein, Fiber
-        if nutrient in ["total_fat", "saturated_fat", "trans_fat", "total_carbs", 
-                        "dietary_fiber", "total_sugars", "added_sugars", "protein"]:
-            if v < 0.5:
-                return "0"
-            elif v < 5:
-                return f"{round(v * 2) / 2}g"  # Nearest 0.5
-            else:
-                return f"{round(v)}g"  # Nearest 1
+        Args:
+            ingredients: List of dicts with ingredient data and quantity
+            serving_size: Serving size value
+            serving_unit: Serving size unit
+            total_recipe_weight: Total weight of recipe in grams (or ml)
+            regimes: (rounding table, DV vector) per regulation
+            servings_per_container: Adds a per-container basis when set
+            serving_weight: Serving size in the recipe's unit, if serving_unit differs
+            totals: Precomputed recipe totals (e.g. from the recipe graph) instead of summing ingredients
         
-        # Cholesterol (mg)
-        if nutrient == "cholesterol":
-            if v < 2:
-                return "0mg"
-            elif v <= 5:
-                return "Less than 5mg"
-            else:
-                return f"{round(v / 5) * 5}mg"  # Nearest 5
+        Returns:
+            MultiRegimeNutrition with amounts per basis and one panel per regulation
+        """
+        totals = NutritionCalculator.calculate_totals(ingredients) if totals is None else list(totals)
+        serving_weight = serving_weight or serving_size
         
-        # Sodium (mg)
-        if nutrient == "sodium":
-            if v < 5:
-                return "0mg"
-            elif v <= 140:
-                return f"{round(v / 5) * 5}mg"  # Nearest 5
-            else:
-                return f"{round(v / 10) * 10}mg"  # Nearest 10
+        per_100_basis = "per_100ml" if unit_dimension(serving_unit) == VOLUME else "per_100g"
+        bases = {
+            "per_serving": NutritionCalculator.scale_totals(totals, serving_weight, total_recipe_weight),
+            per_100_basis: NutritionCalculator.scale_totals(totals, Decimal("100"), total_recipe_weight),
+        }
+        if servings_per_container:
+            bases["per_container"] = NutritionCalculator.scale_totals(
+                totals, serving_weight * servings_per_container, total_recipe_weight
+            )
+        
+        panels = []
+        for rounding, daily_values in regimes:
+            panel_bases = {}
+            for basis, amounts in bases.items():
+                percent_dv = daily_values.percent(amounts)
+                rounded = rounding.round_vector(amounts)
+                panel_bases[basis] = RegimeBasisPanel(
+                    percent_dv={
+                        key: dv for key, dv, value in zip(NUTRIENT_KEYS, percent_dv, daily_values.values)
+                        if value is not None
+                    },
+                    declared={key: r.text for key, r in zip(NUTRIENT_KEYS, rounded)},
+                )
+            panels.append(RegimePanel(
+                regulation=rounding.code,
+                daily_values_source=daily_values.source,
+                bases=panel_bases,
+            ))
         
-        # Default: 2 decimal places
-        return f"{round(v, 2)}"
+        return MultiRegimeNutrition(
+            serving_size=serving_size,
+            serving_unit=serving_unit,
+            servings_per_container=servings_per_container,
+            amounts={basis: dict(zip(NUTRIENT_KEYS, amounts)) for basis, amounts in bases.items()},
+            panels=panels,
+        )
+    
+    @staticmethod
+    def round_nutrient(value: Decimal, nutrient: str, regulation: str = "fda") -> str:
+        """
+        Round a nutrient value for declaration according to a regulation's rounding table
+        https://www.fda.gov/files/food/published/Food-Labeling-Guide-%28PDF%29.pdf
+        """
+        return get_rounding_table(regulation).round(value, nutrient).text
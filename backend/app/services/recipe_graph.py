@@ -0,0 +1,373 @@
+"""
+Recipe Graph Service
+Evaluates product nutrition over the sub-recipe DAG (products used as
+ingredients of other products) with cycle detection and memoization
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.ingredient import Ingredient
+from app.core.database import AsyncSessionLocal
+from app.models.product import Product, ProductIngredient
+from app.services.daily_values import NUTRIENT_KEYS
+from app.services.nutrition_calculator import NutritionCalculator
+from app.services.retention import RetentionVector, apply_retention, retention_registry
+from app.services.units import VOLUME, UnitConversionError, conversion_factor, unit_dimension
+
+
+class RecipeError(ValueError):
+    """Raised when a recipe cannot be evaluated"""
+
+
+class RecipeCycleError(RecipeError):
+    """Raised when sub-recipes reference each other in a loop"""
+
+
+@dataclass(frozen=True)
+class RecipeNode:
+    """Whole-recipe nutrient totals (aligned with NUTRIENT_KEYS) and yield in `base_unit`"""
+    totals: Tuple[Decimal, ...]
+    weight: Decimal
+    base_unit: str
+
+
+@dataclass(frozen=True)
+class RecipeTerm:
+    """One recipe row per unit of its quantity: nutrients (aligned with NUTRIENT_KEYS) and weight in the recipe's base unit"""
+    row: ProductIngredient
+    nutrients: Tuple[Decimal, ...]
+    weight: Decimal
+
+
+# Evaluated nodes keyed by content fingerprint. A fingerprint covers the node's
+# rows, its ingredients' updated_at and its sub-recipes' fingerprints, so any change
+# below a node yields a new key and stale entries simply age out.
+_NODE_CACHE: "OrderedDict[str, RecipeNode]" = OrderedDict()
+_NODE_CACHE_SIZE = 4096
+
+
+def base_unit_for(serving_unit: str) -> str:
+    """Recipes served by volume are totalled in ml, everything else in g"""
+    return "ml" if unit_dimension(serving_unit) == VOLUME else "g"
+
+
+def ingredient_input(ingredient: Ingredient, quantity: Decimal) -> dict:
+    """Calculator input for `quantity` (in the ingredient's per_unit) of an ingredient"""
+    return {
+        "ingredient": {
+            "calories": float(ingredient.calories),
+            "total_fat": float(ingredient.total_fat),
+            "saturated_fat": float(ingredient.saturated_fat),
+            "trans_fat": float(ingredient.trans_fat),
+            "cholesterol": float(ingredient.cholesterol),
+            "sodium": float(ingredient.sodium),
+            "total_carbs": float(ingredient.total_carbs),
+            "dietary_fiber": float(ingredient.dietary_fiber),
+            "total_sugars": float(ingredient.total_sugars),
+            "added_sugars": float(ingredient.added_sugars),
+            "protein": float(ingredient.protein),
+            "vitamin_d": float(ingredient.vitamin_d),
+            "calcium": float(ingredient.calcium),
+            "iron": float(ingredient.iron),
+            "potassium": float(ingredient.potassium),
+            "per_amount": float(ingredient.per_amount),
+        },
+        "quantity": quantity,
+    }
+
+
+async def descendant_ids(db: AsyncSession, roots: Iterable[UUID]) -> Set[UUID]:
+    """All products reachable from `roots` through sub-recipe rows (roots included), one query per level"""
+    seen: Set[UUID] = set(roots)
+    frontier = set(seen)
+    while frontier:
+        result = await db.execute(
+            select(ProductIngredient.sub_product_id).where(
+                ProductIngredient.product_id.in_(frontier),
+                ProductIngredient.sub_product_id.isnot(None),
+            )
+        )
+        frontier = set(result.scalars().all()) - seen
+        seen |= frontier
+    return seen
+
+
+async def ancestor_ids(db: AsyncSession, roots: Iterable[UUID]) -> Set[UUID]:
+    """All products that use `roots` directly or through nested sub-recipes (roots included)"""
+    seen: Set[UUID] = set(roots)
+    frontier = set(seen)
+    while frontier:
+        result = await db.execute(
+            select(ProductIngredient.product_id).where(ProductIngredient.sub_product_id.in_(frontier))
+        )
+        frontier = set(result.scalars().all()) - seen
+        seen |= frontier
+    return seen
+
+
+class RecipeEvaluator:
+    """
+    Evaluates products within one request.
+
+    The graph below a product is loaded level by level (one product query per
+    nesting level plus one ingredient query), each node is evaluated once per
+    request, and evaluated nodes are shared across requests by fingerprint.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._products: Dict[UUID, Product] = {}
+        self._ingredients: Dict[UUID, Ingredient] = {}
+        self._retention: Dict[UUID, RetentionVector] = {}
+        self._memo: Dict[UUID, Tuple[str, RecipeNode]] = {}
+
+    async def _load(self, roots: List[Product]) -> None:
+        """Load every not-yet-loaded product and ingredient below `roots`"""
+        new_products = [p for p in roots if p.id not in self._products]
+        self._products.update({p.id: p for p in new_products})
+
+        while True:
+            frontier = {
+                pi.sub_product_id
+                for product in new_products
+                for pi in product.ingredients
+                if pi.sub_product_id and pi.sub_product_id not in self._products
+            }
+            missing_ingredients = {
+                pi.ingredient_id
+                for product in new_products
+                for pi in product.ingredients
+                if pi.ingredient_id and pi.ingredient_id not in self._ingredients
+            }
+            if missing_ingredients:
+                result = await self.db.execute(
+                    select(Ingredient).where(Ingredient.id.in_(missing_ingredients))
+                )
+                self._ingredients.update({i.id: i for i in result.scalars().all()})
+            if not frontier:
+                break
+
+            result = await self.db.execute(
+                select(Product)
+                .where(Product.id.in_(frontier))
+                .options(selectinload(Product.ingredients))
+            )
+            new_products = list(result.scalars().all())
+            self._products.update({p.id: p for p in new_products})
+
+        table_ids = {p.retention_table_id for p in self._products.values() if p.retention_table_id}
+        if table_ids - self._retention.keys():
+            self._retention = await retention_registry.vectors(self.db, table_ids)
+
+    async def evaluate(self, product: Product) -> RecipeNode:
+        """Whole-recipe totals for a product (its ingredients must be loaded)"""
+        await self._load([product])
+        return self._evaluate(product.id, set())[1]
+
+    async def evaluate_many(self, products: List[Product], strict: bool = True) -> Dict[UUID, RecipeNode]:
+        """
+        Evaluate several products, sharing loads and sub-recipe results between them.
+
+        With `strict=False`, products that cannot be evaluated are left out
+        instead of raising.
+        """
+        await self._load(products)
+        nodes = {}
+        for product in products:
+            try:
+                nodes[product.id] = self._evaluate(product.id, set())[1]
+            except RecipeError:
+                if strict:
+                    raise
+        return nodes
+
+    async def _load_sources(self, rows: Sequence[ProductIngredient]) -> None:
+        """Load ingredients and sub-recipes referenced by rows that are not part of a loaded graph"""
+        ingredient_ids = {pi.ingredient_id for pi in rows if pi.ingredient_id} - self._ingredients.keys()
+        if ingredient_ids:
+            result = await self.db.execute(select(Ingredient).where(Ingredient.id.in_(ingredient_ids)))
+            self._ingredients.update({i.id: i for i in result.scalars().all()})
+
+        product_ids = {pi.sub_product_id for pi in rows if pi.sub_product_id} - self._products.keys()
+        if product_ids:
+            result = await self.db.execute(
+                select(Product)
+                .where(Product.id.in_(product_ids))
+                .options(selectinload(Product.ingredients))
+            )
+            await self._load(list(result.scalars().all()))
+
+    async def linear_terms(
+        self,
+        product: Product,
+        rows: Optional[Sequence[ProductIngredient]] = None,
+    ) -> List[RecipeTerm]:
+        """
+        Per-unit coefficients of recipe rows within a product, before cooking.
+
+        Recipe totals are linear in the row quantities: totals = sum(q * nutrients)
+        and raw weight = sum(q * weight), which is what the recipe optimizer and
+        what-if variants work on. `rows` defaults to the product's own rows and
+        may include unsaved ones (e.g. substitutes); rows whose ingredient does
+        not exist are skipped.
+        """
+        await self._load([product])
+        rows = product.ingredients if rows is None else rows
+        await self._load_sources(rows)
+
+        base_unit = base_unit_for(product.serving_unit)
+        terms = []
+        for pi in rows:
+            row = self._resolve_row(product, pi, base_unit, {product.id})
+            if row is None:
+                continue
+            _, ingredient, to_basis, to_base_unit = row
+            nutrients = NutritionCalculator.calculate_totals([{"ingredient": ingredient, "quantity": to_basis}])
+            terms.append(RecipeTerm(row=pi, nutrients=tuple(nutrients), weight=to_base_unit))
+        return terms
+
+    def fingerprint(self, product_id: UUID) -> str:
+        """Content fingerprint of an evaluated product (changes whenever anything below it does)"""
+        return self._memo[product_id][0]
+
+    def retention_for(self, product: Product) -> Optional[RetentionVector]:
+        """Compiled retention vector of a loaded product, if it has a retention table"""
+        return self._retention.get(product.retention_table_id) if product.retention_table_id else None
+
+    def serving_weight(self, product: Product) -> Decimal:
+        """Serving size expressed in the recipe's base unit"""
+        serving_size = Decimal(str(product.serving_size))
+        # Count-style serving units (slice, piece) are taken to be in the recipe's unit
+        if unit_dimension(product.serving_unit) is not None:
+            serving_size *= conversion_factor(product.serving_unit, base_unit_for(product.serving_unit))
+        return serving_size
+
+    def _resolve_row(self, product: Product, pi: ProductIngredient, base_unit: str, path: Set[UUID]):
+        """
+        Per-unit view of a recipe row: (fingerprint part, calculator ingredient,
+        basis quantity per unit of pi.unit, base-unit weight per unit of pi.unit).
+        None when the ingredient no longer exists.
+        """
+        try:
+            if pi.sub_product_id:
+                child_key, child = self._evaluate(pi.sub_product_id, path)
+                ingredient = {**dict(zip(NUTRIENT_KEYS, child.totals)), "per_amount": child.weight}
+                return (
+                    ("p", child_key),
+                    ingredient,
+                    conversion_factor(pi.unit, child.base_unit),
+                    conversion_factor(pi.unit, base_unit),
+                )
+
+            ingredient = self._ingredients.get(pi.ingredient_id)
+            if ingredient is None:
+                return None
+            density = ingredient.density
+            return (
+                ("i", ingredient.id, ingredient.updated_at),
+                ingredient_input(ingredient, Decimal("1"))["ingredient"],
+                conversion_factor(pi.unit, ingredient.per_unit or "g", density),
+                conversion_factor(pi.unit, base_unit, density),
+            )
+        except UnitConversionError as e:
+            name = self._products[pi.sub_product_id].name if pi.sub_product_id else ingredient.name
+            raise RecipeError(f"'{product.name}' -> '{name}': {e}") from None
+
+    def _evaluate(self, product_id: UUID, path: Set[UUID]) -> Tuple[str, RecipeNode]:
+        if product_id in self._memo:
+            return self._memo[product_id]
+        if product_id in path:
+            raise RecipeCycleError("Sub-recipes form a cycle")
+
+        product = self._products.get(product_id)
+        if product is None:
+            raise RecipeError(f"Sub-recipe {product_id} not found")
+
+        path.add(product_id)
+        base_unit = base_unit_for(product.serving_unit)
+        parts: List[tuple] = [base_unit]
+        inputs = []
+        weight = Decimal("0")
+
+        for pi in product.ingredients:
+            row = self._resolve_row(product, pi, base_unit, path)
+            if row is None:
+                continue
+            part, ingredient, to_basis, to_base_unit = row
+            parts.append((*part, pi.quantity, pi.unit))
+            inputs.append({"ingredient": ingredient, "quantity": pi.quantity * to_basis})
+            weight += pi.quantity * to_base_unit
+
+        path.discard(product_id)
+
+        # Cooking: moisture loss scales the yield, retention scales each nutrient
+        yield_factor = product.yield_factor
+        retention = self.retention_for(product)
+        parts.append(("cook", yield_factor, retention))
+
+        key = hashlib.sha256(repr(parts).encode()).hexdigest()
+        node = _NODE_CACHE.get(key)
+        if node is None:
+            totals = NutritionCalculator.calculate_totals(inputs)
+            node = RecipeNode(
+                totals=apply_retention(totals, retention) if retention else tuple(totals),
+                weight=weight * yield_factor if yield_factor else weight,
+                base_unit=base_unit,
+            )
+            _NODE_CACHE[key] = node
+            while len(_NODE_CACHE) > _NODE_CACHE_SIZE:
+                _NODE_CACHE.popitem(last=False)
+        else:
+            _NODE_CACHE.move_to_end(key)
+
+        self._memo[product_id] = (key, node)
+        return key, node
+
+
+async def recompute_products(db: AsyncSession, product_ids: Iterable[UUID], batch_size: int = 200) -> int:
+    """
+    Re-evaluate products in batches and store each recipe's cooked yield in total_weight.
+
+    Each batch is one product query plus one evaluate_many pass (sub-recipes
+    shared across the whole run) and one executemany UPDATE. Also warms the
+    node cache for the next nutrition request. Returns the number of products updated.
+    """
+    ids = sorted(set(product_ids), key=str)
+    evaluator = RecipeEvaluator(db)
+    updated = 0
+
+    for start in range(0, len(ids), batch_size):
+        result = await db.execute(
+            select(Product)
+            .where(Product.id.in_(ids[start:start + batch_size]))
+            .options(selectinload(Product.ingredients))
+        )
+        nodes = await evaluator.evaluate_many(list(result.scalars().all()), strict=False)
+        if nodes:
+            await db.execute(
+                update(Product),
+                [{"id": product_id, "total_weight": node.weight} for product_id, node in nodes.items()],
+            )
+            updated += len(nodes)
+        await db.commit()
+
+    return updated
+
+
+async def recompute_for_retention_table(retention_table_id: UUID) -> int:
+    """Recompute every product cooked with a retention table, and every recipe that uses one of them"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Product.id).where(Product.retention_table_id == retention_table_id)
+        )
+        affected = await ancestor_ids(db, result.scalars().all())
+        return await recompute_products(db, affected)
@@ -0,0 +1,183 @@
+"""
+Recipe Optimizer Service
+Solves for recipe quantities that meet per-serving nutrient targets within
+user bounds as a single linear program over the recipe's nutrient matrix
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.daily_values import NUTRIENT_INDEX
+from app.services.linear_program import (
+    InfeasibleProgramError,
+    LinearProgramError,
+    solve_lp,
+)
+from app.services.recipe_graph import RecipeTerm
+from app.services.retention import RetentionVector, apply_retention
+
+
+class RecipeOptimizationError(ValueError):
+    """Raised when no quantities satisfy the targets"""
+
+
+# (nutrient, min, max) per serving
+Target = Tuple[str, Optional[Decimal], Optional[Decimal]]
+# row index -> (min, max) in the row's unit; max None means unbounded
+Bounds = Dict[int, Tuple[Decimal, Optional[Decimal]]]
+
+_QUANTUM = Decimal("0.01")  # ProductIngredient.quantity precision
+_MIN_BATCH = 1.0  # g or ml; keeps the per-serving ratio defined
+
+
+def recipe_totals(
+    terms: Sequence[RecipeTerm],
+    quantities: Sequence[Decimal],
+    yield_factor: Optional[Decimal] = None,
+    retention: Optional[RetentionVector] = None,
+) -> Tuple[Tuple[Decimal, ...], Decimal]:
+    """Cooked recipe totals and weight for the given row quantities"""
+    totals = [Decimal("0")] * len(NUTRIENT_INDEX)
+    weight = Decimal("0")
+    for term, quantity in zip(terms, quantities):
+        totals = [total + n * quantity for total, n in zip(totals, term.nutrients)]
+        weight += term.weight * quantity
+    return (
+        apply_retention(totals, retention) if retention else tuple(totals),
+        weight * yield_factor if yield_factor else weight,
+    )
+
+
+def optimize_quantities(
+    terms: Sequence[RecipeTerm],
+    targets: Sequence[Target],
+    bounds: Bounds,
+    serving_weight: Decimal,
+    yield_factor: Optional[Decimal] = None,
+    retention: Optional[RetentionVector] = None,
+    keep_total_weight: bool = False,
+) -> List[Decimal]:
+    """
+    Quantities for each term that meet every target and stay as close as
+    possible (by weight) to the current recipe.
+
+    Per-serving amounts are ratios (serving * nutrient total / batch weight), but
+    "amount <= T" rearranges to retention * N - (T * yield / serving) * W <= 0,
+    which is linear in the quantities, so the whole problem is one LP. Rows
+    in `bounds` are variables (shifted to start at their minimum); the others
+    are held at their current quantity. The objective sums weight-scaled
+    deviation variables d >= |q - q0|.
+    """
+    for nutrient, _, _ in targets:
+        if nutrient not in NUTRIENT_INDEX:
+            raise RecipeOptimizationError(f"Unknown nutrient '{nutrient}'")
+
+    y = float(yield_factor or 1)
+    s = float(serving_weight)
+    r = [float(f) for f in retention] if retention else [1.0] * len(NUTRIENT_INDEX)
+
+    free = sorted(bounds)
+    n = len(free)
+    current = [float(term.row.quantity) for term in terms]
+    lower = {j: float(bounds[j][0]) for j in free}
+    fixed = [j for j in range(len(terms)) if j not in bounds]
+    weights = {j: float(term.weight) for j, term in enumerate(terms)}
+
+    def solve(margin: float) -> List[float]:
+        """
+        Solve with every inequality tightened by what rounding each free row by up
+        to `margin` could move it, so the rounded quantities still satisfy it
+        """
+        # Variables: x_0..x_{n-1} (q - min for free rows), then d_0..d_{n-1}
+        a_ub: List[List[float]] = []
+        b_ub: List[float] = []
+
+        def add(coefficients: Dict[int, float], limit: float, sense: int) -> None:
+            """sum(coef * q) <= limit (sense 1) or >= limit (sense -1), with q rewritten in x"""
+            row = [0.0] * (2 * n)
+            rhs = limit
+            for k, j in enumerate(free):
+                row[k] = sense * coefficients[j]
+                rhs -= coefficients[j] * lower[j]
+            for j in fixed:
+                rhs -= coefficients[j] * current[j]
+            a_ub.append(row)
+            b_ub.append(sense * rhs - margin * sum(abs(coefficients[j]) for j in free))
+
+        for nutrient, minimum, maximum in targets:
+            index = NUTRIENT_INDEX[nutrient]
+            for limit, sense in ((maximum, 1), (minimum, -1)):
+                if limit is None:
+                    continue
+                c = float(limit) * y / s
+                add({
+                    j: r[index] * float(term.nutrients[index]) - c * weights[j]
+                    for j, term in enumerate(terms)
+                }, 0.0, sense)
+
+        for k, j in enumerate(free):
+            upper = bounds[j][1]
+            if upper is not None:
+                row = [0.0] * (2 * n)
+                row[k] = 1.0
+                a_ub.append(row)
+                b_ub.append(float(upper) - lower[j])
+            # d >= q - q0 and d >= q0 - q
+            for sign in (1.0, -1.0):
+                row = [0.0] * (2 * n)
+                row[k] = sign
+                row[n + k] = -1.0
+                a_ub.append(row)
+                b_ub.append(sign * (current[j] - lower[j]))
+
+        a_eq: List[List[float]] = []
+        b_eq: List[float] = []
+        if keep_total_weight:
+            total = sum(weights[j] * current[j] for j in range(len(terms)))
+            row = [weights[j] for j in free] + [0.0] * n
+            a_eq.append(row)
+            b_eq.append(total - sum(weights[j] * lower[j] for j in free) - sum(weights[j] * current[j] for j in fixed))
+        else:
+            add(weights, _MIN_BATCH, -1)
+
+        objective = [0.0] * n + [weights[j] for j in free]
+        return solve_lp(objective, a_ub, b_ub, a_eq, b_eq)
+
+    try:
+        try:
+            x = solve(float(_QUANTUM) / 2)
+        except InfeasibleProgramError:
+            # Too tight to absorb rounding everywhere; the rounded optimum may still pass the check below
+            x = solve(0.0)
+    except InfeasibleProgramError:
+        raise RecipeOptimizationError(
+            "No quantities within the given bounds meet all targets"
+        ) from None
+    except LinearProgramError as e:
+        raise RecipeOptimizationError(str(e)) from None
+
+    quantities = [term.row.quantity for term in terms]
+    for k, j in enumerate(free):
+        quantities[j] = Decimal(repr(x[k] + lower[j])).quantize(_QUANTUM)
+    _check_targets(terms, quantities, targets, serving_weight, yield_factor, retention)
+    return quantities
+
+
+def _check_targets(
+    terms: Sequence[RecipeTerm],
+    quantities: Sequence[Decimal],
+    targets: Sequence[Target],
+    serving_weight: Decimal,
+    yield_factor: Optional[Decimal],
+    retention: Optional[RetentionVector],
+) -> None:
+    """Raise unless the (rounded) quantities meet every target exactly"""
+    totals, weight = recipe_totals(terms, quantities, yield_factor, retention)
+    if weight <= 0:
+        raise RecipeOptimizationError("No quantities within the given bounds meet all targets")
+    for nutrient, minimum, maximum in targets:
+        amount = totals[NUTRIENT_INDEX[nutrient]] * serving_weight / weight
+        if (maximum is not None and amount > maximum) or (minimum is not None and amount < minimum):
+            raise RecipeOptimizationError(
+                f"No quantities at {_QUANTUM} precision within the given bounds meet the {nutrient} target"
+            )
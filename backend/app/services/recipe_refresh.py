@@ -0,0 +1,62 @@
+"""
+Recipe Refresh Service
+Brings the state derived from a recipe's evaluation (content hashes and
+materialized claims) up to date after an edit: each batch of products is loaded
+and evaluated once and both writers are fed from the same nodes
+"""
+
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal
+from app.models.product import Product
+from app.services.claims import write_claims
+from app.services.label_snapshots import write_content_hashes
+from app.services.recipe_graph import RecipeEvaluator, ancestor_ids
+
+
+async def refresh_recipes(
+    db: AsyncSession,
+    product_ids: Iterable[UUID],
+    batch_size: int = 500,
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> Tuple[int, int]:
+    """
+    Refresh content hashes and claims of the given products (callers include the
+    ancestors); returns (hashes changed, claims rewritten).
+
+    `progress(done, total)` is awaited after each batch (products done so far).
+    """
+    ids = sorted(set(product_ids), key=str)
+    evaluator = RecipeEvaluator(db)
+    hashes_changed = claims_rewritten = 0
+    for start in range(0, len(ids), batch_size):
+        result = await db.execute(
+            select(Product)
+            .where(Product.id.in_(ids[start:start + batch_size]))
+            .options(selectinload(Product.ingredients))
+        )
+        products = list(result.scalars().all())
+        nodes = await evaluator.evaluate_many(products, strict=False)
+
+        hashes = await write_content_hashes(db, evaluator, products, nodes)
+        claims = await write_claims(db, evaluator, products, nodes)
+        if hashes or claims:
+            await db.commit()
+            hashes_changed += hashes
+            claims_rewritten += claims
+        if progress is not None:
+            await progress(min(start + batch_size, len(ids)), len(ids))
+
+    return hashes_changed, claims_rewritten
+
+
+async def refresh_after_edit(product_ids: Iterable[UUID]) -> None:
+    """Background refresh after recipe edits: the products plus every recipe using them"""
+    async with AsyncSessionLocal() as db:
+        await refresh_recipes(db, await ancestor_ids(db, product_ids))
+
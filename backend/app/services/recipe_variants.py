@@ -0,0 +1,123 @@
+"""
+Recipe Variant Service
+Evaluates what-if variants of a recipe (quantity changes, substitutions,
+additions, removals) against one shared coefficient matrix without touching
+the stored recipe rows
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.models.product import Product, ProductIngredient
+from app.schemas import VariantChange
+from app.services.recipe_graph import RecipeEvaluator, RecipeTerm
+from app.services.recipe_optimizer import recipe_totals
+
+
+class VariantError(ValueError):
+    """Raised when a variant change cannot be applied to the recipe"""
+
+
+# (ingredient_id, sub_product_id, unit) - one matrix column per distinct source and unit
+Column = Tuple[Optional[UUID], Optional[UUID], str]
+# Per variant: one (column, quantity) slot per recipe row
+Slots = List[Tuple[Column, Decimal]]
+
+
+def _column(row) -> Column:
+    return (row.ingredient_id, row.sub_product_id, row.unit)
+
+
+def apply_changes(base: Slots, changes: Sequence[VariantChange]) -> Slots:
+    """Apply a variant's changes, in order, to a copy of the base slots"""
+    slots = list(base)
+    for change in changes:
+        target = (change.ingredient_id, change.sub_product_id)
+        matched = [i for i, ((ing, sub, _), _) in enumerate(slots) if (ing, sub) == target]
+
+        if not matched:
+            if change.remove:
+                continue
+            if change.quantity is None or not change.unit:
+                raise VariantError(
+                    f"{change.ingredient_id or change.sub_product_id} is not in the recipe; "
+                    "give quantity and unit to add it"
+                )
+            slots.append(((*target, change.unit), change.quantity))
+            continue
+
+        for i in matched:
+            (ing, sub, unit), quantity = slots[i]
+            if change.remove:
+                slots[i] = ((ing, sub, unit), Decimal("0"))
+                continue
+            if change.substitute_ingredient_id or change.substitute_sub_product_id:
+                ing, sub = change.substitute_ingredient_id, change.substitute_sub_product_id
+            if change.quantity is not None:
+                quantity, unit = change.quantity, change.unit or unit
+            elif change.scale is not None:
+                quantity *= change.scale
+            slots[i] = ((ing, sub, unit), quantity)
+    return slots
+
+
+def variant_sources(variants: Sequence[Sequence[VariantChange]]) -> Tuple[set, set]:
+    """Ingredient and sub-recipe IDs introduced by substitutions and additions"""
+    ingredient_ids, product_ids = set(), set()
+    for changes in variants:
+        for change in changes:
+            for ingredient_id, product_id in (
+                (change.ingredient_id, change.sub_product_id),
+                (change.substitute_ingredient_id, change.substitute_sub_product_id),
+            ):
+                if ingredient_id:
+                    ingredient_ids.add(ingredient_id)
+                if product_id:
+                    product_ids.add(product_id)
+    return ingredient_ids, product_ids
+
+
+async def evaluate_variants(
+    evaluator: RecipeEvaluator,
+    product: Product,
+    variants: Sequence[Sequence[VariantChange]],
+) -> List[Tuple[Tuple[Decimal, ...], Decimal]]:
+    """
+    Cooked (totals, weight) for the base recipe followed by each variant.
+
+    Every distinct (source, unit) across all variants becomes one column whose
+    per-unit coefficients are resolved once; each variant is then a quantity
+    vector over those columns, so evaluating it is a single dot product with
+    the shared matrix.
+    """
+    base: Slots = [(_column(pi), pi.quantity) for pi in product.ingredients]
+    plans = [base] + [apply_changes(base, changes) for changes in variants]
+
+    columns: Dict[Column, int] = {}
+    for slots in plans:
+        for column, _ in slots:
+            columns.setdefault(column, len(columns))
+
+    rows = [
+        ProductIngredient(ingredient_id=ing, sub_product_id=sub, unit=unit, quantity=Decimal("1"))
+        for ing, sub, unit in columns
+    ]
+    terms: Dict[Column, RecipeTerm] = {
+        _column(term.row): term for term in await evaluator.linear_terms(product, rows)
+    }
+    # Columns whose ingredient no longer exists drop out, as in the recipe graph
+    present = [(index, terms[column]) for column, index in columns.items() if column in terms]
+    matrix = [term for _, term in present]
+
+    yield_factor = product.yield_factor
+    retention = evaluator.retention_for(product)
+    results = []
+    for slots in plans:
+        quantities = [Decimal("0")] * len(columns)
+        for column, quantity in slots:
+            quantities[columns[column]] += quantity
+        results.append(
+            recipe_totals(matrix, [quantities[index] for index, _ in present], yield_factor, retention)
+        )
+    return results
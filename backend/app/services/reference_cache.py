@@ -0,0 +1,145 @@
+"""
+Reference Data Cache Service
+Process-wide cache for rarely-changing reference data (allergens, nutrient
+definitions, RDA tables, label types, retention tables) with versioned
+invalidation and ETag support
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import etag_matches
+from app.models.reference_data_version import ReferenceDataVersion
+
+
+# Namespaces - one version counter each
+ALLERGENS = "allergens"
+NUTRIENTS = "nutrients"
+RDA_TABLES = "rda_tables"
+LABEL_TYPES = "label_types"
+RETENTION_TABLES = "retention_tables"
+
+
+@dataclass(frozen=True)
+class CachedEntry:
+    """A cached, pre-encoded JSON body with its strong ETag"""
+    body: bytes
+    etag: str
+
+    def respond(self, request: Request) -> Response:
+        """Return the cached body, or a bare 304 if the client's copy is current"""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ReferenceDataCache:
+    """
+    In-memory cache keyed by (namespace, key) and tagged with the namespace version.
+
+    Each worker polls the reference_data_versions table at most once every
+    `poll_interval` seconds (one small query for all namespaces). When an admin
+    handler bumps a namespace, every worker sees the new version on its next
+    poll and stops serving entries cached under the old one.
+    """
+
+    def __init__(self, poll_interval: float, max_entries: int):
+        self.poll_interval = poll_interval
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._last_poll = float("-inf")
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, CachedEntry]]" = OrderedDict()
+
+    async def version(self, db: AsyncSession, namespace: str) -> int:
+        """Current version of a namespace, polling the database when the local view is stale"""
+        now = time.monotonic()
+        if now - self._last_poll >= self.poll_interval:
+            result = await db.execute(select(ReferenceDataVersion.name, ReferenceDataVersion.version))
+            # Versions only go up: a poll that raced a local bump can't roll it back
+            for name, version in result.all():
+                self._versions[name] = max(version, self._versions.get(name, 0))
+            self._last_poll = now
+        return self._versions.get(namespace, 0)
+
+    async def get(
+        self,
+        db: AsyncSession,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> CachedEntry:
+        """
+        Return the cached entry for (namespace, key), loading it on a miss or version change.
+
+        `loader` must return JSON-compatible data (e.g. model_dump(mode="json") output);
+        it is encoded once and served as-is until the namespace version changes.
+        """
+        version = await self.version(db, namespace)
+        cache_key = (namespace, key)
+
+        cached = self._entries.get(cache_key)
+        if cached and cached[0] == version:
+            self._entries.move_to_end(cache_key)
+            return cached[1]
+
+        body = json.dumps(await loader(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        entry = CachedEntry(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+        self._entries[cache_key] = (version, entry)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    async def bump(self, db: AsyncSession, namespace: str) -> None:
+        """
+        Increment a namespace version inside the caller's transaction.
+
+        Call before committing an admin write so the data change and the
+        invalidation signal commit together. This process's entries are dropped
+        once the transaction commits, not before, so a concurrent reader can't
+        cache the old rows again under the new version.
+        """
+        # Upsert: the first bumps of a namespace can't collide on its row
+        upsert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        result = await db.execute(
+            upsert(ReferenceDataVersion)
+            .values(name=namespace, version=1)
+            .on_conflict_do_update(
+                index_elements=[ReferenceDataVersion.name],
+                set_={"version": ReferenceDataVersion.version + 1},
+            )
+            .returning(ReferenceDataVersion.version)
+        )
+        version = result.scalar_one()
+
+        def committed(session) -> None:
+            self._versions[namespace] = max(version, self._versions.get(namespace, 0))
+            self.invalidate(namespace)
+
+        event.listen(db.sync_session, "after_commit", committed, once=True)
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop local entries (all, or one namespace) and force a version poll on next access"""
+        for cache_key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+            del self._entries[cache_key]
+        self._last_poll = float("-inf")
+
+
+reference_cache = ReferenceDataCache(
+    poll_interval=settings.REFERENCE_CACHE_POLL_SECONDS,
+    max_entries=settings.REFERENCE_CACHE_MAX_ENTRIES,
+)
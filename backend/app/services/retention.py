@@ -0,0 +1,67 @@
+"""
+Retention Factor Service
+Compiles retention tables into per-nutrient multiply vectors aligned with the
+calculator's nutrient order
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.retention_table import RetentionTable
+from app.services.daily_values import NUTRIENT_KEYS
+from app.services.reference_cache import reference_cache, RETENTION_TABLES
+
+
+RetentionVector = Tuple[Decimal, ...]
+
+_ONE = Decimal("1")
+
+
+def compile_retention(factors: Optional[dict]) -> RetentionVector:
+    """Factor per NUTRIENT_KEYS entry; nutrients without a factor are fully retained"""
+    factors = factors or {}
+    return tuple(
+        Decimal(str(factors[key])) if factors.get(key) is not None else _ONE
+        for key in NUTRIENT_KEYS
+    )
+
+
+def apply_retention(totals: Iterable[Decimal], vector: RetentionVector) -> Tuple[Decimal, ...]:
+    """Element-wise multiply of nutrient totals by a retention vector"""
+    return tuple(total * factor for total, factor in zip(totals, vector))
+
+
+class RetentionRegistry:
+    """
+    Compiled retention vectors per table, tagged with the RETENTION_TABLES
+    reference-data version so admin edits recompile them on next use.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._vectors: Dict[UUID, RetentionVector] = {}
+
+    async def vectors(self, db: AsyncSession, table_ids: Iterable[UUID]) -> Dict[UUID, RetentionVector]:
+        """Vectors for the given tables, loading any missing ones with one query"""
+        version = await reference_cache.version(db, RETENTION_TABLES)
+        if version != self._version:
+            self._vectors = {}
+            self._version = version
+
+        table_ids = set(table_ids)
+        missing = table_ids - self._vectors.keys()
+        if missing:
+            result = await db.execute(
+                select(RetentionTable.id, RetentionTable.factors).where(RetentionTable.id.in_(missing))
+            )
+            for table_id, factors in result.all():
+                self._vectors[table_id] = compile_retention(factors)
+
+        return {table_id: self._vectors[table_id] for table_id in table_ids if table_id in self._vectors}
+
+
+retention_registry = RetentionRegistry()
@@ -0,0 +1,230 @@
+"""
+Regulatory Rounding Service
+Declarative per-regulation rounding tables (FDA, GSO, EU) compiled once into
+bound/rule arrays and applied to a whole nutrient vector with Decimal arithmetic
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from app.services.daily_values import NUTRIENT_KEYS
+
+
+# Declared unit for each nutrient in the calculator's nutrient matrix
+NUTRIENT_UNITS: Dict[str, str] = {
+    "calories": "",
+    "total_fat": "g",
+    "saturated_fat": "g",
+    "trans_fat": "g",
+    "cholesterol": "mg",
+    "sodium": "mg",
+    "total_carbs": "g",
+    "dietary_fiber": "g",
+    "total_sugars": "g",
+    "added_sugars": "g",
+    "protein": "g",
+    "vitamin_d": "mcg",
+    "calcium": "mg",
+    "iron": "mg",
+    "potassium": "mg",
+}
+
+
+@dataclass(frozen=True)
+class Tier:
+    """
+    One row of a rounding table, applying to values below `limit`
+    (or up to and including it when `inclusive`); `limit=None` is the open top tier.
+
+    Exactly one of `increment`, `significant`, `less_than` or `zero` describes the rule:
+    round to the nearest increment, to N significant figures, declare as
+    "less than X", or declare as zero.
+    """
+    limit: Optional[Decimal] = None
+    inclusive: bool = False
+    increment: Optional[Decimal] = None
+    significant: Optional[int] = None
+    less_than: Optional[Decimal] = None
+    zero: bool = False
+
+
+@dataclass(frozen=True)
+class RoundedValue:
+    """A declared nutrient amount: `amount` is None for "less than" declarations"""
+    amount: Optional[Decimal]
+    text: str
+
+
+def _d(value: str) -> Decimal:
+    return Decimal(value)
+
+
+def zero_below(limit: str, inclusive: bool = False) -> Tier:
+    return Tier(limit=_d(limit), inclusive=inclusive, zero=True)
+
+
+def nearest(increment: str, below: Optional[str] = None, inclusive: bool = False) -> Tier:
+    return Tier(limit=_d(below) if below else None, inclusive=inclusive, increment=_d(increment))
+
+
+def less_than(value: str, below: str, inclusive: bool = False) -> Tier:
+    return Tier(limit=_d(below), inclusive=inclusive, less_than=_d(value))
+
+
+def significant(figures: int) -> Tier:
+    return Tier(significant=figures)
+
+
+# 21 CFR 101.9(c); vitamins and minerals per the 2016 final rule increments
+FDA_RULES: Dict[str, Tuple[Tier, ...]] = {
+    "calories": (zero_below("5"), nearest("5", below="50", inclusive=True), nearest("10")),
+    "total_fat": (zero_below("0.5"), nearest("0.5", below="5"), nearest("1")),
+    "saturated_fat": (zero_below("0.5"), nearest("0.5", below="5"), nearest("1")),
+    "trans_fat": (zero_below("0.5"), nearest("0.5", below="5"), nearest("1")),
+    "cholesterol": (zero_below("2"), less_than("5", below="5", inclusive=True), nearest("5")),
+    "sodium": (zero_below("5"), nearest("5", below="140", inclusive=True), nearest("10")),
+    "total_carbs": (zero_below("0.5"), less_than("1", below="1"), nearest("1")),
+    "dietary_fiber": (zero_below("0.5"), less_than("1", below="1"), nearest("1")),
+    "total_sugars": (zero_below("0.5"), less_than("1", below="1"), nearest("1")),
+    "added_sugars": (zero_below("0.5"), less_than("1", below="1"), nearest("1")),
+    "protein": (zero_below("0.5"), less_than("1", below="1"), nearest("1")),
+    "vitamin_d": (nearest("0.1"),),
+    "calcium": (nearest("10"),),
+    "iron": (nearest("0.1"),),
+    "potassium": (zero_below("5"), nearest("10")),
+}
+
+# GSO labels use the FDA increments; override per nutrient where GCC guidance differs
+GSO_RULES: Dict[str, Tuple[Tier, ...]] = {
+    **FDA_RULES,
+}
+
+# European Commission guidance on tolerances and rounding (2012), Regulation (EU) 1169/2011
+EU_RULES: Dict[str, Tuple[Tier, ...]] = {
+    "calories": (nearest("1"),),
+    "total_fat": (less_than("0.5", below="0.5", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    "saturated_fat": (less_than("0.1", below="0.1", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    "total_carbs": (less_than("0.5", below="0.5", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    "dietary_fiber": (less_than("0.5", below="0.5", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    "total_sugars": (less_than("0.5", below="0.5", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    "protein": (less_than("0.5", below="0.5", inclusive=True), nearest("0.1", below="10"), nearest("1")),
+    # Sodium in mg (the guidance gives g: <0.005 g, 0.01 g below 1 g, 0.1 g above)
+    "sodium": (less_than("5", below="5", inclusive=True), nearest("10", below="1000"), nearest("100")),
+    "vitamin_d": (significant(3),),
+    "calcium": (significant(3),),
+    "iron": (significant(3),),
+    "potassium": (significant(3),),
+}
+
+# Nutrients without a rule keep two decimal places
+DEFAULT_RULE: Tuple[Tier, ...] = (nearest("0.01"),)
+
+
+class RoundingTable:
+    """
+    A regulation's rounding rules compiled against NUTRIENT_KEYS.
+
+    For each nutrient the tier limits are held in a sorted list, so picking the
+    rule for a value is one bisect instead of a chain of comparisons.
+    """
+
+    def __init__(self, code: str, rules: Mapping[str, Sequence[Tier]], less_than_format: str):
+        self.code = code
+        self.less_than_format = less_than_format
+        self._compiled = tuple(
+            self._compile(tuple(rules.get(key, DEFAULT_RULE))) for key in NUTRIENT_KEYS
+        )
+        self._units = tuple(NUTRIENT_UNITS[key] for key in NUTRIENT_KEYS)
+
+    @staticmethod
+    def _compile(tiers: Tuple[Tier, ...]):
+        bounded = tiers[:-1] if tiers[-1].limit is None else tiers
+        limits = [tier.limit for tier in bounded]
+        if limits != sorted(limits):
+            raise ValueError("Rounding tiers must be ordered by limit")
+        return limits, tuple(tier.inclusive for tier in bounded), tiers
+
+    @staticmethod
+    def _pick(compiled, value: Decimal) -> Tier:
+        limits, inclusive, tiers = compiled
+        index = bisect_left(limits, value)
+        if index < len(limits) and limits[index] == value and not inclusive[index]:
+            index += 1
+        return tiers[min(index, len(tiers) - 1)]
+
+    def _apply(self, tier: Tier, value: Decimal, unit: str) -> RoundedValue:
+        if tier.zero:
+            amount = Decimal("0")
+        elif tier.less_than is not None:
+            return RoundedValue(
+                amount=None,
+                text=self.less_than_format.format(value=_format(tier.less_than), unit=unit),
+            )
+        elif tier.significant is not None:
+            if value == 0:
+                amount = Decimal("0")
+            else:
+                exponent = value.adjusted() - tier.significant + 1
+                amount = value.quantize(Decimal(1).scaleb(exponent), rounding=ROUND_HALF_UP)
+        else:
+            amount = (value / tier.increment).quantize(Decimal(1), rounding=ROUND_HALF_UP) * tier.increment
+        return RoundedValue(amount=amount, text=f"{_format(amount)}{unit}")
+
+    def round_vector(self, amounts: Sequence[Decimal]) -> Tuple[RoundedValue, ...]:
+        """Round a nutrient vector aligned with NUTRIENT_KEYS"""
+        return tuple(
+            self._apply(self._pick(compiled, value), value, unit)
+            for compiled, value, unit in zip(self._compiled, map(_to_decimal, amounts), self._units)
+        )
+
+    def round_values(self, values: Mapping[str, object]) -> Dict[str, RoundedValue]:
+        """Round every matrix nutrient in a mapping (e.g. a NutritionSummary dump); missing ones count as 0"""
+        rounded = self.round_vector([values.get(key, 0) for key in NUTRIENT_KEYS])
+        return dict(zip(NUTRIENT_KEYS, rounded))
+
+    def round(self, value: object, nutrient: str) -> RoundedValue:
+        """Round a single nutrient"""
+        if nutrient in NUTRIENT_KEYS:
+            compiled = self._compiled[NUTRIENT_KEYS.index(nutrient)]
+            unit = NUTRIENT_UNITS[nutrient]
+        else:
+            compiled, unit = self._compile(DEFAULT_RULE), ""
+        value = _to_decimal(value)
+        return self._apply(self._pick(compiled, value), value, unit)
+
+
+def _to_decimal(value: object) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def _format(value: Decimal) -> str:
+    """Plain notation without trailing zeros (150, 2.5, 0)"""
+    text = format(value.normalize(), "f")
+    return "0" if text in ("-0", "") else text
+
+
+ROUNDING_TABLES: Dict[str, RoundingTable] = {
+    "fda": RoundingTable("fda", FDA_RULES, less_than_format="Less than {value}{unit}"),
+    "gso": RoundingTable("gso", GSO_RULES, less_than_format="Less than {value}{unit}"),
+    "eu": RoundingTable("eu", EU_RULES, less_than_format="<{value}{unit}"),
+}
+
+# Label type / RDA table regions -> rounding regulation
+REGION_REGULATIONS = {
+    "USA": "fda",
+    "GCC": "gso",
+    "EU": "eu",
+    "UK": "eu",
+}
+
+
+def get_rounding_table(regulation: Optional[str] = None, region: Optional[str] = None) -> RoundingTable:
+    """Rounding table by regulation code, or by region; defaults to FDA"""
+    if regulation:
+        try:
+            return ROUNDING_TABLES[regulation.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown rounding regulation '{regulation}'") from None
+    return ROUNDING_TABLES[REGION_REGULATIONS.get(region or "", "fda")]
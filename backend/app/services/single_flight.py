@@ -0,0 +1,85 @@
+"""
+Single-Flight Service
+Coalesces identical concurrent computations: while one caller computes the
+result for a key, every other caller with the same key awaits that call
+instead of repeating the database work or rendering. Nothing is cached once
+the call finishes.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Keyed in-flight call deduplication within one process.
+
+    The first caller for a key (the leader) runs the computation on its own
+    database session; later callers await the leader's future. Keys must
+    capture everything the result depends on (including the caller's scope),
+    and results must not be mutated by callers since they are shared.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0  # Calls that joined an in-flight computation
+        self.misses = 0  # Calls that ran the computation
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        _REGISTRY.append(self)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self.hits += 1
+            try:
+                # Shielded so a disconnecting follower doesn't cancel the shared call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; the next caller in line takes over
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Followers re-raise it; don't warn when there are none
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / calls, 4) if calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
+
+
+_REGISTRY: List[SingleFlight] = []
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every single-flight group in this process"""
+    return {group.name: group.stats() for group in _REGISTRY}
+
+
+# Per-serving nutrition and panels (products endpoints)
+nutrition_flight = SingleFlight("nutrition")
+# Label preview and export rendering (labels endpoints)
+export_flight = SingleFlight("export")
@@ -0,0 +1,106 @@
+"""
+Unit Conversion Service
+Normalizes recipe quantities (g, kg, oz, ml, cup, tbsp, ...) to an ingredient's
+nutrient basis using precompiled mass/volume tables and per-ingredient density
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+
+class UnitConversionError(ValueError):
+    """Raised when a quantity cannot be converted (unknown unit, or mass <-> volume without density)"""
+
+
+MASS = "mass"
+VOLUME = "volume"
+
+# Grams per unit
+MASS_UNITS: Dict[str, Decimal] = {
+    "mg": Decimal("0.001"),
+    "g": Decimal("1"),
+    "kg": Decimal("1000"),
+    "oz": Decimal("28.349523125"),
+    "lb": Decimal("453.59237"),
+}
+
+# Millilitres per unit (US customary measures)
+VOLUME_UNITS: Dict[str, Decimal] = {
+    "ml": Decimal("1"),
+    "cl": Decimal("10"),
+    "dl": Decimal("100"),
+    "l": Decimal("1000"),
+    "tsp": Decimal("4.92892159375"),
+    "tbsp": Decimal("14.78676478125"),
+    "fl oz": Decimal("29.5735295625"),
+    "cup": Decimal("236.5882365"),
+    "pint": Decimal("473.176473"),
+    "quart": Decimal("946.352946"),
+    "gallon": Decimal("3785.411784"),
+}
+
+UNIT_ALIASES: Dict[str, str] = {
+    "gram": "g", "grams": "g", "gr": "g",
+    "milligram": "mg", "milligrams": "mg",
+    "kilogram": "kg", "kilograms": "kg", "kgs": "kg",
+    "ounce": "oz", "ounces": "oz",
+    "pound": "lb", "pounds": "lb", "lbs": "lb",
+    "millilitre": "ml", "milliliter": "ml", "millilitres": "ml", "milliliters": "ml", "mls": "ml",
+    "litre": "l", "liter": "l", "litres": "l", "liters": "l",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsps": "tbsp", "tbs": "tbsp",
+    "floz": "fl oz", "fl. oz": "fl oz", "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "cups": "cup",
+    "pints": "pint", "pt": "pint",
+    "quarts": "quart", "qt": "quart",
+    "gallons": "gallon", "gal": "gallon",
+}
+
+# Compiled lookup: normalized unit -> (dimension, factor to g or ml)
+_UNIT_TABLE: Dict[str, Tuple[str, Decimal]] = {
+    **{unit: (MASS, factor) for unit, factor in MASS_UNITS.items()},
+    **{unit: (VOLUME, factor) for unit, factor in VOLUME_UNITS.items()},
+}
+_UNIT_TABLE.update({alias: _UNIT_TABLE[unit] for alias, unit in UNIT_ALIASES.items()})
+
+
+def normalize_unit(unit: str) -> str:
+    """Canonical spelling of a unit (e.g. 'Tablespoons' -> 'tbsp')"""
+    key = " ".join((unit or "").strip().lower().split())
+    return UNIT_ALIASES.get(key, key)
+
+
+def unit_dimension(unit: str) -> Optional[str]:
+    """MASS, VOLUME, or None for count-style units (slice, piece, serving)"""
+    entry = _UNIT_TABLE.get(normalize_unit(unit))
+    return entry[0] if entry else None
+
+
+@lru_cache(maxsize=4096)
+def conversion_factor(from_unit: str, to_unit: str, density: Optional[Decimal] = None) -> Decimal:
+    """
+    Factor that converts a quantity in `from_unit` into `to_unit`.
+
+    `density` (g/ml) bridges mass and volume. Results are cached per
+    (from, to, density), so each ingredient-unit pair is resolved once and the
+    calculator only multiplies.
+    """
+    source = _UNIT_TABLE.get(normalize_unit(from_unit))
+    target = _UNIT_TABLE.get(normalize_unit(to_unit))
+    if source is None:
+        raise UnitConversionError(f"Unknown unit '{from_unit}'")
+    if target is None:
+        raise UnitConversionError(f"Unknown unit '{to_unit}'")
+
+    (source_dimension, source_factor), (target_dimension, target_factor) = source, target
+    factor = source_factor / target_factor
+
+    if source_dimension == target_dimension:
+        return factor
+    if not density:
+        raise UnitConversionError(
+            f"Cannot convert '{from_unit}' to '{to_unit}' without a density"
+        )
+    # g -> ml divides by density, ml -> g multiplies by it
+    return factor * density if source_dimension == VOLUME else factor / density
@@ -0,0 +1,95 @@
+"""
+Job Worker - runs queued jobs (see app/services/jobs.py)
+
+API processes start JOB_WORKERS worker tasks on startup. Dedicated worker
+processes run the same loop:
+    python -m app.worker [--concurrency N]
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.services.jobs import claim_next, requeue_expired, run_job, wakeup_event
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """`concurrency` worker tasks in the current event loop, each running one job at a time"""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.name}/{index}")) for index in range(self.concurrency)
+        ]
+
+    async def stop(self, grace_seconds: float = 10.0) -> None:
+        """Let running jobs finish for up to `grace_seconds`, then hand the rest back to the queue"""
+        self._stop.set()
+        wakeup_event().set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run(self, worker_id: str) -> None:
+        wakeup = wakeup_event()
+        # Each worker sweeps expired leases at most once per half lease
+        next_sweep = 0.0
+        while not self._stop.is_set():
+            wakeup.clear()
+            try:
+                async with AsyncSessionLocal() as db:
+                    if time.monotonic() >= next_sweep:
+                        await requeue_expired(db)
+                        next_sweep = time.monotonic() + settings.JOB_LEASE_SECONDS / 2
+                    job = await claim_next(db, worker_id)
+            except Exception:
+                # Database unavailable or locked: back off and keep the worker alive
+                logger.exception("Worker %s could not claim a job", worker_id)
+                job = None
+
+            if job is not None:
+                await run_job(job, worker_id)
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=settings.JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def main(concurrency: Optional[int] = None):
+    pool = WorkerPool(concurrency or max(settings.JOB_WORKERS, 1))
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    pool.start()
+    print(f"✓ Job worker {pool.name} running {pool.concurrency} task(s); Ctrl+C to stop")
+    await stopping.wait()
+    print("Stopping, waiting for running jobs...")
+    await pool.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    concurrency = int(args[args.index("--concurrency") + 1]) if "--concurrency" in args else None
+    asyncio.run(main(concurrency))
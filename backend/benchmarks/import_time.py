@@ -0,0 +1,110 @@
+"""
+Import-time benchmark for API worker cold start
+Run with: python benchmarks/import_time.py [--budget-ms 1500] [--output import_time.json]
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter, reports
+the slowest modules and fails if:
+- a heavy export dependency (WeasyPrint, cairosvg, Pillow, html2image), the
+  label exporter itself or the admin endpoints are imported at startup, or
+- the total import time exceeds --budget-ms (when given).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+TARGET_MODULE = "app.main"
+
+# Modules that must only load on first export, never at worker startup
+LAZY_MODULES = [
+    "weasyprint",
+    "cairosvg",
+    "PIL",
+    "html2image",
+    "app.services.label_exporter",
+    "app.api.v1.endpoints.admin",
+]
+
+
+def measure_once() -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Return (total ms, [(module, self_us, cumulative_us), ...]) for one cold import"""
+    env = {**os.environ, "DEBUG": "false"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET_MODULE}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {TARGET_MODULE} failed:\n{proc.stderr}")
+
+    modules = []
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.append((name, int(self_us), int(cumulative_us)))
+        if name == TARGET_MODULE:
+            total_us = int(cumulative_us)
+
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="number of cold imports; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if total import time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest modules to list")
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON for tracking")
+    args = parser.parse_args()
+
+    # First run also warms the bytecode cache, so keep the fastest
+    runs = [measure_once() for _ in range(max(args.runs, 1))]
+    total_ms, modules = min(runs, key=lambda run: run[0])
+
+    imported: Dict[str, int] = {name: cumulative for name, _, cumulative in modules}
+    eager = sorted(
+        name for name in imported
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+
+    print(f"import {TARGET_MODULE}: {total_ms:.1f} ms (best of {len(runs)})")
+    print(f"\nSlowest {args.top} modules by self time:")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  (cumulative {cumulative_us / 1000:8.1f} ms)  {name}")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "module": TARGET_MODULE,
+            "total_ms": round(total_ms, 1),
+            "eager_lazy_modules": eager,
+            "slowest": [
+                {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cum_us / 1000, 2)}
+                for name, self_us, cum_us in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]
+            ],
+        }, indent=2))
+
+    failed = False
+    if eager:
+        print(f"\n✗ Modules that must load lazily were imported at startup: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\n✗ Import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("\n✓ Import-time checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,8 +14,8 @@ from app.models import *  # noqa: Import all models
 # this is the Alembic Config object
 config = context.config
 
-# Set sqlalchemy.url from settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("+asyncpg", ""))
+# Set sqlalchemy.url from settings (async driver, used by async_engine_from_config below)
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
@@ -0,0 +1,31 @@
+"""reference data versions
+
+Revision ID: c79f60abb7b5
+Revises: 3e7b3ee93a9d
+Create Date: 2026-10-19 04:43:07.138195
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c79f60abb7b5'
+down_revision: Union[str, None] = '3e7b3ee93a9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reference_data_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reference_data_versions')
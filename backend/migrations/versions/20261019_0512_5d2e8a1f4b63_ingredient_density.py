@@ -0,0 +1,26 @@
+"""ingredient density
+
+Revision ID: 5d2e8a1f4b63
+Revises: c79f60abb7b5
+Create Date: 2026-10-19 05:12:41.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8a1f4b63'
+down_revision: Union[str, None] = 'c79f60abb7b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingredients', sa.Column('density', sa.Numeric(precision=10, scale=4), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ingredients', 'density')
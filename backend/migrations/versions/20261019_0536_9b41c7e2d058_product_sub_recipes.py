@@ -0,0 +1,43 @@
+"""product sub-recipes
+
+Revision ID: 9b41c7e2d058
+Revises: 5d2e8a1f4b63
+Create Date: 2026-10-19 05:36:18.274905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b41c7e2d058'
+down_revision: Union[str, None] = '5d2e8a1f4b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # batch mode so SQLite recreates the table; PostgreSQL gets plain ALTERs
+    with op.batch_alter_table('product_ingredients') as batch_op:
+        batch_op.add_column(sa.Column('sub_product_id', sa.UUID(), nullable=True))
+        batch_op.alter_column('ingredient_id', existing_type=sa.UUID(), nullable=True)
+        batch_op.create_foreign_key(
+            'fk_product_ingredients_sub_product_id_products', 'products', ['sub_product_id'], ['id']
+        )
+        batch_op.create_index('ix_product_ingredients_sub_product_id', ['sub_product_id'], unique=False)
+        batch_op.create_check_constraint(
+            'ck_product_ingredients_one_source',
+            '(ingredient_id IS NULL) <> (sub_product_id IS NULL)',
+        )
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM product_ingredients WHERE sub_product_id IS NOT NULL')
+    with op.batch_alter_table('product_ingredients') as batch_op:
+        batch_op.drop_constraint('ck_product_ingredients_one_source', type_='check')
+        batch_op.drop_index('ix_product_ingredients_sub_product_id')
+        batch_op.drop_constraint('fk_product_ingredients_sub_product_id_products', type_='foreignkey')
+        batch_op.alter_column('ingredient_id', existing_type=sa.UUID(), nullable=False)
+        batch_op.drop_column('sub_product_id')
@@ -0,0 +1,48 @@
+"""retention tables and product yield
+
+Revision ID: f7e9f93049c7
+Revises: 9b41c7e2d058
+Create Date: 2026-10-19 05:58:56.369135
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7e9f93049c7'
+down_revision: Union[str, None] = '9b41c7e2d058'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('retention_tables',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('source', sa.String(length=255), nullable=True),
+    sa.Column('factors', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.add_column(sa.Column('yield_factor', sa.Numeric(precision=6, scale=4), nullable=True))
+        batch_op.add_column(sa.Column('retention_table_id', sa.UUID(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_products_retention_table_id_retention_tables', 'retention_tables', ['retention_table_id'], ['id']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_constraint('fk_products_retention_table_id_retention_tables', type_='foreignkey')
+        batch_op.drop_column('retention_table_id')
+        batch_op.drop_column('yield_factor')
+    op.drop_table('retention_tables')
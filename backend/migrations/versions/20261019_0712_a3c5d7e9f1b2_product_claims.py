@@ -0,0 +1,41 @@
+"""product claims
+
+Revision ID: a3c5d7e9f1b2
+Revises: f7e9f93049c7
+Create Date: 2026-10-19 07:12:31.504218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5d7e9f1b2'
+down_revision: Union[str, None] = 'f7e9f93049c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_claims',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('regulation', sa.String(length=10), nullable=False),
+    sa.Column('claim', sa.String(length=50), nullable=False),
+    sa.Column('evaluated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_id', 'regulation', 'claim', name='uq_product_claims_product_regulation_claim')
+    )
+    op.create_index(op.f('ix_product_claims_claim'), 'product_claims', ['claim'], unique=False)
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.add_column(sa.Column('claims_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('claims_fingerprint')
+    op.drop_index(op.f('ix_product_claims_claim'), table_name='product_claims')
+    op.drop_table('product_claims')
@@ -0,0 +1,30 @@
+"""label compliance hash
+
+Revision ID: b4d6e8f0a2c3
+Revises: a3c5d7e9f1b2
+Create Date: 2026-10-19 07:48:12.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d6e8f0a2c3'
+down_revision: Union[str, None] = 'a3c5d7e9f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('labels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('compliance_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('compliance_checked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('labels', schema=None) as batch_op:
+        batch_op.drop_column('compliance_checked_at')
+        batch_op.drop_column('compliance_hash')
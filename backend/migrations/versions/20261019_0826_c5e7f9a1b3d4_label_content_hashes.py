@@ -0,0 +1,42 @@
+"""label content hashes
+
+Revision ID: c5e7f9a1b3d4
+Revises: b4d6e8f0a2c3
+Create Date: 2026-10-19 08:26:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e7f9a1b3d4'
+down_revision: Union[str, None] = 'b4d6e8f0a2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+    with op.batch_alter_table('templates') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.add_column(sa.Column('product_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('template_version', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_labels_product_id_product_hash', ['product_id', 'product_hash'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.drop_index('ix_labels_product_id_product_hash')
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('template_version')
+        batch_op.drop_column('product_hash')
+    with op.batch_alter_table('templates') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('content_hash')
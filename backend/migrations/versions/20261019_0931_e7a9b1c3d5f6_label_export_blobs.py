@@ -0,0 +1,87 @@
+"""label export blobs
+
+Revision ID: e7a9b1c3d5f6
+Revises: d6f8a0b2c4e5
+Create Date: 2026-10-19 09:31:12.584730
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.services.blob_store import get_blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9b1c3d5f6'
+down_revision: Union[str, None] = 'd6f8a0b2c4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+labels = sa.table(
+    'labels',
+    sa.column('id'),
+    sa.column('png_data', sa.LargeBinary()),
+    sa.column('pdf_data', sa.LargeBinary()),
+    sa.column('png_hash', sa.String()),
+    sa.column('pdf_hash', sa.String()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.add_column(sa.Column('png_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('pdf_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('svg_hash', sa.String(length=64), nullable=True))
+
+    # Move cached exports into the blob store before dropping the columns
+    if not context.is_offline_mode():
+        bind = op.get_bind()
+        store = get_blob_store()
+        rows = bind.execute(
+            sa.select(labels.c.id).where(sa.or_(labels.c.png_data.isnot(None), labels.c.pdf_data.isnot(None)))
+        ).scalars().all()
+        for label_id in rows:
+            row = bind.execute(
+                sa.select(labels.c.png_data, labels.c.pdf_data).where(labels.c.id == label_id)
+            ).one()
+            bind.execute(
+                labels.update()
+                .where(labels.c.id == label_id)
+                .values(
+                    png_hash=store.put_sync(row.png_data) if row.png_data is not None else None,
+                    pdf_hash=store.put_sync(row.pdf_data) if row.pdf_data is not None else None,
+                )
+            )
+
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.drop_column('pdf_data')
+        batch_op.drop_column('png_data')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.add_column(sa.Column('png_data', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('pdf_data', sa.LargeBinary(), nullable=True))
+
+    # Copy cached exports back from the blob store (blobs are left in place)
+    if not context.is_offline_mode():
+        bind = op.get_bind()
+        store = get_blob_store()
+        rows = bind.execute(
+            sa.select(labels.c.id, labels.c.png_hash, labels.c.pdf_hash)
+            .where(sa.or_(labels.c.png_hash.isnot(None), labels.c.pdf_hash.isnot(None)))
+        ).all()
+        for row in rows:
+            values = {}
+            for digest, column in ((row.png_hash, 'png_data'), (row.pdf_hash, 'pdf_data')):
+                if digest is not None and store.contains(digest):
+                    values[column] = store.read(digest)
+            if values:
+                bind.execute(labels.update().where(labels.c.id == row.id).values(**values))
+
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.drop_column('svg_hash')
+        batch_op.drop_column('pdf_hash')
+        batch_op.drop_column('png_hash')
@@ -0,0 +1,76 @@
+"""backfill content hashes
+
+Revision ID: f8b0c2d4e6a7
+Revises: e7a9b1c3d5f6
+Create Date: 2026-10-19 09:58:41.206315
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+import uuid
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8b0c2d4e6a7'
+down_revision: Union[str, None] = 'e7a9b1c3d5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+products = sa.table(
+    'products',
+    sa.column('id'),
+    sa.column('content_hash', sa.String()),
+)
+
+jobs = sa.table(
+    'jobs',
+    sa.column('id', sa.UUID()),
+    sa.column('kind', sa.String()),
+    sa.column('payload', sa.JSON()),
+    sa.column('priority', sa.Integer()),
+    sa.column('status', sa.String()),
+    sa.column('attempts', sa.Integer()),
+    sa.column('max_attempts', sa.Integer()),
+    sa.column('run_after', sa.DateTime()),
+    sa.column('progress', sa.Integer()),
+    sa.column('created_at', sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    # Hashes are computed by the job workers (the recipe graph needs the app),
+    # so products without one get a queued backfill job instead
+    if context.is_offline_mode():
+        return
+    bind = op.get_bind()
+    missing = bind.execute(
+        sa.select(products.c.id).where(products.c.content_hash.is_(None)).limit(1)
+    ).first()
+    if missing is None:
+        return
+    now = datetime.utcnow()
+    bind.execute(
+        jobs.insert().values(
+            id=uuid.uuid4(),
+            kind='backfill_content_hashes',
+            payload={},
+            priority=0,
+            status='queued',
+            attempts=0,
+            max_attempts=3,
+            run_after=now,
+            progress=0,
+            created_at=now,
+        )
+    )
+
+
+def downgrade() -> None:
+    if context.is_offline_mode():
+        return
+    op.get_bind().execute(
+        jobs.delete().where(jobs.c.kind == 'backfill_content_hashes', jobs.c.status == 'queued')
+    )